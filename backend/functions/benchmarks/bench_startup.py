@@ -0,0 +1,100 @@
+"""
+Startup benchmark: per-module import time of the Cloud Function entry point.
+
+Each run imports the target in a fresh interpreter with `python -X importtime`
+so nothing is shared between runs, and reports the median self and
+cumulative time of the modules it pulls in. Run from backend/functions:
+
+    python benchmarks/bench_startup.py                  # import main
+    python benchmarks/bench_startup.py app.engine.pipeline --repeat 9 --top 25
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+FUNCTIONS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ENGINE_DIR = os.path.join(FUNCTIONS_DIR, "engine")
+
+# "import time:       208 |       2143 |   flask_cors.decorator"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _import_once(module: str, depth: int) -> Tuple[Dict[str, Tuple[int, int]], float]:
+    """
+    {module: (self us, cumulative us)} for every module imported on behalf
+    of `module` up to `depth` levels below it, and the import's total in ms.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (FUNCTIONS_DIR, ENGINE_DIR, env.get("PYTHONPATH")) if p)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=FUNCTIONS_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr.splitlines()[-1]}")
+
+    # The target and its parent packages; interpreter startup (site,
+    # encodings, ...) is reported alongside them and left out.
+    parts = module.split(".")
+    roots = {".".join(parts[: i + 1]) for i in range(len(parts))}
+
+    # Children are printed before their parent, so walk the lines backwards
+    # to see each module's top-level ancestor first.
+    modules: Dict[str, Tuple[int, int]] = {}
+    total_us = 0
+    ancestors: List[str] = []
+    for line in reversed(result.stderr.splitlines()):
+        match = _LINE.match(line)
+        if not match:
+            continue
+        level = (len(match.group(3)) - 1) // 2
+        name = match.group(4)
+        del ancestors[level:]
+        ancestors.append(name)
+        if ancestors[0] not in roots:
+            continue
+        if level == 0:
+            total_us += int(match.group(2))
+        if level <= depth:
+            modules[name] = (int(match.group(1)), int(match.group(2)))
+    return modules, total_us / 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("module", nargs="?", default="main", help="module to import (default: main)")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters to run (default: 5)")
+    parser.add_argument("--depth", type=int, default=1, help="import levels below the target to list (default: 1)")
+    parser.add_argument("--top", type=int, default=15, help="modules to list (default: 15)")
+    args = parser.parse_args()
+
+    runs = [_import_once(args.module, args.depth) for _ in range(args.repeat)]
+    names = {name for modules, _ in runs for name in modules}
+    rows: List[Tuple[str, float, float]] = []
+    for name in names:
+        timings = [modules[name] for modules, _ in runs if name in modules]
+        rows.append(
+            (
+                name,
+                statistics.median(t[0] for t in timings) / 1e3,
+                statistics.median(t[1] for t in timings) / 1e3,
+            )
+        )
+    rows.sort(key=lambda row: row[2], reverse=True)
+
+    print(f"import {args.module}: median {statistics.median(total for _, total in runs):.1f} ms over {args.repeat} runs")
+    print(f"{'module':<40} {'self ms':>9} {'cumulative ms':>14}")
+    for name, self_ms, cumulative_ms in rows[: args.top]:
+        print(f"{name:<40} {self_ms:9.2f} {cumulative_ms:14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Drop state behind the /api/drop* endpoints.
+
+The state is the drops/current document: status ("idle" | "drop" | "reset"),
+confirmed, timestamp and confirmedAt. ZEROSTRIKE_DROP_BACKEND chooses where
+it lives: "firestore" (the default) or "memory", which keeps it in this
+process and needs no credentials, e.g. for tests and local runs.
+
+Both stores can block until the state changes, which lets
+/api/drop-status/stream push changes instead of being polled.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+BACKEND_ENV_VAR = "ZEROSTRIKE_DROP_BACKEND"
+
+IDLE = "idle"
+
+# Stream timing: a comment line keeps idle connections open through proxies,
+# streams end after STREAM_SECONDS so they fit inside the function timeout,
+# and clients are told to reconnect after RETRY_MS.
+HEARTBEAT_SECONDS = 15.0
+STREAM_SECONDS = 300.0
+RETRY_MS = 1000
+# How long a new Firestore stream waits for the listener's first snapshot.
+FIRST_SNAPSHOT_TIMEOUT_SECONDS = 10.0
+# Writes kept for changes(); a stream further behind than this only sees the
+# most recent ones.
+HISTORY_SIZE = 64
+
+State = Optional[Dict[str, Any]]
+
+
+def status_of(state: State) -> str:
+    return state.get("status", IDLE) if state else IDLE
+
+
+def _copy(state: State) -> State:
+    return None if state is None else dict(state)
+
+
+class MemoryDropStore:
+    def __init__(self) -> None:
+        self._state: State = None
+        self._version = 0
+        self._history: deque = deque(maxlen=HISTORY_SIZE)
+        self._changed = threading.Condition()
+
+    def _publish(self, state: State) -> None:
+        with self._changed:
+            self._state = state
+            self._version += 1
+            self._history.append((self._version, state))
+            self._changed.notify_all()
+
+    def get(self) -> State:
+        return self.snapshot()[1]
+
+    def set(self, data: Dict[str, Any]) -> None:
+        self._publish(dict(data))
+
+    def update(self, data: Dict[str, Any]) -> None:
+        with self._changed:
+            if self._state is None:
+                # Matches Firestore, whose update() needs an existing document.
+                raise LookupError("drops/current does not exist")
+            self._publish({**self._state, **data})
+
+    def snapshot(self) -> Tuple[int, State]:
+        """The current (version, state); the version changes on every write."""
+        with self._changed:
+            return self._version, _copy(self._state)
+
+    def wait(self, version: int, timeout: float) -> Tuple[int, State]:
+        """Block until the version differs from version or timeout passes, then snapshot()."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout)
+        return self.snapshot()
+
+    def changes(self, version: int, timeout: float) -> Tuple[int, List[State]]:
+        """
+        Like wait(), but returns every state written after version, oldest
+        first (the last HISTORY_SIZE of them), so callers see each
+        transition rather than only the latest state.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout)
+            return self._version, [_copy(state) for written, state in self._history if written > version]
+
+
+class FirestoreDropStore:
+    """
+    Reads and writes go straight to the document. Waiting is served from an
+    in-process mirror fed by one on_snapshot listener per instance, so open
+    streams cost no reads beyond the listener's own updates.
+    """
+
+    def __init__(self, document: Callable[[], Any]) -> None:
+        self._document = document
+        self._mirror = MemoryDropStore()
+        self._watch = None
+        self._watch_lock = threading.Lock()
+
+    def get(self) -> State:
+        doc = self._document().get()
+        return doc.to_dict() if doc.exists else None
+
+    def set(self, data: Dict[str, Any]) -> None:
+        self._document().set(data)
+
+    def update(self, data: Dict[str, Any]) -> None:
+        self._document().update(data)
+
+    def _on_snapshot(self, snapshots, changes, read_time) -> None:
+        for doc in snapshots:
+            self._mirror._publish(doc.to_dict() if doc.exists else None)
+
+    def _watching(self) -> MemoryDropStore:
+        with self._watch_lock:
+            if self._watch is None:
+                self._watch = self._document().on_snapshot(self._on_snapshot)
+        return self._mirror
+
+    def snapshot(self) -> Tuple[int, State]:
+        mirror = self._watching()
+        version, state = mirror.snapshot()
+        if version == 0:
+            version, state = mirror.wait(0, FIRST_SNAPSHOT_TIMEOUT_SECONDS)
+        return version, state
+
+    def wait(self, version: int, timeout: float) -> Tuple[int, State]:
+        return self._watching().wait(version, timeout)
+
+    def changes(self, version: int, timeout: float) -> Tuple[int, List[State]]:
+        return self._watching().changes(version, timeout)
+
+
+def make_store(document: Callable[[], Any]):
+    """The store chosen by ZEROSTRIKE_DROP_BACKEND; document returns the Firestore document."""
+    backend = os.environ.get(BACKEND_ENV_VAR, "firestore").strip().lower()
+    if backend == "memory":
+        return MemoryDropStore()
+    if backend == "firestore":
+        return FirestoreDropStore(document)
+    raise ValueError(f"{BACKEND_ENV_VAR} must be 'firestore' or 'memory', got {backend!r}")
+
+
+def status_events(
+    store,
+    heartbeat_seconds: float = HEARTBEAT_SECONDS,
+    stream_seconds: float = STREAM_SECONDS,
+    clock: Callable[[], float] = time.monotonic,
+) -> Iterator[str]:
+    """
+    Server-Sent Events for the drop status. The current status is sent
+    first, followed by every change, including ones that are reverted before
+    the stream next wakes up. Each status is a plain-text data line,
+    the same text /api/drop-status returns. Writes that leave the status
+    unchanged send nothing, and idle periods send heartbeat comments. The
+    stream ends after stream_seconds and the client reconnects.
+    """
+    deadline = clock() + stream_seconds
+    version, state = store.snapshot()
+    last = status_of(state)
+    yield f"retry: {RETRY_MS}\n\n"
+    yield f"data: {last}\n\n"
+    while True:
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return
+        new_version, states = store.changes(version, min(heartbeat_seconds, remaining))
+        if new_version == version:
+            yield ": keepalive\n\n"
+            continue
+        version = new_version
+        for state in states:
+            status = status_of(state)
+            if status != last:
+                last = status
+                yield f"data: {status}\n\n"
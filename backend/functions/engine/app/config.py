@@ -12,12 +12,32 @@ DEFAULT_END = "2020-08-19T23:00:00Z"
 class AppConfig:
     grid_resolution_deg: float = 0.05
     horizon_hours: int = 6
+    # "hourly" samples storm positions at whole hours; "continuous" solves for
+    # the fractional hour at which each storm disc first reaches a cell.
+    collision_mode: str = "hourly"
     threat_threshold: float = 0.44
+    # Coarse-to-fine threat detection: bound severity over blocks of
+    # adaptive_coarse_factor x adaptive_coarse_factor cells and fetch dynamic
+    # inputs only for blocks that could cross the threshold and that a storm
+    # can reach.
+    adaptive_refinement: bool = False
+    adaptive_coarse_factor: int = 4
     simulate_step_hours: int = 6
+    # Process-pool size for /simulate timesteps; 1 runs them serially.
+    simulate_workers: int = 1
+    # Threads used to fetch provider layers concurrently (1 fetches them in
+    # sequence) and how long each fetch may run, from when it starts, before
+    # its layer is reported unavailable.
+    fetch_workers: int = 4
+    fetch_timeout_seconds: float = 30.0
     routing_top_n: int = 20
     routing_drone_count: int = 5
     routing_speed_kmh: float = 120.0
     routing_range_km: float = 200.0
+    # Warm-start each /simulate step's drone assignment from the previous
+    # step's assignment and prices instead of solving it from scratch, and
+    # report per-drone target churn (previous_target, reassigned, churn).
+    routing_incremental: bool = False
 
     fuel_layer_weight: float = 0.4
     atmospheric_layer_weight: float = 0.4
@@ -1,39 +1,68 @@
-from typing import List, Optional
+from typing import Dict, FrozenSet, Hashable, List, Optional
 from datetime import datetime
 
 from app.models import BBox, StormCell
 from app.utils.geo import Grid
+from app.utils.layer import Layer
+
+
+# Terrain and societal layers that do not change between timesteps.
+STATIC_LAYERS: FrozenSet[str] = frozenset({"slope", "fuel_type", "population_proximity", "infrastructure_density"})
+# Vegetation and atmospheric layers refreshed at every timestep.
+DYNAMIC_LAYERS = ("ndvi", "cape", "dewpoint_depression", "cloud_base_height", "low_level_rh", "precip_efficiency")
 
 
 class BaseProvider:
-    def get_ndvi(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    # Layers this provider guarantees not to vary with `when`. The pipeline
+    # fetches and scores them once per (bbox, grid) and reuses them across
+    # timesteps; every other layer is refreshed per call.
+    static_layers: FrozenSet[str] = STATIC_LAYERS
+    # Reported as the source of every layer this provider serves itself.
+    name: str = "base"
+
+    def provenance(self) -> Dict[str, str]:
+        """
+        Source name that served each layer fetched so far, for providers that
+        delegate to others. Layers missing from the mapping came from this
+        provider itself.
+        """
+        return {}
+
+    def static_version(self) -> Hashable:
+        """
+        Identifies the data behind the static layers. The pipeline keys cached
+        static terms on it, so they are rebuilt when it changes.
+        """
+        return None
+
+    def get_ndvi(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
-    def get_slope(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    def get_slope(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
-    def get_fuel_type(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    def get_fuel_type(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
-    def get_cape(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    def get_cape(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
-    def get_dewpoint_depression(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    def get_dewpoint_depression(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
-    def get_cloud_base_height(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    def get_cloud_base_height(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
-    def get_low_level_rh(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    def get_low_level_rh(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
-    def get_precip_efficiency(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    def get_precip_efficiency(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
-    def get_population_proximity(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    def get_population_proximity(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
-    def get_infrastructure_density(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
+    def get_infrastructure_density(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
         raise NotImplementedError
 
     def get_storm_cells(self, bbox: BBox, when: datetime) -> Optional[List[StormCell]]:
@@ -1,63 +1,74 @@
 from datetime import datetime
-from typing import List
+from typing import Dict, FrozenSet, Hashable, List
 
 from app.data.base import BaseProvider
 from app.models import BBox, StormCell
 from app.utils.geo import Grid
+from app.utils.layer import Layer
 
 
 class HybridProvider(BaseProvider):
+    """
+    Serves each layer from the real provider and falls back to the synthetic
+    one only when the real provider has no data, so synthetic layers are
+    never generated just to be discarded.
+    """
+
+    name = "hybrid"
+
     def __init__(self, real: BaseProvider, synthetic: BaseProvider) -> None:
         self.real = real
         self.synthetic = synthetic
+        self._provenance: Dict[str, str] = {}
+
+    @property
+    def static_layers(self) -> FrozenSet[str]:
+        return self.real.static_layers & self.synthetic.static_layers
+
+    def static_version(self) -> Hashable:
+        return (self.real.static_version(), self.synthetic.static_version())
+
+    def provenance(self) -> Dict[str, str]:
+        return dict(self._provenance)
 
-    def _fallback(self, value, fallback):
-        return value if value is not None else fallback
+    def _fetch(self, layer: str, method: str, *args):
+        source = self.real
+        value = getattr(source, method)(*args)
+        if value is None:
+            source = self.synthetic
+            value = getattr(source, method)(*args)
+        self._provenance[layer] = source.provenance().get(layer, source.name)
+        return value
 
-    def get_ndvi(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(self.real.get_ndvi(bbox, grid, when), self.synthetic.get_ndvi(bbox, grid, when))
+    def get_ndvi(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("ndvi", "get_ndvi", bbox, grid, when)
 
-    def get_slope(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(self.real.get_slope(bbox, grid, when), self.synthetic.get_slope(bbox, grid, when))
+    def get_slope(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("slope", "get_slope", bbox, grid, when)
 
-    def get_fuel_type(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(self.real.get_fuel_type(bbox, grid, when), self.synthetic.get_fuel_type(bbox, grid, when))
+    def get_fuel_type(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("fuel_type", "get_fuel_type", bbox, grid, when)
 
-    def get_cape(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(self.real.get_cape(bbox, grid, when), self.synthetic.get_cape(bbox, grid, when))
+    def get_cape(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("cape", "get_cape", bbox, grid, when)
 
-    def get_dewpoint_depression(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(
-            self.real.get_dewpoint_depression(bbox, grid, when),
-            self.synthetic.get_dewpoint_depression(bbox, grid, when),
-        )
+    def get_dewpoint_depression(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("dewpoint_depression", "get_dewpoint_depression", bbox, grid, when)
 
-    def get_cloud_base_height(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(
-            self.real.get_cloud_base_height(bbox, grid, when),
-            self.synthetic.get_cloud_base_height(bbox, grid, when),
-        )
+    def get_cloud_base_height(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("cloud_base_height", "get_cloud_base_height", bbox, grid, when)
 
-    def get_low_level_rh(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(self.real.get_low_level_rh(bbox, grid, when), self.synthetic.get_low_level_rh(bbox, grid, when))
+    def get_low_level_rh(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("low_level_rh", "get_low_level_rh", bbox, grid, when)
 
-    def get_precip_efficiency(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(
-            self.real.get_precip_efficiency(bbox, grid, when),
-            self.synthetic.get_precip_efficiency(bbox, grid, when),
-        )
+    def get_precip_efficiency(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("precip_efficiency", "get_precip_efficiency", bbox, grid, when)
 
-    def get_population_proximity(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(
-            self.real.get_population_proximity(bbox, grid, when),
-            self.synthetic.get_population_proximity(bbox, grid, when),
-        )
+    def get_population_proximity(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("population_proximity", "get_population_proximity", bbox, grid, when)
 
-    def get_infrastructure_density(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        return self._fallback(
-            self.real.get_infrastructure_density(bbox, grid, when),
-            self.synthetic.get_infrastructure_density(bbox, grid, when),
-        )
+    def get_infrastructure_density(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._fetch("infrastructure_density", "get_infrastructure_density", bbox, grid, when)
 
     def get_storm_cells(self, bbox: BBox, when: datetime) -> List[StormCell]:
-        return self._fallback(self.real.get_storm_cells(bbox, when), self.synthetic.get_storm_cells(bbox, when))
+        return self._fetch("storm_cells", "get_storm_cells", bbox, when)
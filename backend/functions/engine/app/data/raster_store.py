@@ -0,0 +1,199 @@
+"""
+On-disk store of pre-gridded rasters read through memory maps.
+
+A store is a directory with an index.json describing .npy files:
+
+    {
+      "layers": {
+        "slope": [{"file": "slope/static.npy", "bbox": [min_lon, min_lat, max_lon, max_lat], "time": null}],
+        "cape": [
+          {"file": "cape/2020-08-15T000000Z.npy", "bbox": [...], "time": "2020-08-15T00:00:00Z"},
+          ...
+        ]
+      }
+    }
+
+Each file holds a 2-D float array on a regular lat/lon lattice spanning its
+bbox, row 0 being the southernmost row (the same orientation as Grid).
+Entries without a time are static. Timed entries are valid from their time
+until the next time of the same layer. A layer may hold several entries
+for one time (or several static ones) with different bboxes, e.g. tiles of
+a larger area; a read mosaics them, and where they overlap the entry listed
+later in the index wins.
+"""
+
+import bisect
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.cache import LRUCache
+from app.utils.geo import Grid
+from app.utils.time import parse_time, to_iso
+
+INDEX_FILE = "index.json"
+STORE_ENV_VAR = "ZEROSTRIKE_RASTER_STORE"
+
+
+@dataclass
+class RasterEntry:
+    path: str
+    bbox: Tuple[float, float, float, float]
+    time: Optional[datetime]
+
+
+def _lattice_indices(coords: np.ndarray, lo: float, hi: float, count: int) -> np.ndarray:
+    # Nearest source cell for each coordinate, -1 where it falls outside.
+    step = (hi - lo) / count
+    idx = np.floor((coords - lo) / step).astype(np.int64)
+    idx[(idx < 0) | (idx >= count)] = -1
+    return idx
+
+
+class RasterStore:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        index_path = os.path.join(root, INDEX_FILE)
+        stat = os.stat(index_path)
+        # Changes whenever the index is rewritten; callers caching values
+        # read from the store key them on it.
+        self.version: Hashable = (os.path.abspath(root), stat.st_mtime_ns, stat.st_size)
+        with open(index_path, "r", encoding="utf-8") as handle:
+            index = json.load(handle)
+
+        self._static: Dict[str, List[RasterEntry]] = {}
+        timed: Dict[str, Dict[float, List[RasterEntry]]] = {}
+        for layer, items in index.get("layers", {}).items():
+            for item in items:
+                entry = RasterEntry(
+                    path=os.path.join(root, item["file"]),
+                    bbox=tuple(float(v) for v in item["bbox"]),
+                    time=parse_time(item["time"], "") if item.get("time") else None,
+                )
+                if entry.time is None:
+                    self._static.setdefault(layer, []).append(entry)
+                else:
+                    timed.setdefault(layer, {}).setdefault(entry.time.timestamp(), []).append(entry)
+        self._starts = {layer: sorted(by_time) for layer, by_time in timed.items()}
+        self._timed = {layer: [timed[layer][start] for start in starts] for layer, starts in self._starts.items()}
+        self._arrays = LRUCache(maxsize=64)
+
+    def layers(self) -> List[str]:
+        return sorted(set(self._static) | set(self._timed))
+
+    def timed_layers(self) -> List[str]:
+        """Layers with at least one timed entry, i.e. that may change with time."""
+        return sorted(self._timed)
+
+    def _entries(self, layer: str, when: datetime) -> List[RasterEntry]:
+        # The entries of the latest time at or before when, else the static ones.
+        starts = self._starts.get(layer)
+        if starts:
+            pos = bisect.bisect_right(starts, when.timestamp())
+            if pos:
+                return self._timed[layer][pos - 1]
+        return self._static.get(layer, [])
+
+    def _array(self, path: str) -> np.ndarray:
+        return self._arrays.get_or_create(path, lambda: np.load(path, mmap_mode="r"))
+
+    def read(self, layer: str, grid: Grid, when: datetime) -> Optional[np.ndarray]:
+        """
+        Values of layer at when, nearest-neighbour resampled onto grid from
+        the entries covering it. Only the rows and columns spanning the grid
+        are read from disk. Returns None when the store has no entry for the
+        layer or its entries together do not cover the whole grid.
+        """
+        values = np.empty((grid.rows, grid.cols), dtype=np.float64)
+        missing = np.ones((grid.rows, grid.cols), dtype=bool)
+        for entry in reversed(self._entries(layer, when)):
+            source = self._array(entry.path)
+            rows_total, cols_total = source.shape
+            min_lon, min_lat, max_lon, max_lat = entry.bbox
+
+            rows = _lattice_indices(grid.lat_array, min_lat, max_lat, rows_total)
+            cols = _lattice_indices(grid.lon_array, min_lon, max_lon, cols_total)
+            row_in, col_in = rows >= 0, cols >= 0
+            take = missing[np.ix_(row_in, col_in)]
+            if not take.any():
+                continue
+
+            rows, cols = rows[row_in], cols[col_in]
+            r0, r1 = int(rows.min()), int(rows.max()) + 1
+            c0, c1 = int(cols.min()), int(cols.max()) + 1
+            window = np.asarray(source[r0:r1, c0:c1], dtype=np.float64)
+            region = values[np.ix_(row_in, col_in)]
+            region[take] = window[np.ix_(rows - r0, cols - c0)][take]
+            values[np.ix_(row_in, col_in)] = region
+            missing[np.ix_(row_in, col_in)] = False
+            if not missing.any():
+                return values
+        return None
+
+
+_STORES = LRUCache(maxsize=4)
+
+
+def open_store(root: Optional[str] = None) -> Optional[RasterStore]:
+    """
+    The store at root, or at $ZEROSTRIKE_RASTER_STORE when root is None.
+    Returns None if neither names a directory with an index. Opened stores
+    are reused until their index file changes.
+    """
+    root = root or os.environ.get(STORE_ENV_VAR)
+    if not root:
+        return None
+    index_path = os.path.join(root, INDEX_FILE)
+    try:
+        mtime = os.stat(index_path).st_mtime_ns
+    except OSError:
+        return None
+    return _STORES.get_or_create((os.path.abspath(root), mtime), lambda: RasterStore(root))
+
+
+def write_raster(
+    root: str,
+    layer: str,
+    values: np.ndarray,
+    bbox: Sequence[float],
+    when: Optional[datetime] = None,
+) -> str:
+    """
+    Save values as a raster of layer and register it in the store's index,
+    creating the store if needed. A raster with the same layer, time and bbox
+    as an existing one replaces it. Returns the path of the written file.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    if values.ndim != 2:
+        raise ValueError("raster values must be two-dimensional")
+    if len(bbox) != 4:
+        raise ValueError("bbox must be (min_lon, min_lat, max_lon, max_lat)")
+
+    stamp = "static" if when is None else to_iso(when).replace(":", "")
+    extent = "_".join(f"{float(v):g}" for v in bbox)
+    relative = os.path.join(layer, f"{stamp}_{extent}.npy")
+    path = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.save(path, values)
+
+    index_path = os.path.join(root, INDEX_FILE)
+    index = {"layers": {}}
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as handle:
+            index = json.load(handle)
+    entries = [e for e in index["layers"].get(layer, []) if e["file"] != relative]
+    entries.append(
+        {
+            "file": relative,
+            "bbox": [float(v) for v in bbox],
+            "time": None if when is None else to_iso(when),
+        }
+    )
+    index["layers"][layer] = entries
+    with open(index_path, "w", encoding="utf-8") as handle:
+        json.dump(index, handle, indent=2, sort_keys=True)
+    return path
@@ -1,46 +1,74 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import FrozenSet, Hashable, List, Optional
 
-from app.data.base import BaseProvider
+from app.data.base import STATIC_LAYERS, BaseProvider
+from app.data.raster_store import open_store
 from app.models import BBox, StormCell
 from app.utils.geo import Grid
+from app.utils.layer import Layer
 
 
 class RealProvider(BaseProvider):
     """
-    Placeholder provider for real data sources (HRRR, Sentinel, FIRMS, NOAA).
-    Returns None so hybrid mode can fall back to synthetic data.
+    Provider for real data sources (HRRR, Sentinel, FIRMS, NOAA) pre-gridded
+    into a local raster store (see app.data.raster_store). The store is taken
+    from store_path or $ZEROSTRIKE_RASTER_STORE. Layers the store lacks, or
+    does not fully cover, return None so hybrid mode can fall back to
+    synthetic data. Layers the store holds timed entries for are not treated
+    as static, whatever their usual role.
     """
 
-    def get_ndvi(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    name = "real"
 
-    def get_slope(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    def __init__(self, store_path: Optional[str] = None) -> None:
+        self.store = open_store(store_path)
 
-    def get_fuel_type(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    @property
+    def static_layers(self) -> FrozenSet[str]:
+        if self.store is None:
+            return STATIC_LAYERS
+        return STATIC_LAYERS - frozenset(self.store.timed_layers())
 
-    def get_cape(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    def static_version(self) -> Hashable:
+        return None if self.store is None else self.store.version
 
-    def get_dewpoint_depression(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    def _layer(self, name: str, grid: Grid, when: datetime) -> Optional[Layer]:
+        if self.store is None:
+            return None
+        values = self.store.read(name, grid, when)
+        if values is None:
+            return None
+        return Layer(grid, values)
 
-    def get_cloud_base_height(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    def get_ndvi(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("ndvi", grid, when)
 
-    def get_low_level_rh(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    def get_slope(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("slope", grid, when)
 
-    def get_precip_efficiency(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    def get_fuel_type(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("fuel_type", grid, when)
 
-    def get_population_proximity(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    def get_cape(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("cape", grid, when)
 
-    def get_infrastructure_density(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[List[List[float]]]:
-        return None
+    def get_dewpoint_depression(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("dewpoint_depression", grid, when)
+
+    def get_cloud_base_height(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("cloud_base_height", grid, when)
+
+    def get_low_level_rh(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("low_level_rh", grid, when)
+
+    def get_precip_efficiency(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("precip_efficiency", grid, when)
+
+    def get_population_proximity(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("population_proximity", grid, when)
+
+    def get_infrastructure_density(self, bbox: BBox, grid: Grid, when: datetime) -> Optional[Layer]:
+        return self._layer("infrastructure_density", grid, when)
 
     def get_storm_cells(self, bbox: BBox, when: datetime) -> Optional[List[StormCell]]:
         return None
@@ -1,11 +1,16 @@
 import math
 import random
-from datetime import datetime
-from typing import List
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Tuple
 
-from app.data.base import BaseProvider
+import numpy as np
+
+from app.data.base import STATIC_LAYERS, BaseProvider
 from app.models import BBox, StormCell
-from app.utils.geo import Grid, clamp, haversine_km
+from app.utils.cache import LRUCache
+from app.utils.geo import Grid, distance_raster_km, haversine_km
+from app.utils.layer import Layer
 
 
 FIRE_SEED_ZONES = [
@@ -21,141 +26,213 @@ URBAN_CENTERS = [
 ]
 
 
+# Static layers are generated as of this fixed instant so they stay the same
+# for every requested time.
+STATIC_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    values.flags.writeable = False
+    return values
+
+
+# SplitMix64 constants for the lattice noise hash.
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_LATTICE_MIX = np.uint64(0xD1B54A32D192ED03)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _bbox_key(bbox: BBox) -> Tuple[float, float, float, float]:
+    return (bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat)
+
+
+# Elementwise math.exp, so array code reproduces the scalar generator exactly.
+_exp = np.frompyfunc(math.exp, 1, 1)
+
+
 class SyntheticProvider(BaseProvider):
-    def __init__(self, seed: int = 42) -> None:
+    """
+    Deterministic synthetic layers seeded from (seed, bbox, when). Static
+    layers (slope, fuel type, population, infrastructure) are seeded from
+    STATIC_EPOCH instead of when.
+
+    Noise is hashed per cell of the global lattice at the grid's resolution,
+    so a cell's values do not depend on which grid it was requested in, and
+    smooth terms and distances are computed with broadcasting. legacy_exact=True switches back to the original
+    per-cell random.Random / math generator, which reproduces the historical
+    sequences value for value and is kept for regression tests; it seeds
+    every layer from when and so reports no static layers. Storm cells use
+    the same seeded sequence in both modes.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, seed: int = 42, legacy_exact: bool = False) -> None:
         self.seed = seed
+        self.legacy_exact = legacy_exact
+        # Shared intermediates (NDVI, fire bump, city distances) are derived
+        # several times per compute_layers call; compute each only once.
+        self._memo = LRUCache(maxsize=16)
+        # Layers may be fetched from several threads at once. Each shared
+        # intermediate is built once, under a lock of its own, so threads
+        # building different intermediates run side by side.
+        self._memo_lock = threading.Lock()
+        self._building: Dict[Hashable, threading.Lock] = {}
 
-    def _rng(self, bbox: BBox, when: datetime) -> random.Random:
-        seed = (
+    @property
+    def static_layers(self) -> FrozenSet[str]:
+        return frozenset() if self.legacy_exact else STATIC_LAYERS
+
+    def static_version(self) -> Hashable:
+        return self.seed
+
+    def _static_when(self, when: datetime) -> datetime:
+        return when if self.legacy_exact else STATIC_EPOCH
+
+    def _memoized(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        missing = object()
+        value = self._memo.get(key, missing)
+        if value is not missing:
+            return value
+        with self._memo_lock:
+            lock = self._building.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                return self._memo.get_or_create(key, factory)
+        finally:
+            with self._memo_lock:
+                if self._building.get(key) is lock:
+                    del self._building[key]
+
+    def _grid_key(self, grid: Grid) -> Tuple:
+        bbox = grid.bbox
+        return (bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat, grid.resolution_deg, grid.rows, grid.cols)
+
+    def _seed(self, bbox: BBox, when: datetime) -> int:
+        return (
             self.seed
             + int(when.timestamp())
             + int(bbox.min_lat * 100)
             + int(bbox.min_lon * 100)
         )
-        return random.Random(seed)
-
-    def _field(self, grid: Grid, when: datetime, base: float, amp: float, freq: float, noise: float) -> List[List[float]]:
-        rng = self._rng(grid.bbox, when)
-        values = []
-        for lat in grid.lats:
-            row = []
-            for lon in grid.lons:
-                pattern = (math.sin(lat * freq) + math.cos(lon * freq)) / 2
-                value = base + amp * pattern + rng.uniform(-noise, noise)
-                row.append(value)
-            values.append(row)
-        return values
 
-    def _gaussian_bump_field(self, grid: Grid, centers: List[tuple], sigma_km: float) -> List[List[float]]:
+    def _rng(self, bbox: BBox, when: datetime) -> random.Random:
+        return random.Random(self._seed(bbox, when))
+
+    def _unit_noise(self, bbox: BBox, when: datetime, grid: Grid) -> np.ndarray:
+        """
+        Uniform [0, 1) draws hashed from the (bbox, when) seed and each cell's
+        index on the global lattice at the grid's resolution. A cell gets the
+        same draw whichever grid, window or tile it is requested through.
+        """
+
+        def build() -> np.ndarray:
+            res = grid.resolution_deg
+            rows = np.floor((grid.lat_array + 90.0) / res).astype(np.int64).astype(np.uint64)
+            cols = np.floor((grid.lon_array + 180.0) / res).astype(np.int64).astype(np.uint64)
+            z = np.uint64(self._seed(bbox, when) % (1 << 64))
+            # SplitMix64 over the cell's lattice position.
+            z = z + rows[:, None] * _GOLDEN + cols[None, :] * _LATTICE_MIX
+            z = (z ^ (z >> np.uint64(30))) * _MIX_1
+            z = (z ^ (z >> np.uint64(27))) * _MIX_2
+            z ^= z >> np.uint64(31)
+            return _read_only((z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53)
+
+        return self._memoized(("noise", _bbox_key(bbox), when.timestamp(), self._grid_key(grid)), build)
+
+    def _noise(self, bbox: BBox, when: datetime, low: float, high: float, grid: Grid) -> np.ndarray:
+        if self.legacy_exact:
+            # Draw in row-major order so each cell keeps its place in the seeded sequence.
+            rng = self._rng(bbox, when)
+            draws = [rng.uniform(low, high) for _ in range(grid.rows * grid.cols)]
+            return np.array(draws, dtype=np.float64).reshape(grid.rows, grid.cols)
+        return low + (high - low) * self._unit_noise(bbox, when, grid)
+
+    def _field(
+        self, bbox: BBox, grid: Grid, when: datetime, base: float, amp: float, freq: float, noise: float
+    ) -> np.ndarray:
+        if self.legacy_exact:
+            lat_wave = np.array([math.sin(lat * freq) for lat in grid.lats], dtype=np.float64)
+            lon_wave = np.array([math.cos(lon * freq) for lon in grid.lons], dtype=np.float64)
+        else:
+            lat_wave = np.sin(grid.lat_array * freq)
+            lon_wave = np.cos(grid.lon_array * freq)
+        pattern = (lat_wave[:, None] + lon_wave[None, :]) / 2
+        # The legacy generator seeded fields from the grid's own bbox.
+        seed_bbox = grid.bbox if self.legacy_exact else bbox
+        return base + amp * pattern + self._noise(seed_bbox, when, -noise, noise, grid)
+
+    def _gaussian_bump_field(self, grid: Grid, centers: List[tuple], sigma_km: float) -> np.ndarray:
         if not centers:
-            return [[0.0 for _ in grid.lons] for _ in grid.lats]
+            return np.zeros((grid.rows, grid.cols), dtype=np.float64)
+
+        if not self.legacy_exact:
+            dist = self._distances(grid, centers)
+            return np.exp(-((dist ** 2) / (2 * (sigma_km ** 2)))).mean(axis=0)
 
-        values = []
-        for lat in grid.lats:
-            row = []
-            for lon in grid.lons:
+        values = np.empty((grid.rows, grid.cols), dtype=np.float64)
+        for r_idx, lat in enumerate(grid.lats):
+            for c_idx, lon in enumerate(grid.lons):
                 bump = 0.0
                 for c_lat, c_lon in centers:
                     dist = haversine_km(lat, lon, c_lat, c_lon)
                     bump += math.exp(-((dist ** 2) / (2 * (sigma_km ** 2))))
-                bump /= len(centers)
-                row.append(bump)
-            values.append(row)
+                values[r_idx, c_idx] = bump / len(centers)
         return values
 
-    def _fire_bump(self, grid: Grid) -> List[List[float]]:
-        return self._gaussian_bump_field(grid, FIRE_SEED_ZONES, sigma_km=40.0)
+    def _fire_bump(self, grid: Grid) -> np.ndarray:
+        return self._memoized(
+            ("fire_bump", self._grid_key(grid)),
+            lambda: _read_only(self._gaussian_bump_field(grid, FIRE_SEED_ZONES, sigma_km=40.0)),
+        )
 
-    def get_ndvi(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        values = self._field(grid, when, base=0.6, amp=0.25, freq=0.5, noise=0.08)
+    def get_ndvi(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        return self._memoized(
+            ("ndvi", _bbox_key(bbox), self._grid_key(grid), when.timestamp()), lambda: self._ndvi(bbox, grid, when)
+        )
+
+    def _ndvi(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        values = self._field(bbox, grid, when, base=0.6, amp=0.25, freq=0.5, noise=0.08)
         bump = self._fire_bump(grid)
-        out = []
-        for r_idx, row in enumerate(values):
-            out_row = []
-            for c_idx, v in enumerate(row):
-                out_row.append(clamp(v + bump[r_idx][c_idx] * 0.25, 0.0, 1.0))
-            out.append(out_row)
-        return out
-
-    def get_slope(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        values = self._field(grid, when, base=20.0, amp=15.0, freq=0.8, noise=4.0)
+        return Layer(grid, _read_only(np.clip(values + bump * 0.25, 0.0, 1.0)))
+
+    def get_slope(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        when = self._static_when(when)
+        values = self._field(bbox, grid, when, base=20.0, amp=15.0, freq=0.8, noise=4.0)
         bump = self._fire_bump(grid)
-        out = []
-        for r_idx, row in enumerate(values):
-            out_row = []
-            for c_idx, v in enumerate(row):
-                out_row.append(clamp(abs(v) + bump[r_idx][c_idx] * 15.0, 0.0, 60.0))
-            out.append(out_row)
-        return out
-
-    def get_fuel_type(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        ndvi = self.get_ndvi(bbox, grid, when)
-        rng = self._rng(bbox, when)
+        return Layer(grid, np.clip(np.abs(values) + bump * 15.0, 0.0, 60.0))
+
+    def get_fuel_type(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        when = self._static_when(when)
+        ndvi = self.get_ndvi(bbox, grid, when).values
         bump = self._fire_bump(grid)
-        fuel = []
-        for r_idx, row in enumerate(ndvi):
-            fuel_row = []
-            for c_idx, v in enumerate(row):
-                combustibility = clamp(
-                    0.4 + 0.5 * v + bump[r_idx][c_idx] * 0.2 + rng.uniform(-0.07, 0.07),
-                    0.0,
-                    1.0,
-                )
-                fuel_row.append(combustibility)
-            fuel.append(fuel_row)
-        return fuel
+        combustibility = 0.4 + 0.5 * ndvi + bump * 0.2 + self._noise(bbox, when, -0.07, 0.07, grid)
+        return Layer(grid, np.clip(combustibility, 0.0, 1.0))
 
-    def get_cape(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        values = self._field(grid, when, base=800.0, amp=1200.0, freq=0.6, noise=200.0)
-        return [[clamp(v, 0.0, 3000.0) for v in row] for row in values]
+    def get_cape(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        values = self._field(bbox, grid, when, base=800.0, amp=1200.0, freq=0.6, noise=200.0)
+        return Layer(grid, np.clip(values, 0.0, 3000.0))
 
-    def get_dewpoint_depression(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        ndvi = self.get_ndvi(bbox, grid, when)
-        rng = self._rng(bbox, when)
-        dep = []
-        for row in ndvi:
-            dep_row = []
-            for v in row:
-                value = clamp(5.0 + 20.0 * v + rng.uniform(-2.0, 2.0), 0.0, 30.0)
-                dep_row.append(value)
-            dep.append(dep_row)
-        return dep
-
-    def get_cloud_base_height(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        dep = self.get_dewpoint_depression(bbox, grid, when)
-        rng = self._rng(bbox, when)
-        cbh = []
-        for row in dep:
-            cbh_row = []
-            for v in row:
-                value = clamp(1.0 + (v / 30.0) * 3.5 + rng.uniform(-0.3, 0.3), 0.5, 5.0)
-                cbh_row.append(value)
-            cbh.append(cbh_row)
-        return cbh
-
-    def get_low_level_rh(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        ndvi = self.get_ndvi(bbox, grid, when)
-        rng = self._rng(bbox, when)
-        rh = []
-        for row in ndvi:
-            rh_row = []
-            for v in row:
-                value = clamp(80.0 - 50.0 * v + rng.uniform(-5.0, 5.0), 10.0, 100.0)
-                rh_row.append(value)
-            rh.append(rh_row)
-        return rh
-
-    def get_precip_efficiency(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
-        ndvi = self.get_ndvi(bbox, grid, when)
-        rng = self._rng(bbox, when)
-        eff = []
-        for row in ndvi:
-            eff_row = []
-            for v in row:
-                value = clamp(0.7 - 0.4 * v + rng.uniform(-0.05, 0.05), 0.05, 0.9)
-                eff_row.append(value)
-            eff.append(eff_row)
-        return eff
+    def get_dewpoint_depression(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        ndvi = self.get_ndvi(bbox, grid, when).values
+        values = 5.0 + 20.0 * ndvi + self._noise(bbox, when, -2.0, 2.0, grid)
+        return Layer(grid, np.clip(values, 0.0, 30.0))
+
+    def get_cloud_base_height(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        dep = self.get_dewpoint_depression(bbox, grid, when).values
+        values = 1.0 + (dep / 30.0) * 3.5 + self._noise(bbox, when, -0.3, 0.3, grid)
+        return Layer(grid, np.clip(values, 0.5, 5.0))
+
+    def get_low_level_rh(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        ndvi = self.get_ndvi(bbox, grid, when).values
+        values = 80.0 - 50.0 * ndvi + self._noise(bbox, when, -5.0, 5.0, grid)
+        return Layer(grid, np.clip(values, 10.0, 100.0))
+
+    def get_precip_efficiency(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
+        ndvi = self.get_ndvi(bbox, grid, when).values
+        values = 0.7 - 0.4 * ndvi + self._noise(bbox, when, -0.05, 0.05, grid)
+        return Layer(grid, np.clip(values, 0.05, 0.9))
 
     def _city_centers(self, bbox: BBox, when: datetime, count: int) -> List[tuple]:
         centers = [
@@ -167,33 +244,38 @@ class SyntheticProvider(BaseProvider):
             return centers
         return [((bbox.min_lat + bbox.max_lat) / 2, (bbox.min_lon + bbox.max_lon) / 2)]
 
-    def get_population_proximity(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
+    def _distances(self, grid: Grid, centers: List[tuple]) -> np.ndarray:
+        # (len(centers), rows, cols) great-circle distances in km.
+        return np.stack([distance_raster_km(grid, c_lat, c_lon) for c_lat, c_lon in centers])
+
+    def _city_distances(self, grid: Grid, centers: List[tuple]) -> np.ndarray:
+        def build() -> np.ndarray:
+            if not self.legacy_exact:
+                return _read_only(self._distances(grid, centers))
+            dist = np.empty((len(centers), grid.rows, grid.cols), dtype=np.float64)
+            for k, (c_lat, c_lon) in enumerate(centers):
+                for r_idx, lat in enumerate(grid.lats):
+                    for c_idx, lon in enumerate(grid.lons):
+                        dist[k, r_idx, c_idx] = haversine_km(lat, lon, c_lat, c_lon)
+            return _read_only(dist)
+
+        return self._memoized(("city_distances", self._grid_key(grid), tuple(centers)), build)
+
+    def _proximity_field(self, grid: Grid, centers: List[tuple], scale_km: float) -> np.ndarray:
+        dist = self._city_distances(grid, centers)
+        if self.legacy_exact:
+            scores = _exp(-dist / scale_km).astype(np.float64)
+        else:
+            scores = np.exp(-dist / scale_km)
+        return np.clip(scores.sum(axis=0) / len(centers), 0.0, 1.0)
+
+    def get_population_proximity(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
         centers = self._city_centers(bbox, when, count=4)
-        values = []
-        for lat in grid.lats:
-            row = []
-            for lon in grid.lons:
-                scores = []
-                for c_lat, c_lon in centers:
-                    dist = haversine_km(lat, lon, c_lat, c_lon)
-                    scores.append(math.exp(-dist / 60.0))
-                row.append(clamp(sum(scores) / len(scores), 0.0, 1.0))
-            values.append(row)
-        return values
+        return Layer(grid, self._proximity_field(grid, centers, scale_km=60.0))
 
-    def get_infrastructure_density(self, bbox: BBox, grid: Grid, when: datetime) -> List[List[float]]:
+    def get_infrastructure_density(self, bbox: BBox, grid: Grid, when: datetime) -> Layer:
         centers = self._city_centers(bbox, when, count=3)
-        values = []
-        for lat in grid.lats:
-            row = []
-            for lon in grid.lons:
-                scores = []
-                for c_lat, c_lon in centers:
-                    dist = haversine_km(lat, lon, c_lat, c_lon)
-                    scores.append(math.exp(-dist / 40.0))
-                row.append(clamp(sum(scores) / len(scores), 0.0, 1.0))
-            values.append(row)
-        return values
+        return Layer(grid, self._proximity_field(grid, centers, scale_km=40.0))
 
     def get_storm_cells(self, bbox: BBox, when: datetime) -> List[StormCell]:
         rng = self._rng(bbox, when)
@@ -0,0 +1,157 @@
+import math
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from app.config import AppConfig
+from app.engine.collision import continuous_contact_hours, hourly_contact_hours
+from app.engine.scoring import ScoredLayers, StaticScores
+from app.models import BBox, StormCell
+from app.utils.geo import EARTH_RADIUS_KM, Grid
+from app.utils.layer import Layer
+
+KM_PER_DEG = EARTH_RADIUS_KM * math.pi / 180.0
+
+Window = Tuple[slice, slice]
+
+
+def coarse_grid(fine: Grid, factor: int) -> Grid:
+    """
+    Grid whose cell (i, j) is the block of fine rows i*factor.. and fine
+    columns j*factor... Blocks along the top and right edges may overhang the
+    bbox so that every fine cell belongs to exactly one block.
+    """
+    if factor < 1:
+        raise ValueError("adaptive_coarse_factor must be at least 1")
+    bbox = fine.bbox
+    resolution = fine.resolution_deg * factor
+    rows = -(-fine.rows // factor)
+    cols = -(-fine.cols // factor)
+    lats = [bbox.min_lat + resolution * (i + 0.5) for i in range(rows)]
+    lons = [bbox.min_lon + resolution * (j + 0.5) for j in range(cols)]
+    return Grid(bbox=bbox, resolution_deg=resolution, lats=lats, lons=lons, rows=rows, cols=cols)
+
+
+def window_grid(fine: Grid, window: Window) -> Grid:
+    """The fine cells in window as a standalone grid over its own bbox."""
+    rows, cols = window
+    res = fine.resolution_deg
+    bbox = BBox(
+        min_lon=fine.bbox.min_lon + res * cols.start,
+        min_lat=fine.bbox.min_lat + res * rows.start,
+        max_lon=fine.bbox.min_lon + res * cols.stop,
+        max_lat=fine.bbox.min_lat + res * rows.stop,
+    )
+    return Grid(
+        bbox=bbox,
+        resolution_deg=res,
+        lats=fine.lats[rows],
+        lons=fine.lons[cols],
+        rows=rows.stop - rows.start,
+        cols=cols.stop - cols.start,
+    )
+
+
+def severity_upper_bound(static: StaticScores, config: AppConfig) -> np.ndarray:
+    """
+    Highest severity each cell could reach whatever its dynamic inputs: the
+    static fuel and consequence terms as they are, with NDVI and the
+    atmospheric score at their clipped maximum of 1.
+    """
+    fuel = np.clip(config.fuel_ndvi_weight + static.fuel_slope.values + static.fuel_type.values, 0.0, 1.0)
+    return (
+        config.fuel_layer_weight * fuel
+        + config.atmospheric_layer_weight
+        + config.consequence_layer_weight * static.consequence.values
+    )
+
+
+def block_max(values: np.ndarray, factor: int) -> np.ndarray:
+    """Maximum of each factor x factor block, shaped like coarse_grid's lattice."""
+    rows, cols = values.shape
+    padded = np.full((-(-rows // factor) * factor, -(-cols // factor) * factor), -np.inf)
+    padded[:rows, :cols] = values
+    return padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor).max(axis=(1, 3))
+
+
+def refinement_mask(
+    coarse: Grid,
+    upper_bound: np.ndarray,
+    storm_cells: List[StormCell],
+    config: AppConfig,
+    threshold: float,
+) -> np.ndarray:
+    """
+    Blocks that could hold a threat: the block's severity upper bound (see
+    severity_upper_bound and block_max) reaches the threshold and some storm
+    disc, widened by the block's half-diagonal, reaches the block centre
+    within the horizon under the configured collision_mode. The padded disc
+    covers every fine cell centre in the block, so no threat is ever left in
+    an unrefined block.
+    """
+    candidate = upper_bound >= threshold
+    # 1% over the flat half-diagonal absorbs the curvature terms it ignores.
+    pad_km = 1.01 * coarse.resolution_deg * KM_PER_DEG * math.sqrt(2.0) / 2.0
+    if config.collision_mode == "hourly":
+        contact = hourly_contact_hours(coarse, candidate, storm_cells, config.horizon_hours, pad_km=pad_km)
+    else:
+        contact = continuous_contact_hours(coarse, candidate, storm_cells, config.horizon_hours, pad_km=pad_km)
+    return np.isfinite(contact)
+
+
+def refined_windows(mask: np.ndarray, factor: int, fine_shape: Tuple[int, int]) -> List[Window]:
+    """
+    Fine-grid windows covering the refined blocks. Each horizontal run of
+    adjacent refined blocks becomes a window, and runs spanning the same
+    columns on consecutive block rows are merged, so every window is fetched
+    and scored in one provider round trip.
+    """
+    fine_rows, fine_cols = fine_shape
+    windows: List[Window] = []
+    open_runs: Dict[Tuple[int, int], int] = {}
+    for i in range(mask.shape[0] + 1):
+        runs = set()
+        if i < mask.shape[0]:
+            padded = np.concatenate(([False], mask[i], [False])).astype(np.int8)
+            edges = np.flatnonzero(np.diff(padded))
+            runs = {(int(start), int(stop)) for start, stop in zip(edges[::2], edges[1::2])}
+        for run in sorted(set(open_runs) - runs):
+            first = open_runs.pop(run)
+            windows.append(
+                (
+                    slice(first * factor, min(i * factor, fine_rows)),
+                    slice(run[0] * factor, min(run[1] * factor, fine_cols)),
+                )
+            )
+        for run in runs:
+            open_runs.setdefault(run, i)
+    return windows
+
+
+def window_static(static: StaticScores, grid: Grid, window: Window) -> StaticScores:
+    """The static terms of the cells in window, on the window's own grid."""
+    return StaticScores(
+        fuel_slope=Layer(grid, static.fuel_slope.values[window]),
+        fuel_type=Layer(grid, static.fuel_type.values[window]),
+        consequence=Layer(grid, static.consequence.values[window]),
+    )
+
+
+def refine(
+    fine: Grid,
+    windows: List[Window],
+    score_windows: Callable[[List[Grid], List[Window]], List[ScoredLayers]],
+) -> ScoredLayers:
+    """
+    Score only the given windows at full resolution, all in one call of
+    score_windows so their inputs can be fetched in a single batch, and
+    assemble fine-grid layers from them. Cells outside every window score
+    zero, so they never reach the threat threshold.
+    """
+    shape = (fine.rows, fine.cols)
+    planes = {name: np.zeros(shape) for name in ("fuel", "atmospheric", "consequence", "severity")}
+    grids = [window_grid(fine, window) for window in windows]
+    for window, scores in zip(windows, score_windows(grids, windows)):
+        for name, plane in planes.items():
+            plane[window] = getattr(scores, name).values
+    return ScoredLayers(**{name: Layer(fine, plane) for name, plane in planes.items()})
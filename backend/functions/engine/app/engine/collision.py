@@ -1,17 +1,20 @@
 import math
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
 
 from app.config import AppConfig
+from app.engine.scoring import ScoredLayers
 from app.models import StormCell
 from app.utils.geo import (
-    CALIFORNIA_LAND_POLYGON,
+    EARTH_RADIUS_KM,
     Grid,
     cell_polygon,
     grid_cell_id,
-    haversine_km,
-    destination_point,
-    point_in_polygon,
+    haversine_km_array,
+    destination_points,
 )
+from app.utils.landmask import land_mask
 
 
 def priority_score(severity: float, time_to_collision_hours: float) -> float:
@@ -28,88 +31,236 @@ def priority_label(score: float, config: AppConfig) -> str:
     return "low"
 
 
-def detect_collisions(
+def _index_range(start: float, step: float, count: int, lo: float, hi: float) -> slice:
+    # Cell i is centred at start + step * (i + 0.5); keep one cell of slack
+    # on each side so rounding never drops a centre that lies inside [lo, hi].
+    first = math.ceil((lo - start) / step - 0.5) - 1
+    last = math.floor((hi - start) / step - 0.5) + 1
+    return slice(max(first, 0), min(last + 1, count))
+
+
+def footprint_window(grid: Grid, lat: float, lon: float, radius_km: float) -> Tuple[slice, slice]:
+    """
+    Row and column slices of the grid cells whose centres can fall inside a
+    disc of radius_km around (lat, lon). The window is conservative; callers
+    still test each cell in it against the exact distance.
+    """
+    angular = radius_km / EARTH_RADIUS_KM
+    lat_pad = math.degrees(angular)
+    rows = _index_range(grid.bbox.min_lat, grid.resolution_deg, grid.rows, lat - lat_pad, lat + lat_pad)
+
+    if abs(lat) + lat_pad >= 90.0 or angular >= math.pi / 2:
+        return rows, slice(0, grid.cols)
+    lon_pad = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+    cols = _index_range(grid.bbox.min_lon, grid.resolution_deg, grid.cols, lon - lon_pad, lon + lon_pad)
+    return rows, cols
+
+
+def project_storms(storm_cells: List[StormCell], hours: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Storm centres after each of hours, shaped (len(storm_cells), len(hours))."""
+    lat0 = np.array([cell.center_lat for cell in storm_cells], dtype=np.float64)[:, None]
+    lon0 = np.array([cell.center_lon for cell in storm_cells], dtype=np.float64)[:, None]
+    bearing = np.array([cell.bearing_deg for cell in storm_cells], dtype=np.float64)[:, None]
+    speed = np.array([cell.speed_kmh for cell in storm_cells], dtype=np.float64)[:, None]
+    return destination_points(lat0, lon0, bearing, speed * np.asarray(hours, dtype=np.float64)[None, :])
+
+
+def hourly_contact_hours(
+    grid: Grid,
+    eligible: np.ndarray,
+    storm_cells: List[StormCell],
+    horizon_hours: int,
+    pad_km: float = 0.0,
+) -> np.ndarray:
+    """
+    Earliest whole hour (1..horizon_hours) at which a projected storm disc
+    covers each eligible cell centre; inf where no storm arrives in time.
+    pad_km widens the discs.
+    """
+    earliest = np.full((grid.rows, grid.cols), np.inf)
+    if not storm_cells or horizon_hours < 1:
+        return earliest
+
+    lats = grid.lat_array
+    lons = grid.lon_array
+    hours = np.arange(1, horizon_hours + 1, dtype=np.float64)
+    proj_lats, proj_lons = project_storms(storm_cells, hours)
+
+    for h_idx, hour in enumerate(range(1, horizon_hours + 1)):
+        for k, cell in enumerate(storm_cells):
+            p_lat, p_lon = float(proj_lats[k, h_idx]), float(proj_lons[k, h_idx])
+            radius = cell.radius_km + pad_km
+            rows, cols = footprint_window(grid, p_lat, p_lon, radius)
+            if rows.start >= rows.stop or cols.start >= cols.stop:
+                continue
+
+            dist = haversine_km_array(lats[rows, None], lons[None, cols], p_lat, p_lon)
+            window = earliest[rows, cols]
+            window[(dist <= radius) & eligible[rows, cols] & np.isinf(window)] = hour
+
+    return earliest
+
+
+def _local_offsets_km(lats: np.ndarray, lons: np.ndarray, lat: float, lon: float) -> Tuple[np.ndarray, np.ndarray]:
+    # East/north offsets (km) of (lat, lon) on a plane centred at each of the
+    # given points, preserving the exact great-circle distance and bearing.
+    dist = haversine_km_array(lats, lons, lat, lon)
+    lat1 = np.radians(lats)
+    lat2 = math.radians(lat)
+    dlon = np.radians(lon - lons)
+    bearing = np.arctan2(
+        np.sin(dlon) * math.cos(lat2),
+        np.cos(lat1) * math.sin(lat2) - np.sin(lat1) * math.cos(lat2) * np.cos(dlon),
+    )
+    return dist * np.sin(bearing), dist * np.cos(bearing)
+
+
+def continuous_contact_hours(
+    grid: Grid,
+    eligible: np.ndarray,
+    storm_cells: List[StormCell],
+    horizon_hours: float,
+    pad_km: float = 0.0,
+) -> np.ndarray:
+    """
+    Fractional time in hours (0..horizon_hours) at which each eligible cell
+    centre first falls inside a moving storm disc; inf where it never does.
+
+    Each cell sees the storm on a locally flat plane centred on the cell, so
+    "the disc reaches the cell" becomes a quadratic in t that is solved for
+    every cell at once. pad_km widens the discs.
+    """
+    earliest = np.full((grid.rows, grid.cols), np.inf)
+    rows, cols = np.nonzero(eligible)
+    if rows.size == 0:
+        return earliest
+
+    lats = grid.lat_array[rows]
+    lons = grid.lon_array[cols]
+    best = np.full(rows.size, np.inf)
+    if not storm_cells:
+        return earliest
+    track_hours = max(float(horizon_hours), 1.0)
+    end_lats, end_lons = project_storms(storm_cells, np.array([track_hours]))
+
+    for k, cell in enumerate(storm_cells):
+        radius = cell.radius_km + pad_km
+        # Only cells near the track can be reached. A cell's plane stretches
+        # distances by at most rho / sin(rho) (rho: angular distance from the
+        # cell), which stays under 2 well past any storm's reach, so the track
+        # spans under twice its length there and a reachable cell lies within
+        # radius + 2 * track length of the start.
+        reach_km = radius + 2.0 * cell.speed_kmh * track_hours
+        if reach_km < EARTH_RADIUS_KM:
+            row_window, col_window = footprint_window(grid, cell.center_lat, cell.center_lon, reach_km)
+            near = np.flatnonzero(
+                (rows >= row_window.start)
+                & (rows < row_window.stop)
+                & (cols >= col_window.start)
+                & (cols < col_window.stop)
+            )
+        else:
+            near = np.arange(rows.size)
+        if near.size == 0:
+            continue
+
+        # Place the storm's start and end-of-track positions on a flat plane
+        # centred on each grid cell (exact distance and bearing from the cell)
+        # and let the storm move in a straight line between them.
+        end_lat, end_lon = float(end_lats[k, 0]), float(end_lons[k, 0])
+        sx, sy = _local_offsets_km(lats[near], lons[near], cell.center_lat, cell.center_lon)
+        ex, ey = _local_offsets_km(lats[near], lons[near], end_lat, end_lon)
+        vx = (ex - sx) / track_hours
+        vy = (ey - sy) / track_hours
+
+        # |s + v t|^2 = r^2  ->  a t^2 - 2 b t + c = 0
+        a = vx * vx + vy * vy
+        b = -(sx * vx + sy * vy)
+        c = sx * sx + sy * sy - radius * radius
+
+        disc = b * b - a * c
+        approaching = (c > 0.0) & (a > 0.0) & (disc >= 0.0) & (b > 0.0)
+        t_in = (b - np.sqrt(np.where(approaching, disc, 0.0))) / np.where(approaching, a, 1.0)
+        hit = np.where(c <= 0.0, 0.0, np.inf)
+        hit = np.where(approaching & (t_in <= horizon_hours), t_in, hit)
+        best[near] = np.minimum(best[near], hit)
+
+    earliest[rows, cols] = best
+    return earliest
+
+
+def contact_raster(
     grid: Grid,
-    fuel_score: List[List[float]],
-    atmo_score: List[List[float]],
-    consequence_weight: List[List[float]],
+    scores: ScoredLayers,
     storm_cells: List[StormCell],
     config: AppConfig,
     threshold: float,
-) -> Dict:
-    rows, cols = grid.rows, grid.cols
-
-    severity = []
-    for r in range(rows):
-        row = []
-        for c in range(cols):
-            value = (
-                config.fuel_layer_weight * fuel_score[r][c]
-                + config.atmospheric_layer_weight * atmo_score[r][c]
-                + config.consequence_layer_weight * consequence_weight[r][c]
-            )
-            row.append(value)
-        severity.append(row)
-
-    earliest = [[None for _ in range(cols)] for _ in range(rows)]
-
-    for hour in range(1, config.horizon_hours + 1):
-        projected = []
-        for cell in storm_cells:
-            distance_km = cell.speed_kmh * hour
-            proj_lat, proj_lon = destination_point(cell.center_lat, cell.center_lon, cell.bearing_deg, distance_km)
-            projected.append((proj_lat, proj_lon, cell.radius_km))
-
-        for r, lat in enumerate(grid.lats):
-            for c, lon in enumerate(grid.lons):
-                if earliest[r][c] is not None:
-                    continue
-                if severity[r][c] < threshold:
-                    continue
-                for p_lat, p_lon, radius in projected:
-                    if haversine_km(lat, lon, p_lat, p_lon) <= radius:
-                        earliest[r][c] = hour
-                        break
-
-    features = []
-    for r, lat in enumerate(grid.lats):
-        for c, lon in enumerate(grid.lons):
-            time_to_collision = earliest[r][c]
-            if time_to_collision is None:
-                continue
+) -> np.ndarray:
+    """Earliest storm contact (hours) for every on-land cell at or above threshold; inf elsewhere."""
+    on_land = land_mask(grid).inside
+    eligible = (scores.severity.values >= threshold) & on_land
+    if config.collision_mode == "hourly":
+        return hourly_contact_hours(grid, eligible, storm_cells, config.horizon_hours)
+    if config.collision_mode == "continuous":
+        return continuous_contact_hours(grid, eligible, storm_cells, config.horizon_hours)
+    raise ValueError(f"Unknown collision_mode: {config.collision_mode}")
 
-            sev = severity[r][c]
-            if not point_in_polygon(lon, lat, CALIFORNIA_LAND_POLYGON):
-                continue
 
-            polygon = cell_polygon(lon, lat, grid.resolution_deg)
-            if not all(point_in_polygon(p_lon, p_lat, CALIFORNIA_LAND_POLYGON) for p_lon, p_lat in polygon):
-                continue
+def iter_threat_features(
+    grid: Grid,
+    scores: ScoredLayers,
+    earliest: np.ndarray,
+    config: AppConfig,
+) -> Iterator[Dict]:
+    """
+    Yield threat features for the cells hit in earliest, highest priority
+    first. Only the per-cell sort keys are held in memory; each feature dict
+    is built as it is consumed.
+    """
+    fuel = scores.fuel.values
+    atmo = scores.atmospheric.values
+    consequence = scores.consequence.values
+    severity = scores.severity.values
+
+    cells = [(int(r), int(c)) for r, c in np.argwhere(np.isfinite(earliest))]
+    # Sort on the rounded score that ends up in the feature; the sort is
+    # stable, so ties keep row-major order.
+    keys = [round(priority_score(float(severity[r, c]), float(earliest[r, c])), 4) for r, c in cells]
+    order = sorted(range(len(cells)), key=keys.__getitem__, reverse=True)
+
+    for idx in order:
+        r, c = cells[idx]
+        lat, lon = grid.lats[r], grid.lons[c]
+        contact = float(earliest[r, c])
+        if config.collision_mode == "hourly":
+            time_to_collision = int(contact)
+            forecast_hour = time_to_collision
+        else:
+            time_to_collision = round(contact, 3)
+            forecast_hour = math.ceil(contact)
+
+        sev = float(severity[r, c])
+        polygon = cell_polygon(lon, lat, grid.resolution_deg)
+        prio_score = priority_score(sev, contact)
+        label = priority_label(prio_score, config)
+        if consequence[r, c] < 0.05:
+            label = "low"
+        yield {
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [polygon],
+            },
+            "properties": {
+                "cell_id": grid_cell_id(r, c),
+                "severity_score": round(sev, 4),
+                "priority_score": round(prio_score, 4),
+                "time_to_collision_hours": time_to_collision,
+                "response_priority": label,
+                "fuel_score": round(float(fuel[r, c]), 4),
+                "atmo_score": round(float(atmo[r, c]), 4),
+                "consequence_weight": round(float(consequence[r, c]), 4),
+                "forecast_hour": forecast_hour,
+            },
+        }
 
-            prio_score = priority_score(sev, time_to_collision)
-            label = priority_label(prio_score, config)
-            if consequence_weight[r][c] < 0.05:
-                label = "low"
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Polygon",
-                    "coordinates": [polygon],
-                },
-                "properties": {
-                    "cell_id": grid_cell_id(r, c),
-                    "severity_score": round(sev, 4),
-                    "priority_score": round(prio_score, 4),
-                    "time_to_collision_hours": time_to_collision,
-                    "response_priority": label,
-                    "fuel_score": round(fuel_score[r][c], 4),
-                    "atmo_score": round(atmo_score[r][c], 4),
-                    "consequence_weight": round(consequence_weight[r][c], 4),
-                    "forecast_hour": time_to_collision,
-                },
-            }
-            features.append(feature)
-
-    features.sort(key=lambda f: f["properties"]["priority_score"], reverse=True)
-
-    return {"type": "FeatureCollection", "features": features}
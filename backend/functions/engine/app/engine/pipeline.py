@@ -1,52 +1,510 @@
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from app.config import AppConfig
 from app.data import get_provider
-from app.engine.atmospheric import score_atmospheric
-from app.engine.consequence import score_consequence
-from app.engine.collision import detect_collisions
-from app.engine.fuel import score_fuel
+from app.data.base import DYNAMIC_LAYERS, STATIC_LAYERS
+from app.engine.adaptive import (
+    Window,
+    block_max,
+    coarse_grid,
+    refine,
+    refined_windows,
+    refinement_mask,
+    severity_upper_bound,
+    window_static,
+)
+from app.engine.collision import contact_raster, iter_threat_features
+from app.engine.routing import RoutingState, plan_routes
+from app.engine.scoring import ScoredLayers, StaticScores, score_dynamic, score_static
 from app.models import BBox, StormCell
-from app.utils.geo import Grid, generate_grid
+from app.utils.cache import LRUCache
+from app.utils.geo import Grid, generate_grid, lattice_grid
 from app.utils.time import to_iso
 
+# In-process caches for repeated identical requests (e.g. a dashboard refresh
+# hitting several endpoints that all run the default scenario).
+LAYER_CACHE_SIZE = 64
+LAYER_CACHE_TTL_SECONDS = 300.0
+
+_LAYER_CACHE = LRUCache(maxsize=LAYER_CACHE_SIZE, ttl_seconds=LAYER_CACHE_TTL_SECONDS)
+_THREAT_CACHE = LRUCache(maxsize=LAYER_CACHE_SIZE, ttl_seconds=LAYER_CACHE_TTL_SECONDS)
+# Static score terms do not depend on the requested time, so they outlive the
+# per-timestamp caches above and are shared by every step of a replay.
+_STATIC_CACHE = LRUCache(maxsize=LAYER_CACHE_SIZE)
+
+
+# Provider getter for every pipeline input, in the order inputs are reported.
+PROVIDER_INPUTS = {
+    "ndvi": "get_ndvi",
+    "slope": "get_slope",
+    "fuel_type": "get_fuel_type",
+    "cape": "get_cape",
+    "dewpoint_depression": "get_dewpoint_depression",
+    "cloud_base_height": "get_cloud_base_height",
+    "low_level_rh": "get_low_level_rh",
+    "precip_efficiency": "get_precip_efficiency",
+    "population_proximity": "get_population_proximity",
+    "infrastructure_density": "get_infrastructure_density",
+    "storm_cells": "get_storm_cells",
+}
+
+_FETCH_POOLS: Dict[int, ThreadPoolExecutor] = {}
+_FETCH_POOLS_LOCK = threading.Lock()
+# Replay workers outlive a request: spawning them costs far more than a step,
+# and their own caches (static terms, synthetic fields) stay warm between
+# replays.
+_SIMULATE_POOLS: Dict[int, ProcessPoolExecutor] = {}
+_SIMULATE_POOLS_LOCK = threading.Lock()
+
 
-def _require(field, name: str):
+def _require(field, name: str, reason: Optional[str] = None):
     if field is None:
-        raise ValueError(f"{name} unavailable for selected data_mode")
+        detail = f" ({reason})" if reason else ""
+        raise ValueError(f"{name} unavailable for selected data_mode{detail}")
     return field
 
 
+def _fetch_pool(workers: int) -> ThreadPoolExecutor:
+    with _FETCH_POOLS_LOCK:
+        pool = _FETCH_POOLS.get(workers)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="provider-fetch")
+            _FETCH_POOLS[workers] = pool
+        return pool
+
+
+def _retire_fetch_pool(workers: int, pool: ThreadPoolExecutor) -> None:
+    # A timed-out call cannot be stopped and keeps its thread, so the pool it
+    # runs in is replaced rather than left to fill up with stuck threads.
+    # The pool is shared, so this reaches other in-flight requests too, by
+    # design: their running calls finish on the old pool as usual, and their
+    # queued calls are cancelled and resubmitted by their callers to the
+    # replacement. Since timeouts count from a call's start, the move costs
+    # them only the wait for a thread of the new pool.
+    with _FETCH_POOLS_LOCK:
+        if _FETCH_POOLS.get(workers) is pool:
+            del _FETCH_POOLS[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _fetch_concurrently(
+    call: Callable[[Hashable], Any], keys: List[Hashable], workers: int, timeout: float
+) -> Dict[Hashable, Tuple[Any, Optional[str]]]:
+    # {key: (value, failure reason)} for call(key) run on the shared pool.
+    # Each call has timeout seconds from when it starts running, so time
+    # spent queued behind other calls is not charged to it.
+    changed = threading.Condition()
+    started: Dict[Hashable, float] = {}
+
+    def run(key: Hashable):
+        with changed:
+            started[key] = time.monotonic()
+            changed.notify_all()
+        return call(key)
+
+    def notify(_future) -> None:
+        with changed:
+            changed.notify_all()
+
+    pools: Dict[Hashable, ThreadPoolExecutor] = {}
+    futures: Dict[Hashable, Future] = {}
+
+    def submit(key: Hashable) -> None:
+        while True:
+            pools[key] = _fetch_pool(workers)
+            try:
+                futures[key] = pools[key].submit(run, key)
+                break
+            except RuntimeError:
+                # Retired by another request between lookup and submit.
+                continue
+        futures[key].add_done_callback(notify)
+
+    for key in keys:
+        submit(key)
+
+    outcomes: Dict[Hashable, Tuple[Any, Optional[str]]] = {}
+    with changed:
+        while futures:
+            now = time.monotonic()
+            for key, future in list(futures.items()):
+                if future.cancelled():
+                    # Queued on a pool that was retired meanwhile.
+                    submit(key)
+                elif future.done():
+                    del futures[key]
+                    try:
+                        outcomes[key] = (future.result(), None)
+                    except Exception as exc:  # noqa: BLE001 - surfaced as a _require error
+                        outcomes[key] = (None, f"{type(exc).__name__}: {exc}")
+                elif key in started and now - started[key] >= timeout:
+                    del futures[key]
+                    outcomes[key] = (None, f"timed out after {timeout:g}s")
+                    _retire_fetch_pool(workers, pools[key])
+            if any(future.cancelled() for future in futures.values()):
+                continue
+            deadlines = [started[key] + timeout for key in futures if key in started]
+            if futures:
+                changed.wait(max(0.0, min(deadlines) - now) if deadlines else None)
+    return outcomes
+
+
+def _run_calls(call: Callable[[Hashable], Any], keys: List[Hashable], config: AppConfig) -> Dict[Hashable, Tuple[Any, Optional[str]]]:
+    # {key: (value, failure reason)} for call(key), in sequence or on the pool.
+    if config.fetch_workers > 1:
+        return _fetch_concurrently(call, keys, config.fetch_workers, config.fetch_timeout_seconds)
+    outcomes: Dict[Hashable, Tuple[Any, Optional[str]]] = {}
+    for key in keys:
+        try:
+            outcomes[key] = (call(key), None)
+        except Exception as exc:  # noqa: BLE001 - surfaced as a _require error
+            outcomes[key] = (None, f"{type(exc).__name__}: {exc}")
+    return outcomes
+
+
+def _fetch_inputs(
+    provider,
+    bbox: BBox,
+    grid: Grid,
+    when: datetime,
+    names: List[str],
+    config: AppConfig,
+) -> Dict[str, Any]:
+    """
+    Fetch the named provider inputs. With config.fetch_workers > 1 the calls
+    run concurrently on a shared thread pool, and each must finish within
+    config.fetch_timeout_seconds of starting to run. An input that is
+    missing, raises or times out is reported through _require.
+    """
+
+    def call(name: str):
+        getter = getattr(provider, PROVIDER_INPUTS[name])
+        if name == "storm_cells":
+            return getter(bbox, when)
+        return getter(bbox, grid, when)
+
+    outcomes = _run_calls(call, names, config)
+    return {name: _require(value, name, reason) for name, (value, reason) in outcomes.items()}
+
+
+def _fetch_windows(
+    provider,
+    bbox: BBox,
+    grids: List[Grid],
+    when: datetime,
+    names: List[str],
+    config: AppConfig,
+) -> List[Dict[str, Any]]:
+    """
+    _fetch_inputs for many small grids in one batch. Each grid is one call
+    fetching all the named grid inputs in turn, which keeps the provider's
+    intermediates for that grid warm and costs one round trip per grid;
+    config.fetch_timeout_seconds then applies to each grid's call.
+    """
+
+    def call(index: int) -> Dict[str, Tuple[Any, Optional[str]]]:
+        fetched = {}
+        for name in names:
+            try:
+                fetched[name] = (getattr(provider, PROVIDER_INPUTS[name])(bbox, grids[index], when), None)
+            except Exception as exc:  # noqa: BLE001 - surfaced as a _require error
+                fetched[name] = (None, f"{type(exc).__name__}: {exc}")
+        return fetched
+
+    batch = []
+    for index, (fetched, reason) in sorted(_run_calls(call, list(range(len(grids))), config).items()):
+        if fetched is None:
+            fetched = {name: (None, reason) for name in names}
+        batch.append({name: _require(value, name, why) for name, (value, why) in fetched.items()})
+    return batch
+
+
+@dataclass
+class LayerStack:
+    grid: Grid
+    scores: ScoredLayers
+    storm_cells: List[StormCell]
+    # Source ("real", "synthetic", ...) that served each provider input.
+    provenance: Dict[str, str] = field(default_factory=dict)
+
+
+def _cache_key(bbox: BBox, when: datetime, data_mode: str, config: AppConfig) -> Hashable:
+    # AppConfig is frozen, so it hashes by value and stands in for a config hash.
+    return (
+        data_mode,
+        (bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat),
+        config.grid_resolution_deg,
+        when.timestamp(),
+        config,
+    )
+
+
+def cache_stats() -> Dict[str, Dict]:
+    return {
+        "layers": _LAYER_CACHE.stats(),
+        "threats": _THREAT_CACHE.stats(),
+        "static": _STATIC_CACHE.stats(),
+    }
+
+
+def clear_caches() -> None:
+    _LAYER_CACHE.clear()
+    _THREAT_CACHE.clear()
+    _STATIC_CACHE.clear()
+
+
+def _freeze(stack: LayerStack) -> LayerStack:
+    # Cached stacks are shared between requests; make accidental writes fail.
+    for layer in (stack.scores.fuel, stack.scores.atmospheric, stack.scores.consequence, stack.scores.severity):
+        layer.values.flags.writeable = False
+    return stack
+
+
 def compute_layers(
     bbox: BBox,
     when: datetime,
     data_mode: str,
     config: AppConfig,
-) -> Tuple[Grid, List[List[float]], List[List[float]], List[List[float]], List[StormCell]]:
+) -> LayerStack:
+    key = _cache_key(bbox, when, data_mode, config)
+    return _LAYER_CACHE.get_or_create(key, lambda: _freeze(_build_layers(bbox, when, data_mode, config)))
+
+
+def _static_key(provider, data_mode: str, bbox: BBox, grid: Grid, config: AppConfig) -> Hashable:
+    lattice = grid.bbox
+    return (
+        data_mode,
+        provider.static_version(),
+        (bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat),
+        (lattice.min_lon, lattice.min_lat, lattice.max_lon, lattice.max_lat),
+        grid.resolution_deg,
+        grid.rows,
+        grid.cols,
+        config,
+    )
+
+
+def _sources(provider, layers) -> Dict[str, str]:
+    served = provider.provenance()
+    return {layer: served.get(layer, provider.name) for layer in layers}
+
+
+def _freeze_static(static: StaticScores) -> StaticScores:
+    for layer in (static.fuel_slope, static.fuel_type, static.consequence):
+        layer.values.flags.writeable = False
+    return static
+
+
+def _fetch_scored(
+    provider,
+    data_mode: str,
+    bbox: BBox,
+    grid: Grid,
+    when: datetime,
+    config: AppConfig,
+    reuse_static: bool = True,
+    extra: Tuple[str, ...] = (),
+    provenance: Optional[Dict[str, str]] = None,
+    static: Optional[StaticScores] = None,
+    dynamic: bool = True,
+) -> Tuple[StaticScores, Dict[str, Any]]:
+    # Static terms (given, cached or fetched) plus the raw dynamic and extra
+    # inputs, all fetched in one concurrent batch.
+    key = None
+    cached = (static, {}) if static is not None else None
+    if cached is None and reuse_static and STATIC_LAYERS <= provider.static_layers:
+        key = _static_key(provider, data_mode, bbox, grid, config)
+        cached = _STATIC_CACHE.get(key)
+
+    names = [name for name in PROVIDER_INPUTS if (dynamic and name in DYNAMIC_LAYERS) or name in extra]
+    if cached is None:
+        names += [name for name in PROVIDER_INPUTS if name in STATIC_LAYERS]
+    inputs = _fetch_inputs(provider, bbox, grid, when, names, config)
+    sources = _sources(provider, names)
+
+    if cached is None:
+        static = score_static(
+            inputs["slope"], inputs["fuel_type"], inputs["population_proximity"], inputs["infrastructure_density"], config
+        )
+        cached = (_freeze_static(static), {name: sources[name] for name in STATIC_LAYERS})
+        if key is not None:
+            _STATIC_CACHE.put(key, cached)
+    static, static_sources = cached
+
+    if provenance is not None:
+        sources.update(static_sources)
+        provenance.update((name, sources[name]) for name in PROVIDER_INPUTS if name in sources)
+    return static, inputs
+
+
+def _score_grid(
+    provider,
+    data_mode: str,
+    bbox: BBox,
+    grid: Grid,
+    when: datetime,
+    config: AppConfig,
+    reuse_static: bool = True,
+    extra: Tuple[str, ...] = (),
+    provenance: Optional[Dict[str, str]] = None,
+    static: Optional[StaticScores] = None,
+) -> Tuple[ScoredLayers, Dict[str, Any]]:
+    """
+    Fetch and score every input for grid in one concurrent batch, plus the
+    extra inputs (e.g. storm_cells), which are returned alongside the
+    scores. bbox is the scenario being evaluated; grid may cover only part of
+    it. Static terms are taken from static when given, else from the static
+    cache when the provider allows it. When given, provenance is filled with
+    the source of every input.
+    """
+    static, inputs = _fetch_scored(
+        provider, data_mode, bbox, grid, when, config, reuse_static, extra, provenance, static
+    )
+    return _score_inputs(static, inputs, config), {name: inputs[name] for name in extra}
+
+
+def _score_inputs(static: StaticScores, inputs: Dict[str, Any], config: AppConfig) -> ScoredLayers:
+    return score_dynamic(
+        static,
+        inputs["ndvi"],
+        inputs["cape"],
+        inputs["dewpoint_depression"],
+        inputs["cloud_base_height"],
+        inputs["low_level_rh"],
+        inputs["precip_efficiency"],
+        config,
+    )
+
+
+def _build_layers(
+    bbox: BBox,
+    when: datetime,
+    data_mode: str,
+    config: AppConfig,
+) -> LayerStack:
     provider = get_provider(data_mode)
     grid = generate_grid(bbox, config.grid_resolution_deg)
+    provenance: Dict[str, str] = {}
+    scores, extra = _score_grid(
+        provider, data_mode, bbox, grid, when, config, extra=("storm_cells",), provenance=provenance
+    )
+    return LayerStack(grid=grid, scores=scores, storm_cells=extra["storm_cells"], provenance=provenance)
 
-    ndvi = _require(provider.get_ndvi(bbox, grid, when), "ndvi")
-    slope = _require(provider.get_slope(bbox, grid, when), "slope")
-    fuel_type = _require(provider.get_fuel_type(bbox, grid, when), "fuel_type")
 
-    cape = _require(provider.get_cape(bbox, grid, when), "cape")
-    dpd = _require(provider.get_dewpoint_depression(bbox, grid, when), "dewpoint_depression")
-    cbh = _require(provider.get_cloud_base_height(bbox, grid, when), "cloud_base_height")
-    rh = _require(provider.get_low_level_rh(bbox, grid, when), "low_level_rh")
-    precip_eff = _require(provider.get_precip_efficiency(bbox, grid, when), "precip_efficiency")
+def compute_grid_scores(
+    bbox: BBox,
+    grid: Grid,
+    when: datetime,
+    data_mode: str,
+    config: AppConfig,
+) -> ScoredLayers:
+    """
+    Score planes for an arbitrary grid (e.g. a map tile) of the scenario
+    bbox. The provider sees the scenario, so a cell scores the same whichever
+    grid it is requested on.
 
-    population = _require(provider.get_population_proximity(bbox, grid, when), "population_proximity")
-    infrastructure = _require(provider.get_infrastructure_density(bbox, grid, when), "infrastructure_density")
+    Static terms are cached once per resolution for the scenario's lattice
+    extent and sliced for grids on that lattice, so panning across tiles
+    does not add a static cache entry per tile. Other grids score their
+    static terms without caching them.
+    """
+    provider = get_provider(data_mode)
+    static = _lattice_static(provider, data_mode, bbox, grid, when, config)
+    scores, _ = _score_grid(
+        provider, data_mode, bbox, grid, when, config, reuse_static=False, static=static
+    )
+    return scores
 
-    storm_cells = _require(provider.get_storm_cells(bbox, when), "storm_cells")
 
-    fuel_score = score_fuel(ndvi, slope, fuel_type, config)
-    atmo_score = score_atmospheric(cape, dpd, cbh, rh, precip_eff, config)
-    consequence_weight = score_consequence(population, infrastructure, config)
+def _lattice_static(
+    provider,
+    data_mode: str,
+    bbox: BBox,
+    grid: Grid,
+    when: datetime,
+    config: AppConfig,
+) -> Optional[StaticScores]:
+    # grid's static terms cut from those of lattice_grid(bbox), or None when
+    # grid is not a block of that lattice or the provider's static terms
+    # can't be reused.
+    if not STATIC_LAYERS <= provider.static_layers:
+        return None
+    resolution = grid.resolution_deg
+    extent = lattice_grid(bbox, resolution)
+    row = (grid.bbox.min_lat - extent.bbox.min_lat) / resolution
+    col = (grid.bbox.min_lon - extent.bbox.min_lon) / resolution
+    row0, col0 = round(row), round(col)
+    on_lattice = abs(row - row0) < 1e-6 and abs(col - col0) < 1e-6
+    if not (on_lattice and 0 <= row0 <= extent.rows - grid.rows and 0 <= col0 <= extent.cols - grid.cols):
+        return None
+    static, _ = _fetch_scored(provider, data_mode, bbox, extent, when, config, dynamic=False)
+    return window_static(static, grid, (slice(row0, row0 + grid.rows), slice(col0, col0 + grid.cols)))
 
-    return grid, fuel_score, atmo_score, consequence_weight, storm_cells
+
+def _adaptive_rasters(
+    bbox: BBox,
+    when: datetime,
+    data_mode: str,
+    config: AppConfig,
+    threshold: float,
+) -> Tuple[Grid, ScoredLayers, np.ndarray]:
+    """
+    Coarse-to-fine threat rasters. Static terms (cached across steps) and
+    storm cells bound every adaptive_coarse_factor-sized block; dynamic
+    inputs are fetched and scored at full resolution only for the blocks
+    whose severity upper bound reaches the threshold and that a storm can
+    reach. Unrefined cells score zero and can hold no threat, so the result
+    matches the uniform grid. Providers always receive the scenario bbox, so
+    bbox-relative inputs (storms, synthetic cities) are the same for every
+    window.
+    """
+    provider = get_provider(data_mode)
+    fine = generate_grid(bbox, config.grid_resolution_deg)
+    factor = config.adaptive_coarse_factor
+    coarse = coarse_grid(fine, factor)
+
+    static, inputs = _fetch_scored(
+        provider, data_mode, bbox, fine, when, config, extra=("storm_cells",), dynamic=False
+    )
+    storm_cells = inputs["storm_cells"]
+    upper = block_max(severity_upper_bound(static, config), factor)
+    mask = refinement_mask(coarse, upper, storm_cells, config, threshold)
+    windows = refined_windows(mask, factor, (fine.rows, fine.cols))
+
+    def score_windows(grids: List[Grid], windows: List[Window]) -> List[ScoredLayers]:
+        names = [name for name in PROVIDER_INPUTS if name in DYNAMIC_LAYERS]
+        batch = _fetch_windows(provider, bbox, grids, when, names, config)
+        return [
+            _score_inputs(window_static(static, grid, window), inputs, config)
+            for grid, window, inputs in zip(grids, windows, batch)
+        ]
+
+    scores = refine(fine, windows, score_windows)
+    return fine, scores, contact_raster(fine, scores, storm_cells, config, threshold)
+
+
+def _threat_rasters(
+    bbox: BBox,
+    when: datetime,
+    data_mode: str,
+    config: AppConfig,
+    threshold: float,
+) -> Tuple[Grid, ScoredLayers, np.ndarray]:
+    if config.adaptive_refinement:
+        return _adaptive_rasters(bbox, when, data_mode, config, threshold)
+    stack = compute_layers(bbox, when, data_mode, config)
+    earliest = contact_raster(stack.grid, stack.scores, stack.storm_cells, config, threshold)
+    return stack.grid, stack.scores, earliest
 
 
 def compute_threats(
@@ -56,11 +514,44 @@ def compute_threats(
     config: AppConfig,
     threshold: float,
 ) -> Dict:
-    grid, fuel_score, atmo_score, consequence_weight, storm_cells = compute_layers(bbox, when, data_mode, config)
-    return detect_collisions(grid, fuel_score, atmo_score, consequence_weight, storm_cells, config, threshold)
+    """
+    Threat FeatureCollection for one timestamp. Results are cached, so the
+    feature dicts are shared with later callers and must not be mutated;
+    the returned collection and its features list are fresh copies.
+    """
+    key = (_cache_key(bbox, when, data_mode, config), threshold)
+    collection = _THREAT_CACHE.get_or_create(key, lambda: _build_threats(bbox, when, data_mode, config, threshold))
+    return {"type": collection["type"], "features": list(collection["features"])}
 
 
-def compute_simulation(
+def _build_threats(
+    bbox: BBox,
+    when: datetime,
+    data_mode: str,
+    config: AppConfig,
+    threshold: float,
+) -> Dict:
+    features = list(iter_threat_features(*_threat_rasters(bbox, when, data_mode, config, threshold), config))
+    return {"type": "FeatureCollection", "features": features}
+
+
+def stream_threats(
+    bbox: BBox,
+    when: datetime,
+    data_mode: str,
+    config: AppConfig,
+    threshold: float,
+) -> Iterator[Dict]:
+    """
+    Threat features for one timestamp, produced lazily in priority order.
+    Layers and the contact raster are computed before this returns, so
+    configuration and data errors surface immediately.
+    """
+    grid, scores, earliest = _threat_rasters(bbox, when, data_mode, config, threshold)
+    return iter_threat_features(grid, scores, earliest, config)
+
+
+def simulation_steps(
     bbox: BBox,
     start: datetime,
     end: datetime,
@@ -68,43 +559,196 @@ def compute_simulation(
     config: AppConfig,
     threshold: float,
     step_hours: int,
-) -> Dict:
+    cached: bool = True,
+) -> Iterator[Tuple[datetime, Dict]]:
+    """
+    Yield (timestamp, threat collection) for every step of a replay window.
+    With cached=False the steps bypass the threat cache, for callers that
+    consume each step once and would only evict reusable entries.
+    """
     if end < start:
         raise ValueError("end_time must be after start_time")
     if step_hours <= 0:
         raise ValueError("step_hours must be positive")
 
-    features_by_cell: Dict[str, Dict] = {}
+    timestamps = []
     current = start
     while current <= end:
-        collection = compute_threats(bbox, current, data_mode, config, threshold)
-        timestamp = to_iso(current)
+        timestamps.append(current)
+        current = current + timedelta(hours=step_hours)
 
-        for feature in collection.get("features", []):
-            props = feature.get("properties", {})
-            props["timestamp"] = timestamp
-            feature["properties"] = props
+    if config.simulate_workers > 1 and len(timestamps) > 1:
+        return _parallel_steps(bbox, timestamps, data_mode, config, threshold, cached)
 
-            cell_id = props.get("cell_id")
-            if not cell_id:
-                continue
+    def steps() -> Iterator[Tuple[datetime, Dict]]:
+        for when in timestamps:
+            yield when, _step_threats((bbox, when, data_mode, config, threshold, cached))
+
+    return steps()
+
+
+def _step_threats(args: Tuple[BBox, datetime, str, AppConfig, float, bool]) -> Dict:
+    bbox, when, data_mode, config, threshold, cached = args
+    if cached:
+        return compute_threats(bbox, when, data_mode, config, threshold)
+    return _build_threats(bbox, when, data_mode, config, threshold)
 
-            existing = features_by_cell.get(cell_id)
-            if existing is None:
-                features_by_cell[cell_id] = feature
-                continue
 
-            new_score = props.get("priority_score", 0.0)
-            old_score = existing.get("properties", {}).get("priority_score", 0.0)
-            if new_score > old_score:
+def _simulate_pool(workers: int) -> ProcessPoolExecutor:
+    # Spawned workers avoid forking a parent that may hold threads.
+    with _SIMULATE_POOLS_LOCK:
+        pool = _SIMULATE_POOLS.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _SIMULATE_POOLS[workers] = pool
+        return pool
+
+
+def _drop_simulate_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    with _SIMULATE_POOLS_LOCK:
+        if _SIMULATE_POOLS.get(workers) is pool:
+            del _SIMULATE_POOLS[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _parallel_steps(
+    bbox: BBox,
+    timestamps: List[datetime],
+    data_mode: str,
+    config: AppConfig,
+    threshold: float,
+    cached: bool,
+) -> Iterator[Tuple[datetime, Dict]]:
+    # Steps only depend on their own timestamp, so they can run in any
+    # process. executor.map yields in submission order, which keeps the
+    # merge (and its earliest-timestamp tie-break) identical to the serial
+    # path. Each task carries a run of consecutive steps, which share their
+    # worker's static cache and cost one round trip.
+    workers = min(config.simulate_workers, len(timestamps))
+    pool = _simulate_pool(config.simulate_workers)
+    jobs = [(bbox, when, data_mode, config, threshold, cached) for when in timestamps]
+    chunksize = max(1, math.ceil(len(jobs) / (2 * workers)))
+    try:
+        for when, collection in zip(timestamps, pool.map(_step_threats, jobs, chunksize=chunksize)):
+            yield when, collection
+    except BrokenProcessPool:
+        # A worker died; the next replay starts a fresh pool.
+        _drop_simulate_pool(config.simulate_workers, pool)
+        raise
+
+
+def _merge_max_priority(features_by_cell: Dict[str, Dict], collection: Dict, timestamp: str) -> None:
+    # Keep the highest-priority feature per cell; ties go to the earlier step.
+    for feature in collection.get("features", []):
+        props = {**feature.get("properties", {}), "timestamp": timestamp}
+        feature = {**feature, "properties": props}
+
+        cell_id = props.get("cell_id")
+        if not cell_id:
+            continue
+
+        existing = features_by_cell.get(cell_id)
+        if existing is None:
+            features_by_cell[cell_id] = feature
+            continue
+
+        new_score = props.get("priority_score", 0.0)
+        old_score = existing.get("properties", {}).get("priority_score", 0.0)
+        if new_score > old_score:
+            features_by_cell[cell_id] = feature
+        elif new_score == old_score:
+            old_ts = existing.get("properties", {}).get("timestamp", "")
+            if timestamp < old_ts:
                 features_by_cell[cell_id] = feature
-            elif new_score == old_score:
-                old_ts = existing.get("properties", {}).get("timestamp", "")
-                if timestamp < old_ts:
-                    features_by_cell[cell_id] = feature
 
-        current = current + timedelta(hours=step_hours)
 
+def _by_priority(features_by_cell: Dict[str, Dict]) -> Dict:
     features = list(features_by_cell.values())
     features.sort(key=lambda f: f.get("properties", {}).get("priority_score", 0.0), reverse=True)
     return {"type": "FeatureCollection", "features": features}
+
+
+def compute_simulation(
+    bbox: BBox,
+    start: datetime,
+    end: datetime,
+    data_mode: str,
+    config: AppConfig,
+    threshold: float,
+    step_hours: int,
+) -> Dict:
+    features_by_cell: Dict[str, Dict] = {}
+    for when, collection in simulation_steps(bbox, start, end, data_mode, config, threshold, step_hours):
+        _merge_max_priority(features_by_cell, collection, to_iso(when))
+    return _by_priority(features_by_cell)
+
+
+def iter_simulation(
+    bbox: BBox,
+    start: datetime,
+    end: datetime,
+    data_mode: str,
+    config: AppConfig,
+    threshold: float,
+    step_hours: int,
+) -> Iterator[Dict]:
+    """Yield one {timestamp, threats, routes} record per replay step."""
+    # Every step's threats are cells of the same grid, so routing reuses its
+    # cached depot distances across the whole replay.
+    grid = generate_grid(bbox, config.grid_resolution_deg)
+    # Only incremental routing carries state between steps, so the default
+    # plans and route properties are those of independent per-step solves.
+    state = RoutingState(warm_start=True) if config.routing_incremental else None
+    # Each step is consumed once, so it stays out of the threat cache, as
+    # stream_threats does.
+    steps = simulation_steps(bbox, start, end, data_mode, config, threshold, step_hours, cached=False)
+    for when, collection in steps:
+        timestamp = to_iso(when)
+        routes = plan_routes(
+            collection,
+            config,
+            top_n=config.routing_top_n,
+            drone_count=config.routing_drone_count,
+            speed_kmh=config.routing_speed_kmh,
+            range_km=config.routing_range_km,
+            grid=grid,
+            state=state,
+        )
+        for feature in routes.get("features", []):
+            feature["properties"]["timestamp"] = timestamp
+        yield {"timestamp": timestamp, "threats": collection, "routes": routes}
+
+
+def compute_simulation_with_routes(
+    bbox: BBox,
+    start: datetime,
+    end: datetime,
+    data_mode: str,
+    config: AppConfig,
+    threshold: float,
+    step_hours: int,
+) -> Dict:
+    """
+    Replay a window once, feeding each step's threats both into the
+    max-priority aggregation and into that step's drone routing. With
+    routing_incremental, churn counts, per drone, the steps at which it was
+    sent to a different target than on the step before.
+    """
+    features_by_cell: Dict[str, Dict] = {}
+    routes_features = []
+    churn: Dict[str, int] = {}
+    for step in iter_simulation(bbox, start, end, data_mode, config, threshold, step_hours):
+        _merge_max_priority(features_by_cell, step["threats"], step["timestamp"])
+        routes_features.extend(step["routes"]["features"])
+        if config.routing_incremental:
+            for feature in step["routes"]["features"]:
+                props = feature["properties"]
+                churn[props["drone_id"]] = churn.get(props["drone_id"], 0) + int(props["reassigned"])
+
+    result = {
+        "threats": _by_priority(features_by_cell),
+        "routes": {"type": "FeatureCollection", "features": routes_features},
+    }
+    if config.routing_incremental:
+        result["churn"] = dict(sorted(churn.items()))
+    return result
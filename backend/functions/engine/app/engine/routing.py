@@ -1,13 +1,41 @@
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
 
-try:
-    from scipy.optimize import linear_sum_assignment  # type: ignore
-except Exception:  # pragma: no cover - fallback when scipy isn't available
-    linear_sum_assignment = None
+import numpy as np
 
 from app.config import AppConfig
-from app.utils.geo import haversine_km
+from app.utils.cache import LRUCache
+from app.utils.geo import Grid, distance_raster_km, parse_cell_id
+from app.utils.spatial import PointIndex
+
+# scipy's solver, imported on first use so that loading this module (and the
+# API behind it) doesn't pay for scipy. None when scipy isn't available.
+_NOT_LOADED = object()
+linear_sum_assignment = _NOT_LOADED
+
+
+def _scipy_solver():
+    global linear_sum_assignment
+    if linear_sum_assignment is _NOT_LOADED:
+        try:
+            from scipy.optimize import linear_sum_assignment as solver  # type: ignore
+        except Exception:  # pragma: no cover - fallback when scipy isn't available
+            solver = None
+        linear_sum_assignment = solver
+    return linear_sum_assignment
+
+
+# Cost of leaving a drone without a target; dominates any real distance.
+OUT_OF_RANGE_PENALTY = 1e9
+# Slack allowed when checking that a carried-over assignment is still optimal.
+WARM_START_TOLERANCE_KM = 1e-9
+IDLE = "idle"
+
+# Depot sets and grids are few and fixed, so these rarely evict.
+_DISTANCE_CACHE = LRUCache(maxsize=16)
+_REACH_CACHE = LRUCache(maxsize=64)
 
 
 @dataclass(frozen=True)
@@ -26,6 +54,22 @@ DEFAULT_DEPOTS = [
 ]
 
 
+@dataclass
+class RoutingState:
+    """
+    What plan_routes remembers between calls, e.g. across /simulate steps:
+    each drone's last target, for churn reporting, and, with warm_start, the
+    solver's assignment and column prices, so the next solve resumes from
+    them and only re-solves drones whose targets changed or stopped being
+    optimal.
+    """
+
+    warm_start: bool = False
+    targets: Dict[str, str] = field(default_factory=dict)
+    assignment: Dict[str, Hashable] = field(default_factory=dict)
+    prices: Dict[Hashable, float] = field(default_factory=dict)
+
+
 def _polygon_centroid(coords: List[List[float]]) -> Tuple[float, float]:
     if len(coords) > 1 and coords[0] == coords[-1]:
         coords = coords[:-1]
@@ -52,29 +96,409 @@ def _prepare_drones(drone_count: int, depots: List[Depot]) -> List[Tuple[str, De
     return drones
 
 
-def _assign_drones(costs: List[List[float]]) -> List[Tuple[int, int]]:
-    if not costs:
-        return []
-    if linear_sum_assignment is None:
-        # Fallback: greedy assignment if scipy is unavailable.
-        assignments = []
-        used_cols = set()
-        for i, row in enumerate(costs):
-            best_j = None
-            best_cost = None
-            for j, cost in enumerate(row):
-                if j in used_cols:
+def _nearest(cols: np.ndarray, dist: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+    keep = np.argsort(dist, kind="stable")[:limit]
+    keep.sort()
+    return cols[keep], dist[keep]
+
+
+def _candidate_edges(
+    drones: List[Tuple[str, Depot]],
+    targets: List[Dict],
+    range_km: float,
+) -> Dict[Depot, Tuple[np.ndarray, np.ndarray]]:
+    """
+    In-range targets (indices, distances) for each depot, found through a
+    spatial index. Drones at one depot share a row of the cost matrix, and no
+    drone needs more than len(drones) candidates: with at most len(drones) - 1
+    of its cheapest targets taken by other drones, one of the rest is always
+    free and no worse, so the pruning keeps the assignment exact.
+    """
+    index = PointIndex(
+        [target["centroid_lat"] for target in targets],
+        [target["centroid_lon"] for target in targets],
+        cell_km=max(range_km, 1.0),
+    )
+    edges = {}
+    for depot in dict.fromkeys(depot for _, depot in drones):
+        cols, dist = index.query(depot.lat, depot.lon, range_km)
+        edges[depot] = _nearest(cols, dist, len(drones))
+    return edges
+
+
+def _grid_key(grid: Grid) -> Tuple:
+    bbox = grid.bbox
+    return (bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat, grid.resolution_deg, grid.rows, grid.cols)
+
+
+def _frozen(values: np.ndarray) -> np.ndarray:
+    values.flags.writeable = False
+    return values
+
+
+def depot_distances(depots: Sequence[Depot], grid: Grid) -> np.ndarray:
+    """
+    Distance in km from each depot to every cell centre of grid, shaped
+    (len(depots), rows, cols). Built once per (depots, grid) and shared
+    read-only between callers.
+    """
+    depots = tuple(depots)
+    return _DISTANCE_CACHE.get_or_create(
+        (depots, _grid_key(grid)),
+        lambda: _frozen(np.stack([distance_raster_km(grid, depot.lat, depot.lon) for depot in depots])),
+    )
+
+
+def depot_reach(depots: Sequence[Depot], grid: Grid, range_km: float) -> np.ndarray:
+    """Cells of grid within range_km of each depot, cached like depot_distances."""
+    depots = tuple(depots)
+    return _REACH_CACHE.get_or_create(
+        (depots, _grid_key(grid), float(range_km)),
+        lambda: _frozen(depot_distances(depots, grid) <= range_km),
+    )
+
+
+def routing_cache_stats() -> Dict[str, Dict]:
+    return {"distances": _DISTANCE_CACHE.stats(), "reach": _REACH_CACHE.stats()}
+
+
+def clear_routing_caches() -> None:
+    _DISTANCE_CACHE.clear()
+    _REACH_CACHE.clear()
+
+
+def _grid_candidate_edges(
+    drones: List[Tuple[str, Depot]],
+    cells: Tuple[np.ndarray, np.ndarray],
+    grid: Grid,
+    range_km: float,
+) -> Dict[Depot, Tuple[np.ndarray, np.ndarray]]:
+    """_candidate_edges for targets that are cells of grid, read from the cached rasters."""
+    depots = tuple(dict.fromkeys(depot for _, depot in drones))
+    distances = depot_distances(depots, grid)
+    reach = depot_reach(depots, grid, range_km)
+    rows, cols = cells
+    edges = {}
+    for k, depot in enumerate(depots):
+        targets = np.flatnonzero(reach[k][rows, cols])
+        edges[depot] = _nearest(targets, distances[k][rows[targets], cols[targets]], len(drones))
+    return edges
+
+
+def _target_cells(targets: List[Dict], grid: Grid) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    # Row and column of each target on grid, or None unless every target is one of its cells.
+    cells = [parse_cell_id(target.get("cell_id") or "") for target in targets]
+    if any(cell is None or not (0 <= cell[0] < grid.rows and 0 <= cell[1] < grid.cols) for cell in cells):
+        return None
+    rows, cols = zip(*cells)
+    return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+
+
+def _components(edges: Dict[Depot, Tuple[np.ndarray, np.ndarray]]) -> List[List[Depot]]:
+    # Depots that can reach a common target must be solved together.
+    parent = {depot: depot for depot in edges}
+
+    def find(depot: Depot) -> Depot:
+        while parent[depot] is not depot:
+            parent[depot] = parent[parent[depot]]
+            depot = parent[depot]
+        return depot
+
+    owner: Dict[int, Depot] = {}
+    for depot, (cols, _) in edges.items():
+        for col in cols.tolist():
+            other = owner.setdefault(col, depot)
+            parent[find(other)] = find(depot)
+
+    groups: Dict[Depot, List[Depot]] = {}
+    for depot in edges:
+        if edges[depot][0].size:
+            groups.setdefault(find(depot), []).append(depot)
+    return list(groups.values())
+
+
+def _candidates(rows: List[Tuple[np.ndarray, np.ndarray]], i: int):
+    cols, costs = rows[i]
+    yield from zip(cols.tolist(), costs.tolist())
+    # Unassigned column of row i; real columns are non-negative.
+    yield -1 - i, OUT_OF_RANGE_PENALTY
+
+
+def _augment(
+    rows: List[Tuple[np.ndarray, np.ndarray]],
+    col4row: List[Optional[int]],
+    u: List[float],
+    v: Dict[int, float],
+) -> None:
+    """
+    Assign every free row by shortest augmenting paths (the method scipy
+    uses, run with Dijkstra over candidate edges only), updating col4row and
+    the duals u, v in place. The duals must be feasible for the rows already
+    assigned: no negative reduced cost, zero on assigned edges and zero
+    prices on unassigned columns.
+    """
+    row4col = {col: i for i, col in enumerate(col4row) if col is not None}
+    for cur in range(len(rows)):
+        if col4row[cur] is not None:
+            continue
+        shortest: Dict[int, float] = {}
+        path: Dict[int, int] = {}
+        scanned: Dict[int, None] = {}
+        visited_rows = []
+        heap: List[Tuple[float, int, int]] = []
+        min_val = 0.0
+        i = cur
+        sink = None
+        while sink is None:
+            visited_rows.append(i)
+            for j, cost in _candidates(rows, i):
+                if j in scanned:
                     continue
-                if best_cost is None or cost < best_cost:
-                    best_cost = cost
-                    best_j = j
-            if best_j is not None:
-                used_cols.add(best_j)
-                assignments.append((i, best_j))
-        return assignments
+                reduced = min_val + cost - u[i] - v.get(j, 0.0)
+                if reduced < shortest.get(j, math.inf):
+                    shortest[j] = reduced
+                    path[j] = i
+                    # Prefer free columns on ties so paths stay short.
+                    heapq.heappush(heap, (reduced, 0 if j not in row4col else 1, j))
+            while True:
+                reduced, _, j = heapq.heappop(heap)
+                if j not in scanned and reduced <= shortest[j]:
+                    break
+            min_val = reduced
+            scanned[j] = None
+            if j in row4col:
+                i = row4col[j]
+            else:
+                sink = j
+
+        u[cur] += min_val
+        for i in visited_rows[1:]:
+            u[i] += min_val - shortest[col4row[i]]
+        for j in scanned:
+            v[j] = v.get(j, 0.0) - (min_val - shortest[j])
+
+        j = sink
+        while True:
+            i = path[j]
+            row4col[j] = i
+            col4row[i], j = j, col4row[i]
+            if i == cur:
+                break
+
+
+def _shortest_augmenting_paths(rows: List[Tuple[np.ndarray, np.ndarray]]) -> List[Optional[int]]:
+    """
+    Exact sparse min-cost assignment in pure Python. rows[i] holds the
+    candidate columns and costs of row i. Each row also has a private
+    "unassigned" column at OUT_OF_RANGE_PENALTY, so a row gets a real column
+    whenever that does not leave more rows unassigned. Returns the column of
+    each row, or None.
+    """
+    col4row: List[Optional[int]] = [None] * len(rows)
+    _augment(rows, col4row, [0.0] * len(rows), {})
+    return [col if col >= 0 else None for col in col4row]
+
+
+def _warm_duals(
+    rows: List[Tuple[np.ndarray, np.ndarray]],
+    col4row: List[Optional[int]],
+    v: Dict[int, float],
+) -> List[float]:
+    """
+    Make a carried-over assignment and column prices feasible for _augment
+    on new costs. Each row's dual is its cheapest reduced cost; a row keeps
+    its old column only if that column still attains it, and columns left
+    unassigned drop back to a zero price. Unassigning a row can free a
+    column and lower other rows' duals, so this repeats until stable.
+    Returns the row duals; col4row and v are updated in place.
+    """
+    costs = [dict(_candidates(rows, i)) for i in range(len(rows))]
+    for i, col in enumerate(col4row):
+        if col is not None and col not in costs[i]:
+            col4row[i] = None
+    while True:
+        taken = set(col4row)
+        for col in [col for col in v if col not in taken]:
+            del v[col]
+        u = [min(cost - v.get(j, 0.0) for j, cost in row.items()) for row in costs]
+        stale = [
+            i
+            for i, col in enumerate(col4row)
+            if col is not None and costs[i][col] - v.get(col, 0.0) > u[i] + WARM_START_TOLERANCE_KM
+        ]
+        if not stale:
+            return u
+        for i in stale:
+            col4row[i] = None
+
+
+def _column_keys(targets: List[Dict]) -> List[Optional[Hashable]]:
+    """
+    Key of each target's column, matched across calls: its cell_id, with
+    repeats of one id numbered (cell_id, n) so that every target keeps a
+    column of its own. None for targets without a cell_id.
+    """
+    seen: Dict[str, int] = {}
+    keys: List[Optional[Hashable]] = []
+    for target in targets:
+        cell_id = target.get("cell_id")
+        if cell_id is None:
+            keys.append(None)
+            continue
+        count = seen.get(cell_id, 0)
+        seen[cell_id] = count + 1
+        keys.append(cell_id if count == 0 else (cell_id, count))
+    return keys
+
+
+def _solve_warm(
+    drone_rows: List[int],
+    drones: List[Tuple[str, Depot]],
+    rows: List[Tuple[np.ndarray, np.ndarray]],
+    keys: List[Optional[Hashable]],
+    state: RoutingState,
+    assignment: Dict[str, Hashable],
+    prices: Dict[Hashable, float],
+) -> List[Optional[int]]:
+    # Columns are matched across calls by key: a target's _column_keys
+    # entry, or (IDLE, drone_id) for a drone's private unassigned column.
+    def key(r: int, col: int) -> Optional[Hashable]:
+        return keys[col] if col >= 0 else (IDLE, drones[drone_rows[r]][0])
+
+    local = {keys[col]: col for cols, _ in rows for col in cols.tolist() if keys[col] is not None}
+    col4row: List[Optional[int]] = []
+    for r, drone_idx in enumerate(drone_rows):
+        previous = state.assignment.get(drones[drone_idx][0])
+        if previous == (IDLE, drones[drone_idx][0]):
+            col4row.append(-1 - r)
+        else:
+            col4row.append(local.get(previous))
+    v = {}
+    for r, col in enumerate(col4row):
+        if col is not None and key(r, col) in state.prices:
+            v[col] = state.prices[key(r, col)]
+
+    u = _warm_duals(rows, col4row, v)
+    _augment(rows, col4row, u, v)
+
+    for r, col in enumerate(col4row):
+        column = key(r, col)
+        assignment[drones[drone_rows[r]][0]] = column
+        if column is not None and col in v:
+            prices[column] = v[col]
+    return [col if col >= 0 else None for col in col4row]
+
 
-    row_ind, col_ind = linear_sum_assignment(costs)
-    return list(zip(row_ind.tolist(), col_ind.tolist()))
+def _solve_component(
+    drone_rows: List[int],
+    drones: List[Tuple[str, Depot]],
+    edges: Dict[Depot, Tuple[np.ndarray, np.ndarray]],
+) -> List[Tuple[int, int]]:
+    rows = [edges[drones[i][1]] for i in drone_rows]
+    solver = _scipy_solver()
+    if solver is None:
+        assigned = _shortest_augmenting_paths(rows)
+        return [(drone_rows[r], col) for r, col in enumerate(assigned) if col is not None]
+
+    columns = sorted({col for cols, _ in rows for col in cols.tolist()})
+    position = {col: k for k, col in enumerate(columns)}
+    costs = np.full((len(rows), len(columns)), OUT_OF_RANGE_PENALTY)
+    for r, (cols, dist) in enumerate(rows):
+        costs[r, [position[col] for col in cols.tolist()]] = dist
+    row_ind, col_ind = solver(costs)
+    return [
+        (drone_rows[r], columns[c])
+        for r, c in zip(row_ind.tolist(), col_ind.tolist())
+        if costs[r, c] < OUT_OF_RANGE_PENALTY
+    ]
+
+
+def _keep_previous_targets(
+    pairs: List[Tuple[int, int]],
+    drones: List[Tuple[str, Depot]],
+    keys: List[Optional[Hashable]],
+    previous: Dict[str, str],
+) -> List[Tuple[int, int]]:
+    # Drones at one depot are interchangeable, so permuting the targets
+    # among them keeps the plan optimal; hand each drone its previous
+    # target whenever its depot still serves it.
+    by_depot: Dict[Depot, List[Tuple[int, int]]] = {}
+    for drone_idx, target_idx in pairs:
+        by_depot.setdefault(drones[drone_idx][1], []).append((drone_idx, target_idx))
+    result = []
+    for group in by_depot.values():
+        free = {keys[t]: t for _, t in group if keys[t] is not None}
+        free_targets = [t for _, t in group if keys[t] is None]
+        waiting = []
+        for drone_idx, _ in group:
+            target = free.pop(previous.get(drones[drone_idx][0]), None)
+            if target is None:
+                waiting.append(drone_idx)
+            else:
+                result.append((drone_idx, target))
+        result.extend(zip(waiting, free_targets + list(free.values())))
+    return result
+
+
+def _assign_drones(
+    drones: List[Tuple[str, Depot]],
+    targets: List[Dict],
+    range_km: float,
+    grid: Optional[Grid] = None,
+    state: Optional[RoutingState] = None,
+) -> List[Tuple[int, int, float]]:
+    """
+    (drone index, target index, distance) for a minimum-distance assignment
+    that serves as many targets as possible within range_km. Only in-range
+    pairs are considered, and the problem is split into independent groups
+    of depots that compete for the same targets. Each group is solved
+    exactly, with scipy when it is installed and with a sparse pure-Python
+    solver otherwise.
+
+    When grid is given and every target is one of its cells (by cell_id),
+    distances and ranges are looked up in cached depot rasters instead of
+    being recomputed.
+
+    With a warm-starting state, groups are solved by resuming from the
+    previous call's assignment and prices, and the state is updated.
+    """
+    cells = _target_cells(targets, grid) if grid is not None else None
+    if cells is None:
+        edges = _candidate_edges(drones, targets, range_km)
+    else:
+        edges = _grid_candidate_edges(drones, cells, grid, range_km)
+    rows_by_depot: Dict[Depot, List[int]] = {}
+    for idx, (_, depot) in enumerate(drones):
+        rows_by_depot.setdefault(depot, []).append(idx)
+
+    warm = state is not None and state.warm_start
+    keys = _column_keys(targets)
+    assignment: Dict[str, Hashable] = {}
+    prices: Dict[Hashable, float] = {}
+
+    pairs = []
+    for group in _components(edges):
+        drone_rows = sorted(idx for depot in group for idx in rows_by_depot[depot])
+        if warm:
+            rows = [edges[drones[i][1]] for i in drone_rows]
+            assigned = _solve_warm(drone_rows, drones, rows, keys, state, assignment, prices)
+            pairs.extend((drone_rows[r], col) for r, col in enumerate(assigned) if col is not None)
+        else:
+            pairs.extend(_solve_component(drone_rows, drones, edges))
+    if state is not None:
+        pairs = _keep_previous_targets(pairs, drones, keys, state.targets)
+        if warm:
+            for drone_idx, target_idx in pairs:
+                assignment[drones[drone_idx][0]] = keys[target_idx]
+            state.assignment = assignment
+            state.prices = prices
+    pairs.sort()
+
+    distances = []
+    for drone_idx, target_idx in pairs:
+        cols, dist = edges[drones[drone_idx][1]]
+        distances.append(float(dist[np.searchsorted(cols, target_idx)]))
+    return [(d, t, km) for (d, t), km in zip(pairs, distances)]
 
 
 def plan_routes(
@@ -85,6 +509,8 @@ def plan_routes(
     speed_kmh: float = 120.0,
     range_km: float = 200.0,
     depots: Optional[List[Depot]] = None,
+    grid: Optional[Grid] = None,
+    state: Optional[RoutingState] = None,
 ) -> Dict:
     depots = depots or DEFAULT_DEPOTS
     drones = _prepare_drones(drone_count, depots)
@@ -117,30 +543,12 @@ def plan_routes(
     if not targets:
         return {"type": "FeatureCollection", "features": []}
 
-    costs = []
-    distances = []
-    for _, depot in drones:
-        row = []
-        dist_row = []
-        for target in targets:
-            dist = haversine_km(depot.lat, depot.lon, target["centroid_lat"], target["centroid_lon"])
-            dist_row.append(dist)
-            if dist > range_km:
-                row.append(1e9 + dist)
-            else:
-                row.append(dist)
-        costs.append(row)
-        distances.append(dist_row)
-
-    assignments = _assign_drones(costs)
-
+    previous = state.targets if state is not None else {}
+    current: Dict[str, str] = {}
     features = []
-    for drone_idx, target_idx in assignments:
+    for drone_idx, target_idx, dist_km in _assign_drones(drones, targets, range_km, grid, state):
         drone_id, depot = drones[drone_idx]
         target = targets[target_idx]
-        dist_km = distances[drone_idx][target_idx]
-        if dist_km > range_km:
-            continue
         eta_minutes = (dist_km / speed_kmh) * 60.0
         feature = {
             "type": "Feature",
@@ -161,7 +569,14 @@ def plan_routes(
                 "threat_priority": target["priority"],
             },
         }
+        if state is not None:
+            previous_target = previous.get(drone_id)
+            current[drone_id] = target["cell_id"]
+            feature["properties"]["previous_target"] = previous_target
+            feature["properties"]["reassigned"] = previous_target is not None and previous_target != target["cell_id"]
         features.append(feature)
+    if state is not None:
+        state.targets = current
 
     features.sort(key=lambda f: f["properties"]["eta_minutes"])
     return {"type": "FeatureCollection", "features": features}
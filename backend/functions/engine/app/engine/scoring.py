@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config import AppConfig
+from app.utils.layer import Layer
+
+
+@dataclass
+class ScoredLayers:
+    fuel: Layer
+    atmospheric: Layer
+    consequence: Layer
+    severity: Layer
+
+
+@dataclass
+class StaticScores:
+    """
+    Score terms that depend only on static inputs: the weighted slope and
+    fuel-type contributions to the fuel score, and the consequence score.
+    """
+
+    fuel_slope: Layer
+    fuel_type: Layer
+    consequence: Layer
+
+
+def score_static(
+    slope: Layer,
+    fuel_type: Layer,
+    population: Layer,
+    infrastructure: Layer,
+    config: AppConfig,
+) -> StaticScores:
+    grid = slope.grid
+
+    fuel_slope = np.clip(slope.values / 40.0, 0.0, 1.0)
+    fuel_slope *= config.fuel_slope_weight
+    fuel_type_term = np.clip(fuel_type.values, 0.0, 1.0)
+    fuel_type_term *= config.fuel_type_weight
+
+    consequence = np.clip(population.values, 0.0, 1.0)
+    consequence *= config.consequence_population_weight
+    consequence += config.consequence_infra_weight * np.clip(infrastructure.values, 0.0, 1.0)
+    np.clip(consequence, 0.0, 1.0, out=consequence)
+
+    return StaticScores(
+        fuel_slope=Layer(grid, fuel_slope),
+        fuel_type=Layer(grid, fuel_type_term),
+        consequence=Layer(grid, consequence),
+    )
+
+
+def score_dynamic(
+    static: StaticScores,
+    ndvi: Layer,
+    cape: Layer,
+    dewpoint_dep: Layer,
+    cloud_base_km: Layer,
+    low_level_rh: Layer,
+    precip_eff: Layer,
+    config: AppConfig,
+) -> ScoredLayers:
+    """
+    Combine precomputed static terms with the time-varying inputs. Terms are
+    accumulated in place in the same order as the unfused per-layer formulas
+    (kept as references in tests/test_scoring.py), so the results are
+    bit-identical to them.
+    """
+    grid = ndvi.grid
+
+    fuel = np.clip(ndvi.values, 0.0, 1.0)
+    fuel *= config.fuel_ndvi_weight
+    fuel += static.fuel_slope.values
+    fuel += static.fuel_type.values
+    np.clip(fuel, 0.0, 1.0, out=fuel)
+
+    atmo = np.clip((cape.values - 500.0) / 2000.0, 0.0, 1.0)
+    atmo *= config.atmo_cape_weight
+    atmo += config.atmo_dewpoint_dep_weight * np.clip(dewpoint_dep.values / 20.0, 0.0, 1.0)
+    atmo += config.atmo_cloud_base_weight * np.clip((cloud_base_km.values - 1.0) / 3.0, 0.0, 1.0)
+    atmo += config.atmo_low_rh_weight * np.clip((50.0 - low_level_rh.values) / 40.0, 0.0, 1.0)
+    atmo += config.atmo_precip_eff_weight * np.clip((0.5 - precip_eff.values) / 0.5, 0.0, 1.0)
+    np.clip(atmo, 0.0, 1.0, out=atmo)
+
+    consequence = static.consequence.values
+    severity = config.fuel_layer_weight * fuel
+    severity += config.atmospheric_layer_weight * atmo
+    severity += config.consequence_layer_weight * consequence
+
+    return ScoredLayers(
+        fuel=Layer(grid, fuel),
+        atmospheric=Layer(grid, atmo),
+        consequence=static.consequence,
+        severity=Layer(grid, severity),
+    )
+
@@ -0,0 +1,158 @@
+import math
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import AppConfig
+from app.engine.pipeline import LAYER_CACHE_TTL_SECONDS, compute_grid_scores, compute_threats
+from app.models import BBox
+from app.utils.cache import LRUCache
+from app.utils.geo import Grid, lattice_grid
+
+# Each tile is rendered on at most TILE_CELLS columns. Zoomed-out tiles use a
+# power-of-two multiple of grid_resolution_deg and zoomed-in tiles bottom out
+# at grid_resolution_deg. Raster tiles take their cells from the global
+# lattice at that resolution (lattice_grid), so adjacent tiles at one zoom
+# level share cell centres and agree on the cells they both overlap.
+TILE_CELLS = 64
+MAX_ZOOM = 18
+MAX_MERCATOR_LAT = 85.0511287798
+
+RASTER_TILE_LAYERS = ("fuel", "atmospheric", "consequence", "severity")
+TILE_LAYERS = RASTER_TILE_LAYERS + ("threats",)
+
+TILE_CACHE_SIZE = 1024
+
+_TILE_CACHE = LRUCache(maxsize=TILE_CACHE_SIZE, ttl_seconds=LAYER_CACHE_TTL_SECONDS)
+
+
+@dataclass
+class Tile:
+    bbox: BBox
+    resolution_deg: float
+    grid: Optional[Grid] = None
+    values: Optional[np.ndarray] = None
+    features: Optional[List[Dict]] = None
+
+
+def tile_cache_stats() -> Dict:
+    return _TILE_CACHE.stats()
+
+
+def clear_tile_cache() -> None:
+    _TILE_CACHE.clear()
+
+
+def _tile_lat(z: int, y: int) -> float:
+    n = math.pi - 2.0 * math.pi * y / (1 << z)
+    return math.degrees(math.atan(math.sinh(n)))
+
+
+def tile_bbox(z: int, x: int, y: int) -> BBox:
+    """Geographic bounds of Web Mercator (slippy map) tile z/x/y."""
+    if not 0 <= z <= MAX_ZOOM:
+        raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}")
+    n = 1 << z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError(f"tile {z}/{x}/{y} is outside the tile grid")
+    return BBox(
+        min_lon=x / n * 360.0 - 180.0,
+        min_lat=max(_tile_lat(z, y + 1), -MAX_MERCATOR_LAT),
+        max_lon=(x + 1) / n * 360.0 - 180.0,
+        max_lat=min(_tile_lat(z, y), MAX_MERCATOR_LAT),
+    )
+
+
+def tile_resolution(z: int, config: AppConfig) -> float:
+    base = config.grid_resolution_deg
+    # A tile's edges need not sit on lattice lines, so its lattice cells can
+    # straddle one extra column; leave room for it.
+    target = 360.0 / (1 << z) / (TILE_CELLS - 1)
+    if target <= base:
+        return base
+    return base * 2 ** math.ceil(math.log2(target / base))
+
+
+def _bbox_key(bbox: BBox) -> Tuple[float, float, float, float]:
+    return (bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat)
+
+
+def layer_tile(
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    scenario: BBox,
+    when: datetime,
+    data_mode: str,
+    config: AppConfig,
+) -> Tile:
+    """
+    One score plane on the lattice cells overlapping the tile, at the zoom's
+    resolution. The provider is asked for the scenario bbox, as for every
+    other endpoint, so tile values do not depend on where the tile falls.
+    """
+    if layer not in RASTER_TILE_LAYERS:
+        raise ValueError(f"Unknown raster tile layer: {layer}")
+    bbox = tile_bbox(z, x, y)
+    resolution = tile_resolution(z, config)
+    key = ("layer", layer, z, x, y, _bbox_key(scenario), when.timestamp(), data_mode, config)
+
+    def build() -> Tile:
+        grid = lattice_grid(bbox, resolution)
+        scores = compute_grid_scores(
+            scenario, grid, when, data_mode, replace(config, grid_resolution_deg=resolution)
+        )
+        values = getattr(scores, layer).values
+        # Cached tiles are shared between requests; make accidental writes fail.
+        values.flags.writeable = False
+        return Tile(bbox=bbox, resolution_deg=resolution, grid=grid, values=values)
+
+    return _TILE_CACHE.get_or_create(key, build)
+
+
+def _centre_in(feature: Dict, bbox: BBox) -> bool:
+    ring = feature["geometry"]["coordinates"][0]
+    lon = (ring[0][0] + ring[2][0]) / 2
+    lat = (ring[0][1] + ring[2][1]) / 2
+    return bbox.min_lon <= lon < bbox.max_lon and bbox.min_lat <= lat < bbox.max_lat
+
+
+def threat_tile(
+    z: int,
+    x: int,
+    y: int,
+    scenario: BBox,
+    when: datetime,
+    data_mode: str,
+    config: AppConfig,
+    threshold: float,
+) -> Tile:
+    """
+    Threat features whose cell centre falls inside the tile. Storm tracks
+    belong to the whole scenario rather than to any one tile, so collisions
+    are solved once over the scenario bbox at the zoom's resolution and the
+    tiles are cut from that shared result.
+    """
+    bbox = tile_bbox(z, x, y)
+    resolution = tile_resolution(z, config)
+    key = ("threats", z, x, y, _bbox_key(scenario), when.timestamp(), data_mode, config, threshold)
+
+    def build() -> Tile:
+        features: List[Dict] = []
+        overlaps = (
+            bbox.min_lon < scenario.max_lon
+            and scenario.min_lon < bbox.max_lon
+            and bbox.min_lat < scenario.max_lat
+            and scenario.min_lat < bbox.max_lat
+        )
+        if overlaps:
+            collection = compute_threats(
+                scenario, when, data_mode, replace(config, grid_resolution_deg=resolution), threshold
+            )
+            features = [feature for feature in collection["features"] if _centre_in(feature, bbox)]
+        return Tile(bbox=bbox, resolution_deg=resolution, features=features)
+
+    return _TILE_CACHE.get_or_create(key, build)
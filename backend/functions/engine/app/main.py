@@ -1,18 +1,32 @@
-from typing import Optional
+import json
+from itertools import chain
+from typing import Dict, Iterable, Iterator, Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
 from app.config import AppConfig, DEFAULT_BBOX, DEFAULT_END, DEFAULT_START
-from datetime import timedelta
-
-from app.engine.pipeline import compute_layers, compute_threats, compute_simulation
-from app.engine.routing import plan_routes
+from app.engine.pipeline import (
+    cache_stats,
+    compute_layers,
+    compute_simulation_with_routes,
+    compute_threats,
+    iter_simulation,
+    stream_threats,
+)
+from app.engine.routing import plan_routes, routing_cache_stats
+from app.engine.tiles import TILE_LAYERS, layer_tile, threat_tile, tile_cache_stats
 from app.models import BBox, SimRequest
+from app.utils.geo import generate_grid
+from app.utils.raster_codec import DTYPES, encode_layers
 from app.utils.time import parse_time, to_iso
 
 app = FastAPI(title="ZeroStrike Backend", version="0.1.0")
 config = AppConfig()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+LAYERS_MEDIA_TYPE = "application/octet-stream"
+
 
 def validate_bbox(bbox: BBox) -> None:
     if bbox.min_lat >= bbox.max_lat or bbox.min_lon >= bbox.max_lon:
@@ -55,6 +69,38 @@ def resolve_data_mode(value: Optional[str]) -> str:
     return value
 
 
+def wants_stream(request: Request, stream: Optional[bool]) -> bool:
+    if stream is not None:
+        return stream
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def primed(items: Iterable[Dict]) -> Iterator[Dict]:
+    """
+    Pull the first item eagerly so errors raised before any output is
+    produced still map to an HTTP error instead of a truncated stream.
+    """
+    iterator = iter(items)
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return iter(())
+    return chain((first,), iterator)
+
+
+def ndjson_response(items: Iterator[Dict]) -> StreamingResponse:
+    lines = (json.dumps(item, separators=(",", ":")) + "\n" for item in items)
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+
+
+def resolve_layers_format(request: Request, value: Optional[str]) -> str:
+    if value in (None, ""):
+        return "float32" if LAYERS_MEDIA_TYPE in request.headers.get("accept", "") else "json"
+    if value != "json" and value not in DTYPES:
+        raise HTTPException(status_code=400, detail="format must be one of: json, float32, uint16, uint8")
+    return value
+
+
 @app.get("/health")
 def health():
     return {
@@ -72,29 +118,57 @@ def health():
             "default_start": DEFAULT_START,
             "default_end": DEFAULT_END,
         },
+        "cache": {**cache_stats(), "tiles": tile_cache_stats(), "routing": routing_cache_stats()},
     }
 
 
 @app.get("/layers")
 def get_layers(
+    request: Request,
     min_lon: Optional[float] = Query(None),
     min_lat: Optional[float] = Query(None),
     max_lon: Optional[float] = Query(None),
     max_lat: Optional[float] = Query(None),
     time: Optional[str] = Query(None),
     data_mode: Optional[str] = Query("hybrid"),
+    format: Optional[str] = Query(None),
+    compress: bool = Query(False),
 ):
     bbox = resolve_bbox(min_lon, min_lat, max_lon, max_lat)
     validate_bbox(bbox)
 
     when = parse_time(time, DEFAULT_START)
     mode = resolve_data_mode(data_mode)
+    layers_format = resolve_layers_format(request, format)
 
     try:
-        grid, fuel, atmo, consequence, _ = compute_layers(bbox, when, mode, config)
+        stack = compute_layers(bbox, when, mode, config)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
+    grid, scores = stack.grid, stack.scores
+    if layers_format != "json":
+        content = encode_layers(
+            grid,
+            (bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat),
+            {
+                "fuel": scores.fuel.values,
+                "atmospheric": scores.atmospheric.values,
+                "consequence": scores.consequence.values,
+            },
+            dtype=layers_format,
+            compress=compress,
+        )
+        return Response(
+            content=content,
+            media_type=LAYERS_MEDIA_TYPE,
+            headers={
+                "X-Layers-Time": to_iso(when),
+                "X-Layers-Data-Mode": mode,
+                "X-Layers-Provenance": json.dumps(stack.provenance, separators=(",", ":")),
+            },
+        )
+
     return {
         "meta": {
             "resolution_deg": grid.resolution_deg,
@@ -103,17 +177,19 @@ def get_layers(
             "bbox": bbox_to_dict(bbox),
             "time": to_iso(when),
             "data_mode": mode,
+            "provenance": stack.provenance,
         },
         "layers": {
-            "fuel": fuel,
-            "atmospheric": atmo,
-            "consequence": consequence,
+            "fuel": scores.fuel.tolist(),
+            "atmospheric": scores.atmospheric.tolist(),
+            "consequence": scores.consequence.tolist(),
         },
     }
 
 
 @app.get("/threats")
 def get_threats(
+    request: Request,
     min_lon: Optional[float] = Query(None),
     min_lat: Optional[float] = Query(None),
     max_lon: Optional[float] = Query(None),
@@ -121,6 +197,7 @@ def get_threats(
     time: Optional[str] = Query(None),
     data_mode: Optional[str] = Query("hybrid"),
     threshold: Optional[float] = Query(None),
+    stream: Optional[bool] = Query(None),
 ):
     bbox = resolve_bbox(min_lon, min_lat, max_lon, max_lat)
     validate_bbox(bbox)
@@ -130,6 +207,8 @@ def get_threats(
     threat_threshold = resolve_threshold(threshold)
 
     try:
+        if wants_stream(request, stream):
+            return ndjson_response(stream_threats(bbox, when, mode, config, threat_threshold))
         return compute_threats(bbox, when, mode, config, threat_threshold)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -161,13 +240,18 @@ def get_routes(
             drone_count=config.routing_drone_count,
             speed_kmh=config.routing_speed_kmh,
             range_km=config.routing_range_km,
+            grid=generate_grid(bbox, config.grid_resolution_deg),
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @app.post("/simulate")
-def simulate(request: SimRequest):
+def simulate(
+    request: SimRequest,
+    http_request: Request,
+    stream: Optional[bool] = Query(None),
+):
     bbox = request.bbox or BBox(
         min_lon=DEFAULT_BBOX[0],
         min_lat=DEFAULT_BBOX[1],
@@ -183,29 +267,77 @@ def simulate(request: SimRequest):
     step_hours = request.step_hours or config.simulate_step_hours
 
     try:
-        threats = compute_simulation(bbox, start, end, mode, config, threat_threshold, step_hours)
-
-        routes_features = []
-        current = start
-        while current <= end:
-            threats_t = compute_threats(bbox, current, mode, config, threat_threshold)
-            routes_t = plan_routes(
-                threats_t,
-                config,
-                top_n=config.routing_top_n,
-                drone_count=config.routing_drone_count,
-                speed_kmh=config.routing_speed_kmh,
-                range_km=config.routing_range_km,
-            )
-            timestamp = to_iso(current)
-            for feature in routes_t.get("features", []):
-                props = feature.get("properties", {})
-                props["timestamp"] = timestamp
-                feature["properties"] = props
-                routes_features.append(feature)
-            current = current + timedelta(hours=step_hours)
-
-        routes = {"type": "FeatureCollection", "features": routes_features}
-        return {"threats": threats, "routes": routes}
+        if wants_stream(http_request, stream):
+            steps = iter_simulation(bbox, start, end, mode, config, threat_threshold, step_hours)
+            return ndjson_response(primed(steps))
+        return compute_simulation_with_routes(bbox, start, end, mode, config, threat_threshold, step_hours)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@app.get("/tiles/{layer}/{z}/{x}/{y}")
+def get_tile(
+    request: Request,
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    min_lon: Optional[float] = Query(None),
+    min_lat: Optional[float] = Query(None),
+    max_lon: Optional[float] = Query(None),
+    max_lat: Optional[float] = Query(None),
+    time: Optional[str] = Query(None),
+    data_mode: Optional[str] = Query("hybrid"),
+    threshold: Optional[float] = Query(None),
+    format: Optional[str] = Query(None),
+    compress: bool = Query(False),
+):
+    if layer not in TILE_LAYERS:
+        raise HTTPException(status_code=404, detail=f"layer must be one of: {', '.join(TILE_LAYERS)}")
+
+    when = parse_time(time, DEFAULT_START)
+    mode = resolve_data_mode(data_mode)
+
+    try:
+        # The bbox query parameters describe the scenario being evaluated,
+        # the same one /layers and /threats would use; the tile only selects
+        # which of its cells to return.
+        scenario = resolve_bbox(min_lon, min_lat, max_lon, max_lat)
+        validate_bbox(scenario)
+        if layer == "threats":
+            tile = threat_tile(z, x, y, scenario, when, mode, config, resolve_threshold(threshold))
+            return {"type": "FeatureCollection", "features": tile.features}
+
+        layers_format = resolve_layers_format(request, format)
+        tile = layer_tile(layer, z, x, y, scenario, when, mode, config)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    # The lattice cells can overhang the tile; bbox is the extent they cover.
+    bbox = tile.grid.bbox
+    if layers_format != "json":
+        content = encode_layers(
+            tile.grid,
+            (bbox.min_lon, bbox.min_lat, bbox.max_lon, bbox.max_lat),
+            {layer: tile.values},
+            dtype=layers_format,
+            compress=compress,
+        )
+        return Response(
+            content=content,
+            media_type=LAYERS_MEDIA_TYPE,
+            headers={"X-Layers-Time": to_iso(when), "X-Layers-Data-Mode": mode},
+        )
+
+    return {
+        "meta": {
+            "tile": {"z": z, "x": x, "y": y},
+            "resolution_deg": tile.resolution_deg,
+            "rows": tile.grid.rows,
+            "cols": tile.grid.cols,
+            "bbox": bbox_to_dict(bbox),
+            "time": to_iso(when),
+            "data_mode": mode,
+        },
+        "layers": {layer: tile.values.tolist()},
+    }
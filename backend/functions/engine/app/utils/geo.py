@@ -1,11 +1,16 @@
 import math
+import re
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 from app.models import BBox
 
 EARTH_RADIUS_KM = 6371.0
 
+_CELL_ID = re.compile(r"r(\d+)c(\d+)")
+
 # Rough California land polygon to exclude obvious Pacific Ocean cells.
 # Coordinates are (lon, lat) and intentionally coarse for demo filtering.
 CALIFORNIA_LAND_POLYGON = [
@@ -46,6 +51,27 @@ def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     return EARTH_RADIUS_KM * c
 
 
+def haversine_km_array(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """haversine_km over NumPy arrays; arguments broadcast against each other."""
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    dlat = np.radians(np.subtract(lat2, lat1))
+    dlon = np.radians(np.subtract(lon2, lon1))
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_km_matrix(lats1, lons1, lats2, lons2) -> np.ndarray:
+    """Many-to-many distances: result[i, j] is from point i of set 1 to point j of set 2."""
+    lats1 = np.asarray(lats1, dtype=np.float64).reshape(-1, 1)
+    lons1 = np.asarray(lons1, dtype=np.float64).reshape(-1, 1)
+    lats2 = np.asarray(lats2, dtype=np.float64).reshape(1, -1)
+    lons2 = np.asarray(lons2, dtype=np.float64).reshape(1, -1)
+    return haversine_km_array(lats1, lons1, lats2, lons2)
+
+
 def point_in_polygon(lon: float, lat: float, polygon: List[Tuple[float, float]]) -> bool:
     inside = False
     n = len(polygon)
@@ -83,6 +109,29 @@ def destination_point(lat: float, lon: float, bearing_deg: float, distance_km: f
     return math.degrees(dest_lat), math.degrees(dest_lon)
 
 
+def destination_points(lats, lons, bearings_deg, distances_km) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    destination_point over NumPy arrays; arguments broadcast, so e.g.
+    storm columns against an hours row give every storm at every hour.
+    """
+    bearing = np.radians(bearings_deg)
+    lat_rad = np.radians(lats)
+    lon_rad = np.radians(lons)
+
+    angular_distance = np.asarray(distances_km, dtype=np.float64) / EARTH_RADIUS_KM
+
+    dest_lat = np.arcsin(
+        np.sin(lat_rad) * np.cos(angular_distance)
+        + np.cos(lat_rad) * np.sin(angular_distance) * np.cos(bearing)
+    )
+    dest_lon = lon_rad + np.arctan2(
+        np.sin(bearing) * np.sin(angular_distance) * np.cos(lat_rad),
+        np.cos(angular_distance) - np.sin(lat_rad) * np.sin(dest_lat),
+    )
+
+    return np.degrees(dest_lat), np.degrees(dest_lon)
+
+
 @dataclass
 class Grid:
     bbox: BBox
@@ -92,6 +141,14 @@ class Grid:
     rows: int
     cols: int
 
+    @property
+    def lat_array(self) -> np.ndarray:
+        return np.asarray(self.lats, dtype=np.float64)
+
+    @property
+    def lon_array(self) -> np.ndarray:
+        return np.asarray(self.lons, dtype=np.float64)
+
 
 def generate_grid(bbox: BBox, resolution_deg: float) -> Grid:
     lat_span = bbox.max_lat - bbox.min_lat
@@ -106,6 +163,37 @@ def generate_grid(bbox: BBox, resolution_deg: float) -> Grid:
     return Grid(bbox=bbox, resolution_deg=resolution_deg, lats=lats, lons=lons, rows=rows, cols=cols)
 
 
+def lattice_grid(bbox: BBox, resolution_deg: float) -> Grid:
+    """
+    The cells of the global lattice at resolution_deg (rows and columns
+    counted from -90 and -180) that overlap bbox. Unlike generate_grid, two
+    bboxes that share an edge get cells from the same lattice, and a cell on
+    the edge appears in both with the same centre.
+    """
+    # Tolerance keeps float noise in edges that sit on a lattice line from
+    # adding a sliver row or column.
+    eps = 1e-9
+    r0 = math.floor((bbox.min_lat + 90.0) / resolution_deg + eps)
+    r1 = max(r0 + 1, math.ceil((bbox.max_lat + 90.0) / resolution_deg - eps))
+    c0 = math.floor((bbox.min_lon + 180.0) / resolution_deg + eps)
+    c1 = max(c0 + 1, math.ceil((bbox.max_lon + 180.0) / resolution_deg - eps))
+
+    lats = [-90.0 + resolution_deg * (i + 0.5) for i in range(r0, r1)]
+    lons = [-180.0 + resolution_deg * (j + 0.5) for j in range(c0, c1)]
+    extent = BBox(
+        min_lon=-180.0 + resolution_deg * c0,
+        min_lat=-90.0 + resolution_deg * r0,
+        max_lon=-180.0 + resolution_deg * c1,
+        max_lat=-90.0 + resolution_deg * r1,
+    )
+    return Grid(bbox=extent, resolution_deg=resolution_deg, lats=lats, lons=lons, rows=r1 - r0, cols=c1 - c0)
+
+
+def distance_raster_km(grid: Grid, lat: float, lon: float) -> np.ndarray:
+    """Distance from one point to every cell centre of grid, shaped (rows, cols)."""
+    return haversine_km_array(grid.lat_array[:, None], grid.lon_array[None, :], lat, lon)
+
+
 def cell_polygon(lon: float, lat: float, resolution_deg: float) -> List[List[float]]:
     half = resolution_deg / 2
     return [
@@ -119,3 +207,11 @@ def cell_polygon(lon: float, lat: float, resolution_deg: float) -> List[List[flo
 
 def grid_cell_id(row: int, col: int) -> str:
     return f"r{row}c{col}"
+
+
+def parse_cell_id(cell_id: str) -> Optional[Tuple[int, int]]:
+    """(row, col) of an id made by grid_cell_id, or None for anything else."""
+    match = _CELL_ID.fullmatch(cell_id)
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2))
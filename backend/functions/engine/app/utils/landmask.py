@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.cache import LRUCache
+from app.utils.geo import CALIFORNIA_LAND_POLYGON, Grid
+
+
+@dataclass(frozen=True)
+class LandMask:
+    center: np.ndarray  # cell centre lies on land
+    full: np.ndarray  # all four cell corners lie on land
+
+    @property
+    def inside(self) -> np.ndarray:
+        return self.center & self.full
+
+
+@dataclass(frozen=True)
+class _MaskEntry:
+    polygon: Sequence[Tuple[float, float]]
+    mask: LandMask
+
+
+_MASK_CACHE = LRUCache(maxsize=32)
+
+
+def points_in_polygon(lats: np.ndarray, lons: np.ndarray, polygon: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """
+    Even-odd test of every (lat, lon) pair on the lattice lats x lons.
+
+    Gives exactly the same answers as calling point_in_polygon per point, but
+    works a row at a time: a ray from (lat, lon) crosses an edge iff the edge
+    straddles lat and its crossing x lies east of lon, so sorting the
+    crossings for a row answers every column with one searchsorted.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    inside = np.zeros((lats.size, lons.size), dtype=bool)
+    if len(polygon) < 3:
+        return inside
+
+    vertices = np.asarray(polygon, dtype=np.float64)
+    xi, yi = vertices[:, 0], vertices[:, 1]
+    # Edge i runs from vertex i-1 (j) to vertex i, matching point_in_polygon.
+    xj, yj = np.roll(xi, 1), np.roll(yi, 1)
+
+    for r, lat in enumerate(lats):
+        straddles = (yi > lat) != (yj > lat)
+        if not straddles.any():
+            continue
+        x0, y0, x1, y1 = xi[straddles], yi[straddles], xj[straddles], yj[straddles]
+        crossings = np.sort((x1 - x0) * (lat - y0) / (y1 - y0 + 1e-12) + x0)
+        east_of = crossings.size - np.searchsorted(crossings, lons, side="right")
+        inside[r] = (east_of % 2) == 1
+    return inside
+
+
+def _build_mask(grid: Grid, polygon: Sequence[Tuple[float, float]]) -> LandMask:
+    half = grid.resolution_deg / 2
+    lats = grid.lat_array
+    lons = grid.lon_array
+
+    center = points_in_polygon(lats, lons, polygon)
+    full = np.ones_like(center)
+    for corner_lats in (lats - half, lats + half):
+        for corner_lons in (lons - half, lons + half):
+            full &= points_in_polygon(corner_lats, corner_lons, polygon)
+    return LandMask(center=center, full=full)
+
+
+def land_mask(grid: Grid, polygon: List[Tuple[float, float]] = CALIFORNIA_LAND_POLYGON) -> LandMask:
+    """
+    Rasterized land masks for grid, built once per (bbox, resolution, shape, polygon)
+    and kept in an LRU cache. Polygons are keyed by identity and must not be
+    mutated after first use.
+    """
+    bbox = grid.bbox
+    key = (
+        bbox.min_lon,
+        bbox.min_lat,
+        bbox.max_lon,
+        bbox.max_lat,
+        grid.resolution_deg,
+        grid.rows,
+        grid.cols,
+        id(polygon),
+    )
+    entry = _MASK_CACHE.get(key)
+    if entry is None or entry.polygon is not polygon:
+        entry = _MaskEntry(polygon=polygon, mask=_build_mask(grid, polygon))
+        _MASK_CACHE.put(key, entry)
+    return entry.mask
@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from app.utils.geo import Grid
+
+
+@dataclass
+class Layer:
+    """
+    A float64 raster aligned to a Grid: row i follows grid.lats[i] and
+    column j follows grid.lons[j]. Engine stages pass these around and only
+    convert to nested lists at the JSON boundary via tolist().
+    """
+
+    grid: Grid
+    values: np.ndarray
+
+    def __post_init__(self) -> None:
+        values = np.asarray(self.values, dtype=np.float64)
+        if values.shape != (self.grid.rows, self.grid.cols):
+            raise ValueError(
+                f"layer shape {values.shape} does not match grid ({self.grid.rows}, {self.grid.cols})"
+            )
+        self.values = values
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    def tolist(self) -> List[List[float]]:
+        return self.values.tolist()
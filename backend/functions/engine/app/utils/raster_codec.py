@@ -0,0 +1,163 @@
+"""
+Binary encoding for score rasters served by /layers.
+
+Layout (all little-endian):
+
+    header   struct HEADER_FORMAT: magic, version, dtype code, compression,
+             plane count, rows, cols, resolution_deg, min_lon, min_lat,
+             max_lon, max_lat
+    names    uint16 byte length followed by comma-separated ASCII plane names
+    payload  planes concatenated in name order, each rows*cols row-major
+             values of the chosen dtype, optionally zlib-compressed as a whole
+
+Scores live in [0, 1], so the uint8/uint16 encodings store
+round(value * (2**bits - 1)) and decode by dividing back out.
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+
+from app.utils.geo import Grid
+
+MAGIC = b"ZSLR"
+VERSION = 1
+HEADER_FORMAT = "<4sBBBBIIddddd"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+DTYPES: Dict[str, Tuple[int, np.dtype]] = {
+    "float32": (0, np.dtype("<f4")),
+    "uint16": (1, np.dtype("<u2")),
+    "uint8": (2, np.dtype("u1")),
+}
+_DTYPE_BY_CODE = {code: (name, dtype) for name, (code, dtype) in DTYPES.items()}
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+
+@dataclass
+class DecodedLayers:
+    rows: int
+    cols: int
+    resolution_deg: float
+    bbox: Tuple[float, float, float, float]
+    dtype: str
+    planes: Dict[str, np.ndarray]
+
+
+def _quantize(values: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    if dtype.kind == "f":
+        return values.astype(dtype)
+    scale = float(np.iinfo(dtype).max)
+    return np.rint(np.clip(values, 0.0, 1.0) * scale).astype(dtype)
+
+
+def _dequantize(values: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    if dtype.kind == "f":
+        return values.astype(np.float64)
+    return values.astype(np.float64) / float(np.iinfo(dtype).max)
+
+
+def encode_layers(
+    grid: Grid,
+    bbox: Tuple[float, float, float, float],
+    planes: Mapping[str, np.ndarray],
+    dtype: str = "float32",
+    compress: bool = False,
+) -> bytes:
+    """Pack named (rows, cols) planes into the binary layout described above."""
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported raster dtype: {dtype}")
+    code, np_dtype = DTYPES[dtype]
+
+    names = list(planes)
+    if any("," in name or not name.isascii() for name in names):
+        raise ValueError("Plane names must be ASCII without commas")
+
+    chunks = []
+    for name in names:
+        values = np.asarray(planes[name], dtype=np.float64)
+        if values.shape != (grid.rows, grid.cols):
+            raise ValueError(f"plane {name} has shape {values.shape}, expected ({grid.rows}, {grid.cols})")
+        chunks.append(_quantize(values, np_dtype).tobytes())
+    payload = b"".join(chunks)
+    compression = COMPRESSION_NONE
+    if compress:
+        payload = zlib.compress(payload, 6)
+        compression = COMPRESSION_ZLIB
+
+    header = struct.pack(
+        HEADER_FORMAT,
+        MAGIC,
+        VERSION,
+        code,
+        compression,
+        len(names),
+        grid.rows,
+        grid.cols,
+        grid.resolution_deg,
+        *(float(v) for v in bbox),
+    )
+    encoded_names = ",".join(names).encode("ascii")
+    return header + struct.pack("<H", len(encoded_names)) + encoded_names + payload
+
+
+def decode_layers(data: bytes) -> DecodedLayers:
+    if len(data) < HEADER_SIZE + 2:
+        raise ValueError("Layer payload is truncated")
+    (
+        magic,
+        version,
+        code,
+        compression,
+        count,
+        rows,
+        cols,
+        resolution_deg,
+        min_lon,
+        min_lat,
+        max_lon,
+        max_lat,
+    ) = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != MAGIC:
+        raise ValueError("Not a layer payload")
+    if version != VERSION:
+        raise ValueError(f"Unsupported layer payload version: {version}")
+    if code not in _DTYPE_BY_CODE:
+        raise ValueError(f"Unknown raster dtype code: {code}")
+    dtype_name, np_dtype = _DTYPE_BY_CODE[code]
+
+    offset = HEADER_SIZE
+    (names_len,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    names_blob = data[offset : offset + names_len].decode("ascii")
+    names = names_blob.split(",") if names_blob else []
+    if len(names) != count:
+        raise ValueError("Plane count does not match plane names")
+    payload = data[offset + names_len :]
+    if compression == COMPRESSION_ZLIB:
+        payload = zlib.decompress(payload)
+    elif compression != COMPRESSION_NONE:
+        raise ValueError(f"Unknown compression code: {compression}")
+
+    plane_size = rows * cols
+    flat = np.frombuffer(payload, dtype=np_dtype)
+    if flat.size != plane_size * count:
+        raise ValueError("Layer payload size does not match header")
+
+    planes = {
+        name: _dequantize(flat[i * plane_size : (i + 1) * plane_size], np_dtype).reshape(rows, cols)
+        for i, name in enumerate(names)
+    }
+    return DecodedLayers(
+        rows=rows,
+        cols=cols,
+        resolution_deg=resolution_deg,
+        bbox=(min_lon, min_lat, max_lon, max_lat),
+        dtype=dtype_name,
+        planes=planes,
+    )
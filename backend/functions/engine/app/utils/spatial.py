@@ -0,0 +1,65 @@
+import math
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.geo import EARTH_RADIUS_KM, haversine_km_array
+
+KM_PER_DEG = EARTH_RADIUS_KM * math.pi / 180.0
+
+
+class PointIndex:
+    """
+    Uniform lat/lon bucket index over a fixed set of points for radius
+    queries. Buckets are at least cell_km across in both directions, so a
+    query only visits the buckets its spherical cap can touch before the
+    exact haversine filter.
+    """
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float], cell_km: float) -> None:
+        if cell_km <= 0:
+            raise ValueError("cell_km must be positive")
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_lat = cell_km / KM_PER_DEG
+        max_abs_lat = float(np.max(np.abs(self.lats))) if self.lats.size else 0.0
+        self.cell_lon = self.cell_lat / max(math.cos(math.radians(min(max_abs_lat, 89.0))), 1e-6)
+
+        buckets: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        rows = np.floor(self.lats / self.cell_lat).astype(np.int64)
+        cols = np.floor(self.lons / self.cell_lon).astype(np.int64)
+        for idx, key in enumerate(zip(rows.tolist(), cols.tolist())):
+            buckets[key].append(idx)
+        self._buckets = {key: np.array(members, dtype=np.int64) for key, members in buckets.items()}
+
+    def __len__(self) -> int:
+        return int(self.lats.size)
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        angular = radius_km / EARTH_RADIUS_KM
+        lat_pad = math.degrees(angular)
+        if abs(lat) + lat_pad >= 90.0 or angular >= math.pi / 2:
+            return np.arange(len(self), dtype=np.int64)
+        lon_pad = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+
+        row_lo = math.floor((lat - lat_pad) / self.cell_lat)
+        row_hi = math.floor((lat + lat_pad) / self.cell_lat)
+        col_lo = math.floor((lon - lon_pad) / self.cell_lon)
+        col_hi = math.floor((lon + lon_pad) / self.cell_lon)
+        hits = [
+            self._buckets[(row, col)]
+            for row in range(row_lo, row_hi + 1)
+            for col in range(col_lo, col_hi + 1)
+            if (row, col) in self._buckets
+        ]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(hits))
+
+    def query(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices (ascending) and distances of the points within radius_km of (lat, lon)."""
+        candidates = self._candidates(lat, lon, radius_km)
+        dist = haversine_km_array(lat, lon, self.lats[candidates], self.lons[candidates])
+        keep = dist <= radius_km
+        return candidates[keep], dist[keep]
@@ -0,0 +1,83 @@
+"""
+Benchmark: uniform vs adaptive (coarse-to-fine) threat rasters for one step
+of the default synthetic scenario.
+
+"cold" clears every cache first, so static terms are fetched too; "warm"
+keeps the static cache, as every step after the first in a replay does.
+Both modes must find the same threat cells. Run from backend/functions/engine:
+
+    python benchmarks/bench_adaptive.py
+    python benchmarks/bench_adaptive.py --resolution 0.01 0.005 --factor 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from dataclasses import replace
+from typing import Callable
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.config import DEFAULT_BBOX, DEFAULT_START, AppConfig  # noqa: E402
+from app.engine import pipeline  # noqa: E402
+from app.models import BBox  # noqa: E402
+from app.utils.time import parse_time  # noqa: E402
+
+
+def _median(run: Callable[[], None], setup: Callable[[], None], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        setup()
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+    return float(np.median(times))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resolution", type=float, nargs="+", default=[0.01, 0.005], help="grid resolutions (deg)")
+    parser.add_argument("--factor", type=int, nargs="+", default=[4], help="adaptive_coarse_factor values")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (default: 5)")
+    args = parser.parse_args()
+
+    bbox = BBox(min_lon=DEFAULT_BBOX[0], min_lat=DEFAULT_BBOX[1], max_lon=DEFAULT_BBOX[2], max_lat=DEFAULT_BBOX[3])
+    when = parse_time(None, DEFAULT_START)
+
+    def per_step_caches() -> None:
+        pipeline._LAYER_CACHE.clear()
+        pipeline._THREAT_CACHE.clear()
+
+    print(f"{'resolution':>10} {'factor':>6} {'mode':>8} {'cold ms':>9} {'warm ms':>9} {'threats':>8}")
+    for resolution in args.resolution:
+        uniform = replace(AppConfig(), grid_resolution_deg=resolution)
+        configs = [("uniform", 1, uniform)] + [
+            ("adaptive", factor, replace(uniform, adaptive_refinement=True, adaptive_coarse_factor=factor))
+            for factor in args.factor
+        ]
+        expected = None
+        for mode, factor, config in configs:
+            threshold = config.threat_threshold
+
+            def run(config=config, threshold=threshold) -> None:
+                pipeline._threat_rasters(bbox, when, "synthetic", config, threshold)
+
+            cold = _median(run, pipeline.clear_caches, args.repeat)
+            run()
+            warm = _median(run, per_step_caches, args.repeat)
+
+            per_step_caches()
+            threats = np.isfinite(pipeline._threat_rasters(bbox, when, "synthetic", config, threshold)[2])
+            if expected is None:
+                expected = threats
+            elif not np.array_equal(threats, expected):
+                raise SystemExit(f"adaptive threats differ from uniform at {resolution} deg, factor {factor}")
+            label = "-" if mode == "uniform" else str(factor)
+            print(f"{resolution:>10g} {label:>6} {mode:>8} {cold * 1e3:9.1f} {warm * 1e3:9.1f} {int(threats.sum()):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Microbenchmark: scalar vs batched geodesic primitives in app.utils.geo.
+
+Run from backend/functions/engine:
+
+    python benchmarks/bench_geo.py
+"""
+
+import os
+import random
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models import BBox  # noqa: E402
+from app.utils.geo import (  # noqa: E402
+    destination_point,
+    destination_points,
+    distance_raster_km,
+    generate_grid,
+    haversine_km,
+    haversine_km_matrix,
+)
+
+
+def _best(stmt, repeat: int = 5, number: int = 1) -> float:
+    return min(timeit.repeat(stmt, repeat=repeat, number=number)) / number
+
+
+def _report(name: str, scalar_s: float, batched_s: float) -> None:
+    print(f"{name:<34} scalar {scalar_s * 1e3:9.2f} ms   batched {batched_s * 1e3:8.3f} ms   x{scalar_s / batched_s:7.1f}")
+
+
+def main() -> None:
+    rng = random.Random(0)
+
+    depots = [(rng.uniform(35.0, 40.0), rng.uniform(-124.0, -118.0)) for _ in range(200)]
+    targets = [(rng.uniform(35.0, 40.0), rng.uniform(-124.0, -118.0)) for _ in range(2000)]
+    d_lats, d_lons = [p[0] for p in depots], [p[1] for p in depots]
+    t_lats, t_lons = [p[0] for p in targets], [p[1] for p in targets]
+    _report(
+        "many-to-many 200 x 2000",
+        _best(lambda: [[haversine_km(a, b, c, d) for c, d in targets] for a, b in depots], repeat=3),
+        _best(lambda: haversine_km_matrix(d_lats, d_lons, t_lats, t_lons)),
+    )
+
+    grid = generate_grid(BBox(min_lon=-124.5, min_lat=36.0, max_lon=-118.0, max_lat=39.5), 0.02)
+    _report(
+        f"one-to-grid {grid.rows} x {grid.cols}",
+        _best(lambda: [[haversine_km(lat, lon, 38.58, -121.49) for lon in grid.lons] for lat in grid.lats], repeat=3),
+        _best(lambda: distance_raster_km(grid, 38.58, -121.49)),
+    )
+
+    storms = [(rng.uniform(36.0, 38.0), rng.uniform(-123.0, -119.0), rng.uniform(200.0, 280.0), rng.uniform(15.0, 60.0)) for _ in range(500)]
+    hours = np.arange(1, 49, dtype=np.float64)
+    lats = np.array([s[0] for s in storms])[:, None]
+    lons = np.array([s[1] for s in storms])[:, None]
+    bearings = np.array([s[2] for s in storms])[:, None]
+    distances = np.array([s[3] for s in storms])[:, None] * hours[None, :]
+    _report(
+        "destinations 500 storms x 48 h",
+        _best(lambda: [[destination_point(a, b, c, s * h) for h in hours] for a, b, c, s in storms], repeat=3),
+        _best(lambda: destination_points(lats, lons, bearings, distances)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from app.config import AppConfig, DEFAULT_BBOX
+from app.data.synthetic import STATIC_EPOCH, SyntheticProvider
+from app.engine import pipeline
+from app.engine.adaptive import block_max, coarse_grid, refined_windows, severity_upper_bound, window_grid
+from app.engine.scoring import score_static
+from app.models import BBox
+from app.utils.geo import generate_grid
+from app.utils.time import parse_time
+
+BBOX = BBox(min_lon=DEFAULT_BBOX[0], min_lat=DEFAULT_BBOX[1], max_lon=DEFAULT_BBOX[2], max_lat=DEFAULT_BBOX[3])
+
+
+def test_coarse_blocks_cover_every_fine_cell():
+    fine = generate_grid(BBOX, 0.05)
+    coarse = coarse_grid(fine, 4)
+    mask = np.ones((coarse.rows, coarse.cols), dtype=bool)
+    covered = np.zeros((fine.rows, fine.cols), dtype=int)
+    for window in refined_windows(mask, 4, (fine.rows, fine.cols)):
+        covered[window] += 1
+    assert (covered == 1).all()
+    assert coarse.lats[0] == pytest.approx(np.mean(fine.lats[:4]))
+
+
+@pytest.mark.parametrize("collision_mode", ["hourly", "continuous"])
+@pytest.mark.parametrize("time", ["2020-08-15T00:00:00Z", "2020-08-17T12:00:00Z"])
+def test_adaptive_matches_uniform_threats(collision_mode, time):
+    when = parse_time(time, "")
+    uniform_config = AppConfig(collision_mode=collision_mode)
+    adaptive_config = replace(uniform_config, adaptive_refinement=True)
+
+    pipeline.clear_caches()
+    uniform = pipeline.compute_threats(BBOX, when, "synthetic", uniform_config, 0.44)
+    adaptive = pipeline.compute_threats(BBOX, when, "synthetic", adaptive_config, 0.44)
+    pipeline.clear_caches()
+
+    assert uniform["features"]
+    assert adaptive == uniform
+
+
+def test_upper_bound_covers_scored_severity():
+    config = AppConfig()
+    fine = generate_grid(BBOX, config.grid_resolution_deg)
+    stack = pipeline.compute_layers(BBOX, parse_time("2020-08-15T00:00:00Z", ""), "synthetic", config)
+    static = score_static(
+        *(getattr(SyntheticProvider(), getter)(BBOX, fine, STATIC_EPOCH) for getter in (
+            "get_slope", "get_fuel_type", "get_population_proximity", "get_infrastructure_density"
+        )),
+        config,
+    )
+    bound = severity_upper_bound(static, config)
+    assert (stack.scores.severity.values <= bound).all()
+    blocks = block_max(bound, 4)
+    assert blocks.shape == (coarse_grid(fine, 4).rows, coarse_grid(fine, 4).cols)
+    assert blocks[0, 0] == bound[:4, :4].max()
+
+
+def test_synthetic_window_values_match_full_grid():
+    provider = SyntheticProvider()
+    when = parse_time("2020-08-15T00:00:00Z", "")
+    fine = generate_grid(BBOX, 0.05)
+    window = (slice(12, 31), slice(40, 77))
+    part = window_grid(fine, window)
+    for getter in ("get_ndvi", "get_cape", "get_fuel_type", "get_low_level_rh"):
+        full = getattr(provider, getter)(BBOX, fine, when).values
+        assert np.array_equal(getattr(provider, getter)(BBOX, part, when).values, full[window])
+
+
+def test_adaptive_fetches_windows_in_one_batch(monkeypatch):
+    batches = []
+    fetch_windows = pipeline._fetch_windows
+
+    def counting(provider, bbox, grids, when, names, config):
+        batches.append(len(grids))
+        return fetch_windows(provider, bbox, grids, when, names, config)
+
+    monkeypatch.setattr(pipeline, "_fetch_windows", counting)
+    pipeline.clear_caches()
+    pipeline.compute_threats(
+        BBOX, parse_time("2020-08-15T00:00:00Z", ""), "synthetic", AppConfig(adaptive_refinement=True), 0.44
+    )
+    pipeline.clear_caches()
+
+    assert len(batches) == 1
+    assert batches[0] > 1
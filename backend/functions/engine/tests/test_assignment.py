@@ -0,0 +1,210 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.config import AppConfig
+from app.engine import routing
+from app.engine.routing import Depot, _assign_drones, _prepare_drones
+from app.models import BBox
+from app.utils.geo import generate_grid, grid_cell_id, haversine_km_matrix
+from app.utils.spatial import PointIndex
+
+
+def _targets(count: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        {"centroid_lat": rng.uniform(34.0, 40.0), "centroid_lon": rng.uniform(-123.5, -117.5)}
+        for _ in range(count)
+    ]
+
+
+def _depots(count: int, seed: int):
+    rng = random.Random(seed)
+    return [Depot(f"depot-{k}", rng.uniform(34.5, 39.5), rng.uniform(-123.0, -118.0)) for k in range(count)]
+
+
+def test_point_index_matches_brute_force():
+    targets = _targets(500, seed=1)
+    lats = [t["centroid_lat"] for t in targets]
+    lons = [t["centroid_lon"] for t in targets]
+    index = PointIndex(lats, lons, cell_km=80.0)
+    for depot in _depots(10, seed=2):
+        found, dist = index.query(depot.lat, depot.lon, 150.0)
+        brute = haversine_km_matrix([depot.lat], [depot.lon], lats, lons)[0]
+        assert found.tolist() == np.flatnonzero(brute <= 150.0).tolist()
+        assert np.allclose(dist, brute[found])
+
+
+def _dense_optimum(drones, targets, range_km):
+    from scipy.optimize import linear_sum_assignment
+
+    dist = haversine_km_matrix(
+        [d.lat for _, d in drones],
+        [d.lon for _, d in drones],
+        [t["centroid_lat"] for t in targets],
+        [t["centroid_lon"] for t in targets],
+    )
+    costs = np.where(dist > range_km, routing.OUT_OF_RANGE_PENALTY, dist)
+    rows, cols = linear_sum_assignment(costs)
+    served = [(r, c) for r, c in zip(rows, cols) if dist[r, c] <= range_km]
+    return len(served), sum(dist[r, c] for r, c in served)
+
+
+@pytest.mark.parametrize("use_scipy", [True, False])
+def test_sparse_assignment_matches_dense_optimum(monkeypatch, use_scipy):
+    if not use_scipy:
+        monkeypatch.setattr(routing, "linear_sum_assignment", None)
+    drones = _prepare_drones(60, _depots(12, seed=3))
+    targets = _targets(400, seed=4)
+
+    pairs = _assign_drones(drones, targets, range_km=120.0)
+    served, total = _dense_optimum(drones, targets, 120.0)
+
+    assert len({t for _, t, _ in pairs}) == len(pairs)
+    assert len({d for d, _, _ in pairs}) == len(pairs)
+    assert all(km <= 120.0 for _, _, km in pairs)
+    assert len(pairs) == served
+    assert sum(km for _, _, km in pairs) == pytest.approx(total)
+
+
+def test_fallback_leaves_contested_drones_unassigned(monkeypatch):
+    monkeypatch.setattr(routing, "linear_sum_assignment", None)
+    depot = Depot("solo", 37.0, -120.0)
+    drones = _prepare_drones(3, [depot])
+    targets = [{"centroid_lat": 37.1, "centroid_lon": -120.0}, {"centroid_lat": 40.0, "centroid_lon": -115.0}]
+
+    pairs = _assign_drones(drones, targets, range_km=50.0)
+    assert len(pairs) == 1
+    assert pairs[0][1] == 0
+
+
+def _grid_targets(grid, cells):
+    return [
+        {
+            "cell_id": grid_cell_id(r, c),
+            "centroid_lat": grid.lats[r],
+            "centroid_lon": grid.lons[c],
+        }
+        for r, c in cells
+    ]
+
+
+def test_grid_lookup_matches_spatial_index():
+    routing.clear_routing_caches()
+    grid = generate_grid(BBox(min_lon=-123.5, min_lat=34.0, max_lon=-117.5, max_lat=40.0), 0.1)
+    rng = random.Random(5)
+    cells = rng.sample([(r, c) for r in range(grid.rows) for c in range(grid.cols)], 300)
+    targets = _grid_targets(grid, cells)
+    drones = _prepare_drones(40, _depots(8, seed=6))
+
+    from_grid = _assign_drones(drones, targets, range_km=120.0, grid=grid)
+    from_index = _assign_drones(drones, targets, range_km=120.0)
+    assert [(d, t) for d, t, _ in from_grid] == [(d, t) for d, t, _ in from_index]
+    assert np.allclose([km for _, _, km in from_grid], [km for _, _, km in from_index])
+
+    _assign_drones(drones, targets, range_km=120.0, grid=grid)
+    stats = routing.routing_cache_stats()
+    assert stats["distances"]["hits"] >= 1
+    assert stats["reach"]["hits"] >= 1
+
+
+def test_grid_lookup_falls_back_for_foreign_targets():
+    grid = generate_grid(BBox(min_lon=-121.0, min_lat=36.0, max_lon=-120.0, max_lat=37.0), 0.1)
+    depot = Depot("solo", 36.5, -120.5)
+    targets = _grid_targets(grid, [(2, 3)]) + [{"cell_id": "r99c99", "centroid_lat": 36.6, "centroid_lon": -120.4}]
+
+    pairs = _assign_drones(_prepare_drones(2, [depot]), targets, range_km=50.0, grid=grid)
+    assert sorted(t for _, t, _ in pairs) == [0, 1]
+
+
+def test_warm_start_stays_optimal_across_steps():
+    rng = random.Random(7)
+    drones = _prepare_drones(30, _depots(6, seed=8))
+    targets = [{**t, "cell_id": f"t{k}"} for k, t in enumerate(_targets(150, seed=9))]
+    state = routing.RoutingState(warm_start=True)
+    next_id = len(targets)
+    for _ in range(6):
+        pairs = _assign_drones(drones, targets, range_km=120.0, state=state)
+        served, total = _dense_optimum(drones, targets, 120.0)
+        assert len(pairs) == served
+        assert sum(km for _, _, km in pairs) == pytest.approx(total)
+
+        # Drop a few targets and add new ones, as between simulation steps.
+        targets = [t for t in targets if rng.random() > 0.1]
+        for t in _targets(15, seed=next_id):
+            targets.append({**t, "cell_id": f"t{next_id}"})
+            next_id += 1
+
+
+def test_warm_start_keeps_plan_when_targets_repeat():
+    drones = _prepare_drones(20, _depots(5, seed=10))
+    targets = [{**t, "cell_id": f"t{k}"} for k, t in enumerate(_targets(80, seed=11))]
+    state = routing.RoutingState(warm_start=True)
+    first = _assign_drones(drones, targets, range_km=150.0, state=state)
+    again = _assign_drones(drones, list(reversed(targets)), range_km=150.0, state=state)
+    reversed_ids = [targets[len(targets) - 1 - t]["cell_id"] for _, t, _ in again]
+    assert reversed_ids == [targets[t]["cell_id"] for _, t, _ in first]
+
+
+def test_warm_start_serves_targets_with_repeated_ids():
+    rng = random.Random(12)
+    drones = _prepare_drones(25, _depots(5, seed=13))
+    state = routing.RoutingState(warm_start=True)
+    for step in range(5):
+        targets = [{**t, "cell_id": f"t{rng.randrange(30)}"} for t in _targets(60, seed=14 + step)]
+        pairs = _assign_drones(drones, targets, range_km=120.0, state=state)
+        served, total = _dense_optimum(drones, targets, 120.0)
+        assert len({t for _, t, _ in pairs}) == len(pairs) == served
+        assert sum(km for _, _, km in pairs) == pytest.approx(total)
+
+
+def test_plan_routes_reports_churn():
+    threats = {
+        "features": [
+            {
+                "geometry": {"coordinates": [[[-120.1, 36.9], [-119.9, 36.9], [-119.9, 37.1], [-120.1, 37.1]]]},
+                "properties": {"cell_id": "near", "severity_score": 0.9, "priority_score": 0.9},
+            }
+        ]
+    }
+    depots = [Depot("solo", 37.0, -120.5)]
+    state = routing.RoutingState(warm_start=True)
+    first = routing.plan_routes(threats, AppConfig(), drone_count=1, depots=depots, state=state)
+    props = first["features"][0]["properties"]
+    assert props["previous_target"] is None and props["reassigned"] is False
+
+    threats["features"][0]["properties"]["cell_id"] = "moved"
+    second = routing.plan_routes(threats, AppConfig(), drone_count=1, depots=depots, state=state)
+    props = second["features"][0]["properties"]
+    assert props["previous_target"] == "near" and props["reassigned"] is True
+
+
+def test_incremental_simulation_matches_cold_routing():
+    from dataclasses import replace
+
+    from app.config import DEFAULT_END, DEFAULT_START
+    from app.engine.pipeline import compute_simulation_with_routes
+    from app.utils.time import parse_time
+
+    bbox = BBox(min_lon=-124.5, min_lat=36.0, max_lon=-118.0, max_lat=39.5)
+    start, end = parse_time(DEFAULT_START, DEFAULT_START), parse_time(DEFAULT_END, DEFAULT_END)
+    results = [
+        compute_simulation_with_routes(
+            bbox, start, end, "synthetic", replace(AppConfig(), routing_incremental=incremental), 0.44, 6
+        )
+        for incremental in (False, True)
+    ]
+
+    def totals(result):
+        per_step = {}
+        for feature in result["routes"]["features"]:
+            props = feature["properties"]
+            per_step[props["timestamp"]] = per_step.get(props["timestamp"], 0.0) + props["distance_km"]
+        return per_step
+
+    cold, warm = results
+    assert totals(warm) == pytest.approx(totals(cold))
+    assert "churn" not in cold
+    assert all("reassigned" not in f["properties"] for f in cold["routes"]["features"])
+    assert set(warm["churn"]) == {f["properties"]["drone_id"] for f in warm["routes"]["features"]}
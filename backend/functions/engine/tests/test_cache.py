@@ -0,0 +1,39 @@
+from app.config import AppConfig, DEFAULT_BBOX, DEFAULT_START
+from app.engine.pipeline import cache_stats, clear_caches, compute_threats
+from app.models import BBox
+from app.utils.cache import LRUCache
+from app.utils.time import parse_time
+
+
+def test_lru_cache_evicts_and_expires(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: clock[0])
+
+    cache = LRUCache(maxsize=2, ttl_seconds=10.0)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+
+    clock[0] += 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_repeated_threat_requests_hit_the_cache():
+    clear_caches()
+    config = AppConfig()
+    bbox = BBox(min_lon=DEFAULT_BBOX[0], min_lat=DEFAULT_BBOX[1], max_lon=DEFAULT_BBOX[2], max_lat=DEFAULT_BBOX[3])
+    when = parse_time(None, DEFAULT_START)
+
+    first = compute_threats(bbox, when, "synthetic", config, config.threat_threshold)
+    first["features"].clear()
+    second = compute_threats(bbox, when, "synthetic", config, config.threat_threshold)
+
+    assert second["features"]
+    stats = cache_stats()
+    assert stats["threats"]["hits"] == 1
+    assert stats["threats"]["misses"] == 1
+    assert stats["layers"]["misses"] == 1
@@ -0,0 +1,110 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.engine.collision import continuous_contact_hours, hourly_contact_hours
+from app.models import BBox, StormCell
+from app.utils.geo import destination_point, generate_grid, haversine_km
+
+
+def _eastbound_storm(lat: float, lon: float) -> StormCell:
+    return StormCell(
+        id="cell-0",
+        center_lat=lat,
+        center_lon=lon,
+        radius_km=20.0,
+        speed_kmh=40.0,
+        bearing_deg=90.0,
+    )
+
+
+def test_continuous_contact_gives_fractional_eta():
+    grid = generate_grid(BBox(min_lon=-121.0, min_lat=37.9, max_lon=-119.0, max_lat=38.1), 0.05)
+    row = grid.rows // 2
+    storm = _eastbound_storm(grid.lats[row], -121.5)
+    eligible = np.ones((grid.rows, grid.cols), dtype=bool)
+
+    eta = continuous_contact_hours(grid, eligible, [storm], horizon_hours=6)
+
+    col = 10
+    dist = haversine_km(grid.lats[row], grid.lons[col], storm.center_lat, storm.center_lon)
+    expected = (dist - storm.radius_km) / storm.speed_kmh
+    assert math.isclose(eta[row, col], expected, rel_tol=1e-3)
+    assert eta[row, col] != math.floor(eta[row, col])
+
+
+def test_continuous_contact_agrees_with_hourly_sampling():
+    grid = generate_grid(BBox(min_lon=-121.0, min_lat=37.5, max_lon=-119.0, max_lat=38.5), 0.05)
+    storm = _eastbound_storm(38.0, -121.5)
+    eligible = np.ones((grid.rows, grid.cols), dtype=bool)
+
+    hourly = hourly_contact_hours(grid, eligible, [storm], horizon_hours=6)
+    continuous = continuous_contact_hours(grid, eligible, [storm], horizon_hours=6)
+
+    sampled = np.isfinite(hourly)
+    assert sampled.any()
+    # Every cell the hourly sampler sees is reached no later than that hour.
+    assert np.all(np.isfinite(continuous[sampled]))
+    assert np.all(continuous[sampled] <= hourly[sampled] + 1e-6)
+
+
+def test_continuous_contact_respects_eligibility_and_horizon():
+    grid = generate_grid(BBox(min_lon=-121.0, min_lat=37.9, max_lon=-119.0, max_lat=38.1), 0.05)
+    storm = _eastbound_storm(38.0, -121.5)
+    eligible = np.ones((grid.rows, grid.cols), dtype=bool)
+    eligible[:, 0] = False
+
+    eta = continuous_contact_hours(grid, eligible, [storm], horizon_hours=1)
+
+    assert np.all(np.isinf(eta[:, 0]))
+    assert np.all(eta[np.isfinite(eta)] <= 1.0)
+
+
+def _scalar_hourly_contact(grid, eligible, storm_cells, horizon_hours):
+    earliest = [[math.inf] * grid.cols for _ in range(grid.rows)]
+    for hour in range(1, horizon_hours + 1):
+        for cell in storm_cells:
+            p_lat, p_lon = destination_point(
+                cell.center_lat, cell.center_lon, cell.bearing_deg, cell.speed_kmh * hour
+            )
+            for r, lat in enumerate(grid.lats):
+                for c, lon in enumerate(grid.lons):
+                    if eligible[r, c] and haversine_km(lat, lon, p_lat, p_lon) <= cell.radius_km:
+                        earliest[r][c] = min(earliest[r][c], hour)
+    return np.array(earliest)
+
+
+@pytest.mark.parametrize(
+    "bbox",
+    [
+        BBox(min_lon=-121.0, min_lat=37.0, max_lon=-119.0, max_lat=39.0),
+        BBox(min_lon=20.0, min_lat=69.0, max_lon=26.0, max_lat=72.0),
+    ],
+)
+def test_hourly_contact_matches_scalar_reference(bbox):
+    grid = generate_grid(bbox, 0.1)
+    rng = np.random.default_rng(5)
+    eligible = rng.random((grid.rows, grid.cols)) > 0.2
+    mid_lat = (bbox.min_lat + bbox.max_lat) / 2
+    mid_lon = (bbox.min_lon + bbox.max_lon) / 2
+    storms = [
+        # Inside, on each edge, outside and heading in, outside heading away.
+        StormCell(id="inside", center_lat=mid_lat, center_lon=mid_lon, radius_km=15.0, speed_kmh=30.0, bearing_deg=45.0),
+        StormCell(id="west", center_lat=mid_lat, center_lon=bbox.min_lon, radius_km=25.0, speed_kmh=50.0, bearing_deg=80.0),
+        StormCell(id="north", center_lat=bbox.max_lat, center_lon=mid_lon, radius_km=20.0, speed_kmh=40.0, bearing_deg=190.0),
+        StormCell(
+            id="approach", center_lat=bbox.min_lat - 0.6, center_lon=bbox.max_lon + 0.8,
+            radius_km=30.0, speed_kmh=60.0, bearing_deg=315.0,
+        ),
+        StormCell(
+            id="leaving", center_lat=bbox.max_lat + 0.3, center_lon=bbox.min_lon - 0.3,
+            radius_km=40.0, speed_kmh=45.0, bearing_deg=300.0,
+        ),
+    ]
+
+    fast = hourly_contact_hours(grid, eligible, storms, horizon_hours=6)
+    expected = _scalar_hourly_contact(grid, eligible, storms, horizon_hours=6)
+
+    assert np.isfinite(expected).any()
+    np.testing.assert_array_equal(fast, expected)
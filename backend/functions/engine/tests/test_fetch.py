@@ -0,0 +1,124 @@
+import threading
+import time
+from dataclasses import replace
+
+import pytest
+
+from app.config import AppConfig, DEFAULT_BBOX
+from app.data.synthetic import SyntheticProvider
+from app.engine import pipeline
+from app.models import BBox
+from app.utils.geo import generate_grid
+from app.utils.time import parse_time
+
+BBOX = BBox(min_lon=DEFAULT_BBOX[0], min_lat=DEFAULT_BBOX[1], max_lon=DEFAULT_BBOX[2], max_lat=DEFAULT_BBOX[3])
+WHEN = parse_time("2020-08-15T00:00:00Z", "")
+
+
+class _SlowProvider(SyntheticProvider):
+    def __init__(self, delay: float, slow_layer: str = "", slow_delay: float = 0.0, broken_layer: str = ""):
+        super().__init__()
+        self.delay = delay
+        self.slow_layer = slow_layer
+        self.slow_delay = slow_delay
+        self.broken_layer = broken_layer
+
+    def __getattribute__(self, attr):
+        value = super().__getattribute__(attr)
+        if not attr.startswith("get_"):
+            return value
+        layer = attr[len("get_"):]
+
+        def wrapped(*args):
+            if layer == self.broken_layer:
+                raise RuntimeError("upstream 503")
+            time.sleep(self.slow_delay if layer == self.slow_layer else self.delay)
+            return value(*args)
+
+        return wrapped
+
+
+def _layers(monkeypatch, provider, config):
+    monkeypatch.setattr(pipeline, "get_provider", lambda mode: provider)
+    pipeline.clear_caches()
+    try:
+        return pipeline.compute_layers(BBOX, WHEN, "synthetic", config)
+    finally:
+        pipeline.clear_caches()
+
+
+def test_concurrent_fetch_is_bounded_by_slowest_layer(monkeypatch):
+    config = replace(AppConfig(), fetch_workers=len(pipeline.PROVIDER_INPUTS))
+    started = time.perf_counter()
+    stack = _layers(monkeypatch, _SlowProvider(delay=0.1), config)
+    elapsed = time.perf_counter() - started
+
+    assert stack.storm_cells
+    assert elapsed < 0.1 * len(pipeline.PROVIDER_INPUTS) / 2
+
+
+def test_timed_out_layer_is_reported_unavailable(monkeypatch):
+    config = replace(AppConfig(), fetch_workers=4, fetch_timeout_seconds=0.2)
+    provider = _SlowProvider(delay=0.0, slow_layer="cape", slow_delay=1.0)
+    with pytest.raises(ValueError, match=r"cape unavailable .*timed out after 0.2s"):
+        _layers(monkeypatch, provider, config)
+
+
+def test_fetch_timeout_counts_from_call_start(monkeypatch):
+    # Every call is well inside the timeout, but on two threads the last ones
+    # only start after the timeout has passed.
+    config = replace(AppConfig(), fetch_workers=2, fetch_timeout_seconds=0.2)
+    stack = _layers(monkeypatch, _SlowProvider(delay=0.05), config)
+    assert stack.storm_cells
+
+
+def test_timed_out_call_retires_its_pool(monkeypatch):
+    config = replace(AppConfig(), fetch_workers=2, fetch_timeout_seconds=0.2)
+    before = pipeline._fetch_pool(2)
+    with pytest.raises(ValueError, match=r"cape unavailable"):
+        _layers(monkeypatch, _SlowProvider(delay=0.0, slow_layer="cape", slow_delay=1.0), config)
+    assert pipeline._fetch_pool(2) is not before
+
+    # The abandoned call still holds a thread of the old pool; new fetches do
+    # not queue behind it.
+    started = time.perf_counter()
+    assert _layers(monkeypatch, _SlowProvider(delay=0.0), config).storm_cells
+    assert time.perf_counter() - started < 0.5
+
+
+def test_pool_retirement_spares_other_requests():
+    # One request's stuck call retires the shared pool while another request
+    # has calls running and queued on it; the other request still completes.
+    grid = generate_grid(BBOX, AppConfig().grid_resolution_deg)
+    names = list(pipeline.PROVIDER_INPUTS)
+    stuck = replace(AppConfig(), fetch_workers=2, fetch_timeout_seconds=0.2)
+    patient = replace(stuck, fetch_timeout_seconds=5.0)
+    failures = []
+
+    def stuck_request():
+        try:
+            provider = _SlowProvider(delay=0.0, slow_layer="cape", slow_delay=1.0)
+            pipeline._fetch_inputs(provider, BBOX, grid, WHEN, names, stuck)
+        except ValueError as exc:
+            failures.append(str(exc))
+
+    thread = threading.Thread(target=stuck_request)
+    thread.start()
+    time.sleep(0.05)
+    started = time.perf_counter()
+    inputs = pipeline._fetch_inputs(_SlowProvider(delay=0.02), BBOX, grid, WHEN, names, patient)
+    elapsed = time.perf_counter() - started
+    thread.join()
+
+    assert failures and "cape unavailable" in failures[0]
+    assert set(inputs) == set(names)
+    # Finished without waiting for the stuck call to return.
+    assert elapsed < 0.9
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_failing_layer_is_reported_unavailable(monkeypatch, workers):
+    config = replace(AppConfig(), fetch_workers=workers)
+    provider = _SlowProvider(delay=0.0, broken_layer="low_level_rh")
+    with pytest.raises(ValueError, match=r"low_level_rh unavailable .*RuntimeError: upstream 503"):
+        _layers(monkeypatch, provider, config)
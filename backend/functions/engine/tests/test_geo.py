@@ -0,0 +1,78 @@
+import random
+
+import numpy as np
+
+from app.models import BBox
+from app.utils.geo import (
+    destination_point,
+    destination_points,
+    distance_raster_km,
+    generate_grid,
+    haversine_km,
+    haversine_km_matrix,
+    lattice_grid,
+)
+
+TOLERANCE_KM = 1e-9
+
+
+def _random_points(rng: random.Random, count: int):
+    return [(rng.uniform(-80.0, 80.0), rng.uniform(-180.0, 180.0)) for _ in range(count)]
+
+
+def test_haversine_matrix_matches_scalar():
+    rng = random.Random(3)
+    origins = _random_points(rng, 25)
+    targets = _random_points(rng, 40)
+
+    matrix = haversine_km_matrix(
+        [p[0] for p in origins], [p[1] for p in origins], [p[0] for p in targets], [p[1] for p in targets]
+    )
+
+    assert matrix.shape == (25, 40)
+    for i, (lat1, lon1) in enumerate(origins):
+        for j, (lat2, lon2) in enumerate(targets):
+            assert abs(matrix[i, j] - haversine_km(lat1, lon1, lat2, lon2)) <= TOLERANCE_KM
+
+
+def test_distance_raster_matches_scalar():
+    grid = generate_grid(BBox(min_lon=-124.5, min_lat=36.0, max_lon=-118.0, max_lat=39.5), 0.25)
+    raster = distance_raster_km(grid, 38.58, -121.49)
+
+    expected = np.array([[haversine_km(lat, lon, 38.58, -121.49) for lon in grid.lons] for lat in grid.lats])
+    assert raster.shape == (grid.rows, grid.cols)
+    assert np.max(np.abs(raster - expected)) <= TOLERANCE_KM
+
+
+def test_destination_points_match_scalar_for_storms_by_hours():
+    rng = random.Random(5)
+    storms = [(rng.uniform(30.0, 45.0), rng.uniform(-125.0, -115.0), rng.uniform(0.0, 360.0), rng.uniform(15.0, 60.0)) for _ in range(8)]
+    hours = np.arange(1, 7, dtype=np.float64)
+
+    lats = np.array([s[0] for s in storms])[:, None]
+    lons = np.array([s[1] for s in storms])[:, None]
+    bearings = np.array([s[2] for s in storms])[:, None]
+    speeds = np.array([s[3] for s in storms])[:, None]
+    out_lats, out_lons = destination_points(lats, lons, bearings, speeds * hours[None, :])
+
+    assert out_lats.shape == (8, 6)
+    for k, (lat, lon, bearing, speed) in enumerate(storms):
+        for h, hour in enumerate(hours):
+            exp_lat, exp_lon = destination_point(lat, lon, bearing, speed * hour)
+            # Compare the positions as ground distance in km.
+            assert haversine_km(exp_lat, exp_lon, out_lats[k, h], out_lons[k, h]) <= TOLERANCE_KM
+
+
+def test_lattice_grid_snaps_neighbours_to_shared_cells():
+    left = lattice_grid(BBox(min_lon=-121.03, min_lat=37.01, max_lon=-120.52, max_lat=37.49), 0.1)
+    right = lattice_grid(BBox(min_lon=-120.52, min_lat=37.01, max_lon=-120.11, max_lat=37.49), 0.1)
+    assert left.lats == right.lats
+    # The column straddling the shared edge belongs to both, at one centre.
+    assert left.lons[-1] == right.lons[0]
+    assert left.bbox.min_lon <= -121.03 and left.bbox.max_lon >= -120.52
+    assert left.cols == len(left.lons) and left.rows == len(left.lats)
+
+    # Edges on lattice lines add no sliver cells, and tiny boxes keep one cell.
+    aligned = lattice_grid(BBox(min_lon=-121.0, min_lat=37.0, max_lon=-120.5, max_lat=37.5), 0.1)
+    assert (aligned.rows, aligned.cols) == (5, 5)
+    assert lattice_grid(BBox(min_lon=-121.001, min_lat=37.001, max_lon=-121.0, max_lat=37.002), 0.1).cols == 1
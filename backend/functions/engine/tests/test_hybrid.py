@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+
+from app.config import DEFAULT_START
+from app.data.hybrid import HybridProvider
+from app.data.real import RealProvider
+from app.data.synthetic import SyntheticProvider
+from app.main import app
+from app.models import BBox
+from app.utils.geo import generate_grid
+from app.utils.time import parse_time
+
+BBOX = BBox(min_lon=-122.0, min_lat=37.0, max_lon=-121.0, max_lat=38.0)
+
+
+class _CountingSynthetic(SyntheticProvider):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def get_slope(self, bbox, grid, when):
+        self.calls.append("slope")
+        return super().get_slope(bbox, grid, when)
+
+    def get_cape(self, bbox, grid, when):
+        self.calls.append("cape")
+        return super().get_cape(bbox, grid, when)
+
+
+class _SlopeOnlyReal(RealProvider):
+    def __init__(self):
+        self.store = None
+
+    def get_slope(self, bbox, grid, when):
+        return SyntheticProvider(seed=7).get_slope(bbox, grid, when)
+
+
+def test_synthetic_runs_only_when_real_misses():
+    synthetic = _CountingSynthetic()
+    hybrid = HybridProvider(real=_SlopeOnlyReal(), synthetic=synthetic)
+    grid = generate_grid(BBOX, 0.1)
+    when = parse_time("2020-08-15T00:00:00Z", "")
+
+    hybrid.get_slope(BBOX, grid, when)
+    hybrid.get_cape(BBOX, grid, when)
+
+    assert synthetic.calls == ["cape"]
+    assert hybrid.provenance() == {"slope": "real", "cape": "synthetic"}
+
+
+async def _get_layers(data_mode: str):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/layers", params={"time": DEFAULT_START, "data_mode": data_mode})
+
+
+def test_layers_meta_reports_provenance():
+    provenance = asyncio.run(_get_layers("hybrid")).json()["meta"]["provenance"]
+    assert provenance["ndvi"] == "synthetic"
+    assert provenance["storm_cells"] == "synthetic"
+    assert len(provenance) == 11
@@ -0,0 +1,40 @@
+import numpy as np
+
+from app.models import BBox
+from app.utils.geo import CALIFORNIA_LAND_POLYGON, cell_polygon, generate_grid, point_in_polygon
+from app.utils.landmask import land_mask
+
+
+def test_land_mask_matches_point_in_polygon():
+    grid = generate_grid(BBox(min_lon=-125.5, min_lat=32.0, max_lon=-114.0, max_lat=42.5), 0.1)
+    mask = land_mask(grid)
+
+    center = np.array(
+        [[point_in_polygon(lon, lat, CALIFORNIA_LAND_POLYGON) for lon in grid.lons] for lat in grid.lats]
+    )
+    full = np.array(
+        [
+            [
+                all(
+                    point_in_polygon(p_lon, p_lat, CALIFORNIA_LAND_POLYGON)
+                    for p_lon, p_lat in cell_polygon(lon, lat, grid.resolution_deg)
+                )
+                for lon in grid.lons
+            ]
+            for lat in grid.lats
+        ]
+    )
+
+    assert np.array_equal(mask.center, center)
+    assert np.array_equal(mask.full, full)
+    assert mask.center.any() and not mask.center.all()
+
+
+def test_land_mask_is_cached_per_grid():
+    bbox = BBox(min_lon=-124.5, min_lat=36.0, max_lon=-118.0, max_lat=39.5)
+    first = land_mask(generate_grid(bbox, 0.05))
+    again = land_mask(generate_grid(bbox, 0.05))
+    finer = land_mask(generate_grid(bbox, 0.025))
+
+    assert again is first
+    assert finer is not first
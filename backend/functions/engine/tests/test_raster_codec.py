@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+from app.config import DEFAULT_START
+from app.main import app
+from app.models import BBox
+from app.utils.geo import generate_grid
+from app.utils.raster_codec import decode_layers, encode_layers
+
+BBOX = (-122.0, 37.0, -121.0, 38.0)
+
+
+def _planes(grid):
+    rng = np.random.default_rng(7)
+    return {name: rng.random((grid.rows, grid.cols)) for name in ("fuel", "atmospheric")}
+
+
+@pytest.mark.parametrize(
+    "dtype, tolerance",
+    [("float32", 1e-7), ("uint16", 0.5 / 65535 + 1e-12), ("uint8", 0.5 / 255 + 1e-12)],
+)
+@pytest.mark.parametrize("compress", [False, True])
+def test_roundtrip_within_quantization(dtype, tolerance, compress):
+    grid = generate_grid(BBox(min_lon=BBOX[0], min_lat=BBOX[1], max_lon=BBOX[2], max_lat=BBOX[3]), 0.1)
+    planes = _planes(grid)
+    decoded = decode_layers(encode_layers(grid, BBOX, planes, dtype=dtype, compress=compress))
+
+    assert (decoded.rows, decoded.cols) == (grid.rows, grid.cols)
+    assert decoded.resolution_deg == grid.resolution_deg
+    assert decoded.bbox == BBOX
+    assert list(decoded.planes) == ["fuel", "atmospheric"]
+    for name, values in planes.items():
+        assert np.max(np.abs(decoded.planes[name] - values)) <= tolerance
+
+
+def test_decode_rejects_foreign_payload():
+    with pytest.raises(ValueError):
+        decode_layers(b"not a layer payload at all" * 4)
+
+
+async def _get_layers(**params):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/layers", params={"time": DEFAULT_START, "data_mode": "synthetic", **params})
+
+
+def test_layers_endpoint_binary_matches_json():
+    as_json = asyncio.run(_get_layers()).json()
+    response = asyncio.run(_get_layers(format="uint16", compress="true"))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    decoded = decode_layers(response.content)
+    assert decoded.rows == as_json["meta"]["rows"]
+    assert decoded.cols == as_json["meta"]["cols"]
+    for name in ("fuel", "atmospheric", "consequence"):
+        assert np.allclose(decoded.planes[name], np.array(as_json["layers"][name]), atol=1e-4)
+    assert len(response.content) * 10 < len(asyncio.run(_get_layers()).content)
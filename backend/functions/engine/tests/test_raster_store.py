@@ -0,0 +1,108 @@
+import numpy as np
+
+from app.data.hybrid import HybridProvider
+from app.data.raster_store import STORE_ENV_VAR, open_store, write_raster
+from app.data.real import RealProvider
+from app.data.synthetic import SyntheticProvider
+from app.models import BBox
+from app.utils.geo import generate_grid
+from app.utils.time import parse_time
+
+STORE_BBOX = (-125.0, 32.0, -114.0, 42.0)
+REQUEST = BBox(min_lon=-122.0, min_lat=37.0, max_lon=-121.0, max_lat=38.0)
+
+
+def _lattice(res: float):
+    lats = STORE_BBOX[1] + res * (np.arange(int(round((STORE_BBOX[3] - STORE_BBOX[1]) / res))) + 0.5)
+    lons = STORE_BBOX[0] + res * (np.arange(int(round((STORE_BBOX[2] - STORE_BBOX[0]) / res))) + 0.5)
+    return lats, lons
+
+
+def test_windowed_read_resamples_onto_grid(tmp_path):
+    lats, lons = _lattice(0.01)
+    # Encode each source cell's own centre so the resample can be checked exactly.
+    write_raster(str(tmp_path), "slope", np.add.outer(lats * 1000.0, lons), STORE_BBOX)
+
+    provider = RealProvider(str(tmp_path))
+    grid = generate_grid(REQUEST, 0.05)
+    layer = provider.get_slope(REQUEST, grid, parse_time("2020-08-15T00:00:00Z", ""))
+
+    expected = np.add.outer(grid.lat_array * 1000.0, grid.lon_array)
+    assert layer.shape == (grid.rows, grid.cols)
+    # Nearest source centre is at most half a source cell away on each axis.
+    assert np.allclose(layer.values, expected, atol=0.005 * 1000.0 + 0.005 + 0.01)
+    assert provider.get_ndvi(REQUEST, grid, parse_time("2020-08-15T00:00:00Z", "")) is None
+
+
+def test_timed_entries_pick_latest_at_or_before(tmp_path):
+    lats, lons = _lattice(0.1)
+    shape = (lats.size, lons.size)
+    for hour, value in ((0, 1.0), (6, 2.0)):
+        when = parse_time(f"2020-08-15T{hour:02d}:00:00Z", "")
+        write_raster(str(tmp_path), "cape", np.full(shape, value), STORE_BBOX, when)
+
+    store = open_store(str(tmp_path))
+    grid = generate_grid(REQUEST, 0.1)
+    assert store.read("cape", grid, parse_time("2020-08-14T23:00:00Z", "")) is None
+    assert store.read("cape", grid, parse_time("2020-08-15T05:00:00Z", ""))[0, 0] == 1.0
+    assert store.read("cape", grid, parse_time("2020-08-15T06:00:00Z", ""))[0, 0] == 2.0
+
+
+def test_hybrid_falls_back_outside_store_coverage(tmp_path, monkeypatch):
+    write_raster(str(tmp_path), "slope", np.full((10, 10), 7.0), (-122.0, 37.0, -121.5, 37.5))
+    monkeypatch.setenv(STORE_ENV_VAR, str(tmp_path))
+
+    hybrid = HybridProvider(real=RealProvider(), synthetic=SyntheticProvider())
+    when = parse_time("2020-08-15T00:00:00Z", "")
+    inside = BBox(min_lon=-121.9, min_lat=37.1, max_lon=-121.6, max_lat=37.4)
+    assert np.all(hybrid.get_slope(inside, generate_grid(inside, 0.05), when).values == 7.0)
+
+    grid = generate_grid(REQUEST, 0.05)
+    fallback = hybrid.get_slope(REQUEST, grid, when).values
+    assert np.array_equal(fallback, SyntheticProvider().get_slope(REQUEST, grid, when).values)
+
+
+def test_missing_store_means_no_data(monkeypatch, tmp_path):
+    monkeypatch.delenv(STORE_ENV_VAR, raising=False)
+    assert RealProvider().store is None
+    assert RealProvider(str(tmp_path / "absent")).store is None
+
+
+def test_entries_with_different_bboxes_are_mosaicked(tmp_path):
+    when = parse_time("2020-08-15T00:00:00Z", "")
+    west, east = (-122.0, 37.0, -121.5, 38.0), (-121.5, 37.0, -121.0, 38.0)
+    for hour in (0, 6):
+        stamp = parse_time(f"2020-08-15T{hour:02d}:00:00Z", "")
+        write_raster(str(tmp_path), "cape", np.full((10, 5), 1.0 + hour), west, stamp)
+        write_raster(str(tmp_path), "cape", np.full((10, 5), 2.0 + hour), east, stamp)
+    # Listed later, so it wins where it overlaps the two tiles above.
+    write_raster(str(tmp_path), "cape", np.full((2, 2), 9.0), (-121.6, 37.4, -121.4, 37.6), when)
+
+    store = open_store(str(tmp_path))
+    grid = generate_grid(REQUEST, 0.1)
+    values = store.read("cape", grid, when)
+    lon_west = grid.lon_array < -121.5
+    overlap = np.outer(np.abs(grid.lat_array - 37.5) < 0.1, np.abs(grid.lon_array + 121.5) < 0.1)
+    assert np.all(values[overlap] == 9.0)
+    assert np.all(values[:, lon_west][~overlap[:, lon_west]] == 1.0)
+    assert np.all(values[:, ~lon_west][~overlap[:, ~lon_west]] == 2.0)
+    assert np.all(store.read("cape", grid, parse_time("2020-08-15T06:00:00Z", ""))[:, lon_west] == 7.0)
+
+    # The tiles leave the rest of the store bbox uncovered.
+    wider = BBox(min_lon=-122.5, min_lat=37.0, max_lon=-121.0, max_lat=38.0)
+    assert store.read("cape", generate_grid(wider, 0.1), when) is None
+
+
+def test_timed_store_layers_are_not_static(tmp_path):
+    lats, lons = _lattice(0.1)
+    write_raster(str(tmp_path), "slope", np.zeros((lats.size, lons.size)), STORE_BBOX)
+    provider = RealProvider(str(tmp_path))
+    assert "slope" in provider.static_layers
+    version = provider.static_version()
+
+    when = parse_time("2020-08-15T00:00:00Z", "")
+    write_raster(str(tmp_path), "slope", np.ones((lats.size, lons.size)), STORE_BBOX, when)
+    provider = RealProvider(str(tmp_path))
+    assert "slope" not in provider.static_layers
+    assert "fuel_type" in provider.static_layers
+    assert provider.static_version() != version
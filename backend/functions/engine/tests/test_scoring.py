@@ -0,0 +1,147 @@
+import numpy as np
+
+from app.config import AppConfig
+from app.engine.scoring import score_dynamic, score_static
+from app.models import BBox
+from app.utils.geo import clamp, generate_grid
+from app.utils.layer import Layer
+
+
+def _random_layers(seed: int = 7):
+    grid = generate_grid(BBox(min_lon=-124.5, min_lat=36.0, max_lon=-118.0, max_lat=39.5), 0.1)
+    rng = np.random.default_rng(seed)
+
+    def layer(low, high):
+        # Deliberately exceed each layer's clamp range to exercise clipping.
+        return Layer(grid, rng.uniform(low, high, size=(grid.rows, grid.cols)))
+
+    return grid, {
+        "ndvi": layer(-0.2, 1.2),
+        "slope": layer(-5.0, 70.0),
+        "fuel_type": layer(-0.2, 1.2),
+        "cape": layer(0.0, 3500.0),
+        "dewpoint_dep": layer(-2.0, 32.0),
+        "cloud_base_km": layer(0.0, 6.0),
+        "low_level_rh": layer(0.0, 100.0),
+        "precip_eff": layer(0.0, 1.0),
+        "population": layer(-0.1, 1.1),
+        "infrastructure": layer(-0.1, 1.1),
+    }
+
+
+def _fused(layers, config):
+    static = score_static(
+        layers["slope"], layers["fuel_type"], layers["population"], layers["infrastructure"], config
+    )
+    return score_dynamic(
+        static,
+        layers["ndvi"],
+        layers["cape"],
+        layers["dewpoint_dep"],
+        layers["cloud_base_km"],
+        layers["low_level_rh"],
+        layers["precip_eff"],
+        config,
+    )
+
+
+# Unfused per-layer scorers, kept as references for the fused kernel.
+def _reference_fuel(ndvi, slope, fuel_type, config):
+    slope_norm = np.clip(slope.values / 40.0, 0.0, 1.0)
+    fuel_norm = np.clip(fuel_type.values, 0.0, 1.0)
+
+    score = (
+        config.fuel_ndvi_weight * np.clip(ndvi.values, 0.0, 1.0)
+        + config.fuel_slope_weight * slope_norm
+        + config.fuel_type_weight * fuel_norm
+    )
+    return Layer(ndvi.grid, np.clip(score, 0.0, 1.0))
+
+
+def _reference_atmospheric(cape, dewpoint_dep, cloud_base_km, low_level_rh, precip_eff, config):
+    cape_score = np.clip((cape.values - 500.0) / 2000.0, 0.0, 1.0)
+    dpd_score = np.clip(dewpoint_dep.values / 20.0, 0.0, 1.0)
+    cbh_score = np.clip((cloud_base_km.values - 1.0) / 3.0, 0.0, 1.0)
+    rh_score = np.clip((50.0 - low_level_rh.values) / 40.0, 0.0, 1.0)
+    pe_score = np.clip((0.5 - precip_eff.values) / 0.5, 0.0, 1.0)
+
+    score = (
+        config.atmo_cape_weight * cape_score
+        + config.atmo_dewpoint_dep_weight * dpd_score
+        + config.atmo_cloud_base_weight * cbh_score
+        + config.atmo_low_rh_weight * rh_score
+        + config.atmo_precip_eff_weight * pe_score
+    )
+    return Layer(cape.grid, np.clip(score, 0.0, 1.0))
+
+
+def _reference_consequence(population, infrastructure, config):
+    score = (
+        config.consequence_population_weight * np.clip(population.values, 0.0, 1.0)
+        + config.consequence_infra_weight * np.clip(infrastructure.values, 0.0, 1.0)
+    )
+    return Layer(population.grid, np.clip(score, 0.0, 1.0))
+
+
+def _scalar_severity(fuel, atmo, consequence, config):
+    return [
+        [
+            config.fuel_layer_weight * f
+            + config.atmospheric_layer_weight * a
+            + config.consequence_layer_weight * c
+            for f, a, c in zip(f_row, a_row, c_row)
+        ]
+        for f_row, a_row, c_row in zip(fuel, atmo, consequence)
+    ]
+
+
+def _scalar_fuel(ndvi, slope, fuel_type, config):
+    return [
+        [
+            clamp(
+                config.fuel_ndvi_weight * clamp(n, 0.0, 1.0)
+                + config.fuel_slope_weight * clamp(s / 40.0, 0.0, 1.0)
+                + config.fuel_type_weight * clamp(f, 0.0, 1.0),
+                0.0,
+                1.0,
+            )
+            for n, s, f in zip(n_row, s_row, f_row)
+        ]
+        for n_row, s_row, f_row in zip(ndvi, slope, fuel_type)
+    ]
+
+
+def test_fused_kernel_matches_individual_scorers():
+    config = AppConfig()
+    _, layers = _random_layers()
+
+    fused = _fused(layers, config)
+
+    fuel = _reference_fuel(layers["ndvi"], layers["slope"], layers["fuel_type"], config)
+    atmo = _reference_atmospheric(
+        layers["cape"],
+        layers["dewpoint_dep"],
+        layers["cloud_base_km"],
+        layers["low_level_rh"],
+        layers["precip_eff"],
+        config,
+    )
+    consequence = _reference_consequence(layers["population"], layers["infrastructure"], config)
+
+    assert np.array_equal(fused.fuel.values, fuel.values)
+    assert np.array_equal(fused.atmospheric.values, atmo.values)
+    assert np.array_equal(fused.consequence.values, consequence.values)
+
+    severity = _scalar_severity(fuel.tolist(), atmo.tolist(), consequence.tolist(), config)
+    assert fused.severity.tolist() == severity
+
+
+def test_fused_kernel_matches_scalar_reference():
+    config = AppConfig(fuel_ndvi_weight=0.45, fuel_slope_weight=0.35, fuel_type_weight=0.2)
+    _, layers = _random_layers(seed=11)
+
+    fused = _fused(layers, config)
+    expected = _scalar_fuel(
+        layers["ndvi"].tolist(), layers["slope"].tolist(), layers["fuel_type"].tolist(), config
+    )
+    assert fused.fuel.tolist() == expected
@@ -0,0 +1,28 @@
+from dataclasses import replace
+
+from app.config import AppConfig, DEFAULT_BBOX
+from app.engine import pipeline
+from app.engine.pipeline import clear_caches, compute_simulation
+from app.models import BBox
+from app.utils.time import parse_time
+
+
+def test_parallel_simulation_matches_serial():
+    bbox = BBox(min_lon=DEFAULT_BBOX[0], min_lat=DEFAULT_BBOX[1], max_lon=DEFAULT_BBOX[2], max_lat=DEFAULT_BBOX[3])
+    start = parse_time("2020-08-15T00:00:00Z", "")
+    end = parse_time("2020-08-16T00:00:00Z", "")
+    serial_config = AppConfig()
+    parallel_config = replace(serial_config, simulate_workers=2)
+
+    clear_caches()
+    serial = compute_simulation(bbox, start, end, "synthetic", serial_config, 0.44, 6)
+    clear_caches()
+    parallel = compute_simulation(bbox, start, end, "synthetic", parallel_config, 0.44, 6)
+
+    assert serial["features"]
+    assert parallel == serial
+
+    # Later replays reuse the same worker processes.
+    pool = pipeline._SIMULATE_POOLS[2]
+    assert compute_simulation(bbox, start, end, "synthetic", parallel_config, 0.44, 6) == serial
+    assert pipeline._SIMULATE_POOLS[2] is pool
@@ -0,0 +1,35 @@
+import numpy as np
+
+from app.config import AppConfig, DEFAULT_BBOX
+from app.data.synthetic import SyntheticProvider
+from app.engine.pipeline import cache_stats, clear_caches, compute_layers
+from app.models import BBox
+from app.utils.geo import generate_grid
+from app.utils.time import parse_time
+
+BBOX = BBox(min_lon=DEFAULT_BBOX[0], min_lat=DEFAULT_BBOX[1], max_lon=DEFAULT_BBOX[2], max_lat=DEFAULT_BBOX[3])
+T0 = parse_time("2020-08-15T00:00:00Z", "")
+T1 = parse_time("2020-08-15T06:00:00Z", "")
+
+
+def test_synthetic_static_layers_ignore_time():
+    provider = SyntheticProvider()
+    grid = generate_grid(BBOX, 0.1)
+    for name in ("slope", "fuel_type", "population_proximity", "infrastructure_density"):
+        assert name in provider.static_layers
+        getter = getattr(provider, f"get_{name}")
+        assert np.array_equal(getter(BBOX, grid, T0).values, getter(BBOX, grid, T1).values)
+    assert not SyntheticProvider(legacy_exact=True).static_layers
+
+
+def test_static_scores_are_shared_across_timesteps():
+    clear_caches()
+    config = AppConfig()
+    first = compute_layers(BBOX, T0, "synthetic", config)
+    second = compute_layers(BBOX, T1, "synthetic", config)
+
+    stats = cache_stats()["static"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert second.scores.consequence is first.scores.consequence
+    assert not np.array_equal(first.scores.atmospheric.values, second.scores.atmospheric.values)
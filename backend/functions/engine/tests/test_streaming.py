@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+import httpx
+
+from app.config import DEFAULT_END, DEFAULT_START
+from app.engine import pipeline
+from app.main import app
+
+
+async def _request(method: str, url: str, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, url, **kwargs)
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_threats_stream_matches_collection():
+    params = {"time": DEFAULT_START, "data_mode": "synthetic"}
+    full = asyncio.run(_request("GET", "/threats", params=params))
+    streamed = asyncio.run(
+        _request("GET", "/threats", params=params, headers={"Accept": "application/x-ndjson"})
+    )
+
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    assert _lines(streamed) == full.json()["features"]
+
+
+def test_simulate_stream_yields_one_record_per_step():
+    body = {"start_time": DEFAULT_START, "end_time": DEFAULT_END, "data_mode": "synthetic"}
+    response = asyncio.run(_request("POST", "/simulate?stream=1", json=body))
+    assert response.status_code == 200
+
+    steps = _lines(response)
+    assert len(steps) >= 2
+    timestamps = [step["timestamp"] for step in steps]
+    assert timestamps == sorted(timestamps)
+    for step in steps:
+        assert step["threats"]["type"] == "FeatureCollection"
+        for feature in step["routes"]["features"]:
+            assert feature["properties"]["timestamp"] == step["timestamp"]
+
+
+def test_simulate_stream_bypasses_threat_cache():
+    pipeline.clear_caches()
+    body = {"start_time": DEFAULT_START, "end_time": DEFAULT_END, "data_mode": "synthetic"}
+    response = asyncio.run(_request("POST", "/simulate?stream=1", json=body))
+    assert response.status_code == 200
+    assert len(_lines(response)) >= 2
+    assert pipeline._THREAT_CACHE.stats()["size"] == 0
+
+
+def test_simulate_stream_reports_bad_window():
+    body = {"start_time": DEFAULT_END, "end_time": DEFAULT_START}
+    response = asyncio.run(_request("POST", "/simulate?stream=1", json=body))
+    assert response.status_code == 400
@@ -0,0 +1,89 @@
+import math
+import random
+import threading
+
+import numpy as np
+
+from app.data.synthetic import SyntheticProvider
+from app.models import BBox
+from app.utils.geo import clamp, generate_grid
+from app.utils.time import parse_time
+
+BBOX = BBox(min_lon=-124.5, min_lat=36.0, max_lon=-118.0, max_lat=39.5)
+WHEN = parse_time("2020-08-15T00:00:00Z", "")
+
+LAYERS = [
+    "get_ndvi",
+    "get_slope",
+    "get_fuel_type",
+    "get_cape",
+    "get_dewpoint_depression",
+    "get_cloud_base_height",
+    "get_low_level_rh",
+    "get_precip_efficiency",
+    "get_population_proximity",
+    "get_infrastructure_density",
+]
+
+
+def _scalar_cape(grid, seed=42):
+    # The original per-cell generator for CAPE.
+    rng = random.Random(seed + int(WHEN.timestamp()) + int(BBOX.min_lat * 100) + int(BBOX.min_lon * 100))
+    values = []
+    for lat in grid.lats:
+        row = []
+        for lon in grid.lons:
+            pattern = (math.sin(lat * 0.6) + math.cos(lon * 0.6)) / 2
+            row.append(clamp(800.0 + 1200.0 * pattern + rng.uniform(-200.0, 200.0), 0.0, 3000.0))
+        values.append(row)
+    return values
+
+
+def test_legacy_exact_reproduces_scalar_sequence():
+    grid = generate_grid(BBOX, 0.25)
+    provider = SyntheticProvider(legacy_exact=True)
+    assert provider.get_cape(BBOX, grid, WHEN).tolist() == _scalar_cape(grid)
+
+
+def test_vectorized_fields_are_deterministic_and_match_legacy_statistics():
+    grid = generate_grid(BBOX, 0.05)
+    legacy = SyntheticProvider(legacy_exact=True)
+    fast = SyntheticProvider()
+    again = SyntheticProvider()
+
+    for name in LAYERS:
+        expected = getattr(legacy, name)(BBOX, grid, WHEN).values
+        actual = getattr(fast, name)(BBOX, grid, WHEN).values
+        assert np.array_equal(actual, getattr(again, name)(BBOX, grid, WHEN).values)
+        assert actual.min() >= expected.min() - 0.05 * abs(expected.min()) - 1e-9
+        assert actual.max() <= expected.max() + 0.05 * abs(expected.max()) + 1e-9
+        assert math.isclose(actual.mean(), expected.mean(), rel_tol=0.02, abs_tol=1e-3)
+
+
+def test_storm_cells_do_not_depend_on_generator_mode():
+    legacy = SyntheticProvider(legacy_exact=True).get_storm_cells(BBOX, WHEN)
+    fast = SyntheticProvider().get_storm_cells(BBOX, WHEN)
+    assert legacy == fast
+
+
+def test_memoized_intermediates_build_concurrently():
+    provider = SyntheticProvider()
+    other_started = threading.Event()
+    built = []
+
+    def waits_for_other():
+        # Deadlocks (and times out) if building one key blocks every other key.
+        built.append(other_started.wait(timeout=2.0))
+        return "a"
+
+    def other():
+        other_started.set()
+        return "b"
+
+    first = threading.Thread(target=provider._memoized, args=("a", waits_for_other))
+    first.start()
+    assert provider._memoized("b", other) == "b"
+    first.join()
+    assert built == [True]
+    # Built once: later lookups hit the memo.
+    assert provider._memoized("a", lambda: "rebuilt") == "a"
@@ -0,0 +1,148 @@
+import asyncio
+import math
+
+import httpx
+import numpy as np
+import pytest
+
+from app.config import DEFAULT_START, AppConfig
+from app.config import DEFAULT_BBOX
+from app.data import get_provider
+from app.engine import pipeline
+from app.engine.pipeline import compute_grid_scores
+from app.engine.tiles import (
+    TILE_CELLS,
+    clear_tile_cache,
+    layer_tile,
+    tile_bbox,
+    tile_cache_stats,
+    tile_resolution,
+)
+from app.models import BBox
+from app.utils.geo import lattice_grid
+from app.utils.time import parse_time
+from app.main import app
+
+
+def _lonlat_to_tile(lon: float, lat: float, z: int):
+    n = 1 << z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return x, y
+
+
+def test_tile_bbox_edges_line_up():
+    left = tile_bbox(7, 20, 49)
+    right = tile_bbox(7, 21, 49)
+    below = tile_bbox(7, 20, 50)
+    assert left.max_lon == right.min_lon
+    assert left.min_lat == pytest.approx(below.max_lat)
+    with pytest.raises(ValueError):
+        tile_bbox(3, 8, 0)
+
+
+def test_tile_resolution_ladder():
+    config = AppConfig()
+    assert tile_resolution(0, config) >= 360.0 / TILE_CELLS
+    assert tile_resolution(18, config) == config.grid_resolution_deg
+    for z in range(18):
+        steps = math.log2(tile_resolution(z, config) / config.grid_resolution_deg)
+        assert steps == pytest.approx(round(steps))
+
+
+def test_adjacent_layer_tiles_stitch():
+    clear_tile_cache()
+    config = AppConfig()
+    when = parse_time(DEFAULT_START, DEFAULT_START)
+    scenario = BBox(**dict(zip(("min_lon", "min_lat", "max_lon", "max_lat"), DEFAULT_BBOX)))
+    z = 8
+    x, y = _lonlat_to_tile(-121.0, 38.0, z)
+    left = layer_tile("severity", z, x, y, scenario, when, "synthetic", config)
+    right = layer_tile("severity", z, x + 1, y, scenario, when, "synthetic", config)
+    assert left.grid.lats == right.grid.lats
+    assert max(left.grid.rows, left.grid.cols) <= TILE_CELLS
+
+    # Both tiles are cut from one lattice: they match a grid spanning both
+    # and agree on the column they share.
+    both = lattice_grid(
+        BBox(min_lon=left.bbox.min_lon, min_lat=left.bbox.min_lat, max_lon=right.bbox.max_lon, max_lat=left.bbox.max_lat),
+        left.resolution_deg,
+    )
+    full = compute_grid_scores(
+        scenario, both, when, "synthetic", AppConfig(grid_resolution_deg=left.resolution_deg)
+    ).severity.values
+    offset = both.lons.index(right.grid.lons[0])
+    np.testing.assert_array_equal(left.values, full[:, : left.grid.cols])
+    np.testing.assert_array_equal(right.values, full[:, offset : offset + right.grid.cols])
+    if left.grid.lons[-1] == right.grid.lons[0]:
+        np.testing.assert_array_equal(left.values[:, -1], right.values[:, 0])
+
+
+def test_panning_tiles_share_one_static_entry():
+    pipeline.clear_caches()
+    clear_tile_cache()
+    config = AppConfig()
+    when = parse_time(DEFAULT_START, DEFAULT_START)
+    scenario = BBox(**dict(zip(("min_lon", "min_lat", "max_lon", "max_lat"), DEFAULT_BBOX)))
+    z = 8
+    x, y = _lonlat_to_tile(-121.0, 38.0, z)
+    for dx in range(-1, 2):
+        for dy in range(-1, 2):
+            tile = layer_tile("severity", z, x + dx, y + dy, scenario, when, "synthetic", config)
+            uncached, _ = pipeline._score_grid(
+                get_provider("synthetic"), "synthetic", scenario, tile.grid, when, config, reuse_static=False
+            )
+            np.testing.assert_array_equal(tile.values, uncached.severity.values)
+    assert pipeline.cache_stats()["static"]["size"] == 1
+
+    # A tile outside the scenario's lattice scores without touching the cache.
+    far_x, far_y = _lonlat_to_tile(10.0, 50.0, z)
+    layer_tile("severity", z, far_x, far_y, scenario, when, "synthetic", config)
+    assert pipeline.cache_stats()["static"]["size"] == 1
+    pipeline.clear_caches()
+
+
+async def _get(path: str, **params):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, params={"time": DEFAULT_START, "data_mode": "synthetic", **params})
+
+
+def test_layer_tile_is_cached_per_tile():
+    clear_tile_cache()
+    x, y = _lonlat_to_tile(-121.0, 38.0, 8)
+    first = asyncio.run(_get(f"/tiles/fuel/8/{x}/{y}"))
+    assert first.status_code == 200
+    body = first.json()
+    assert body["meta"]["cols"] <= TILE_CELLS
+    assert len(body["layers"]["fuel"]) == body["meta"]["rows"]
+
+    hits = tile_cache_stats()["hits"]
+    again = asyncio.run(_get(f"/tiles/fuel/8/{x}/{y}"))
+    assert again.json() == body
+    assert tile_cache_stats()["hits"] == hits + 1
+
+
+def test_threat_tiles_partition_scenario_threats():
+    clear_tile_cache()
+    z = 9
+    # Finest zoom for the default config is reached well before z=9, so tiles
+    # share the scenario-wide /threats result.
+    assert tile_resolution(z, AppConfig()) == AppConfig().grid_resolution_deg
+    full = asyncio.run(_get("/threats")).json()["features"]
+    x0, y0 = _lonlat_to_tile(-124.5, 39.5, z)
+    x1, y1 = _lonlat_to_tile(-118.0, 36.0, z)
+
+    collected = []
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            response = asyncio.run(_get(f"/tiles/threats/{z}/{x}/{y}"))
+            assert response.status_code == 200
+            collected.extend(f["properties"]["cell_id"] for f in response.json()["features"])
+
+    assert sorted(collected) == sorted(f["properties"]["cell_id"] for f in full)
+
+
+def test_unknown_tile_layer_is_404():
+    response = asyncio.run(_get("/tiles/wind/3/1/1"))
+    assert response.status_code == 404
@@ -8,21 +8,24 @@ ZeroStrike frontend Product Demo tab expects.
 import math
 import os
 import sys
+import threading
+import time
 
 # ── Make the engine package importable ────────────────────────────────────────
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "engine"))
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
 from firebase_functions import https_fn
-import firebase_admin
-from firebase_admin import firestore
 from datetime import datetime, timezone
 
+# Only the light config module is imported up front. firebase_admin, the
+# engine pipeline (numpy, scipy on first routing call) and the pydantic
+# models are imported by the routes that need them, so a cold start serving
+# /api/drop-status never loads the engine and /api/threats never loads
+# Firestore. benchmarks/bench_startup.py measures the difference.
 from app.config import AppConfig, DEFAULT_BBOX, DEFAULT_START
-from app.engine.pipeline import compute_threats
-from app.models import BBox
-from app.utils.time import parse_time
+from drop_state import make_store, status_events, status_of
 
 flask_app = Flask(__name__)
 CORS(flask_app)
@@ -33,6 +36,9 @@ _db = None
 def _get_db():
     global _db
     if _db is None:
+        import firebase_admin
+        from firebase_admin import firestore
+
         try:
             firebase_admin.get_app()
         except ValueError:
@@ -43,17 +49,22 @@ def _get_db():
 def _get_drop_doc():
     return _get_db().collection("drops").document("current")
 
+# Drop state store (drop_state.py); Firestore unless ZEROSTRIKE_DROP_BACKEND=memory
+_drop_store = None
+_drop_store_lock = threading.Lock()
+
+def _get_drop_store():
+    global _drop_store
+    with _drop_store_lock:
+        if _drop_store is None:
+            _drop_store = make_store(_get_drop_doc)
+    return _drop_store
+
 def _get_mission_doc():
     return _get_db().collection("missions").document("current")
 
 config = AppConfig()
 
-_DEFAULT_BBOX = BBox(
-    min_lon=DEFAULT_BBOX[0],
-    min_lat=DEFAULT_BBOX[1],
-    max_lon=DEFAULT_BBOX[2],
-    max_lat=DEFAULT_BBOX[3],
-)
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
@@ -79,11 +90,72 @@ _RECS = {"critical": "DISPATCH", "warning": "DISPATCH", "watch": "MONITOR", "low
 
 def _raw_features():
     """Run engine pipeline and return threat GeoJSON features, sorted by priority."""
+    from app.engine.pipeline import compute_threats
+    from app.models import BBox
+    from app.utils.time import parse_time
+
+    bbox = BBox(
+        min_lon=DEFAULT_BBOX[0],
+        min_lat=DEFAULT_BBOX[1],
+        max_lon=DEFAULT_BBOX[2],
+        max_lat=DEFAULT_BBOX[3],
+    )
     when = parse_time(None, DEFAULT_START)
-    collection = compute_threats(_DEFAULT_BBOX, when, "synthetic", config, config.threat_threshold)
+    collection = compute_threats(bbox, when, "synthetic", config, config.threat_threshold)
     return collection.get("features", [])
 
 
+# ── Snapshot store ────────────────────────────────────────────────────────────
+# The default scenario is deterministic, so a warm instance computes it once
+# and serves every endpoint's JSON from that snapshot until the TTL lapses.
+# Projections are rendered on first use and kept with the snapshot.
+
+_SNAPSHOT_TTL_ENV = "ZEROSTRIKE_SNAPSHOT_TTL_SECONDS"
+_DEFAULT_SNAPSHOT_TTL_SECONDS = 3600.0
+
+
+def _snapshot_ttl_seconds():
+    try:
+        return float(os.environ.get(_SNAPSHOT_TTL_ENV, _DEFAULT_SNAPSHOT_TTL_SECONDS))
+    except ValueError:
+        return _DEFAULT_SNAPSHOT_TTL_SECONDS
+
+
+class _Snapshot:
+    def __init__(self, features):
+        self.features = features
+        self.created = time.monotonic()
+        self.bodies = {}
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def _current_snapshot():
+    global _snapshot
+    ttl = _snapshot_ttl_seconds()
+    snap = _snapshot
+    if snap is not None and time.monotonic() - snap.created < ttl:
+        return snap
+    with _snapshot_lock:
+        # Another request may have rebuilt it while we waited.
+        if _snapshot is None or time.monotonic() - _snapshot.created >= ttl:
+            _snapshot = _Snapshot(_raw_features())
+        return _snapshot
+
+
+def _serve_projection(name, project):
+    """JSON response of project(features) for the current snapshot, rendered once per snapshot."""
+    snap = _current_snapshot()
+    body = snap.bodies.get(name)
+    if body is None:
+        # Rendered by the same provider call jsonify makes, so the bytes match it.
+        body = flask_app.json.response(project(snap.features)).get_data()
+        snap.bodies[name] = body
+    return flask_app.response_class(body, mimetype=flask_app.json.mimetype)
+
+
 # ── API endpoints ─────────────────────────────────────────────────────────────
 
 @flask_app.get("/api/health")
@@ -91,9 +163,8 @@ def health():
     return jsonify({"status": "ok", "engine": "synthetic"})
 
 
-@flask_app.get("/api/threats")
-def get_threats():
-    features = _raw_features()[:20]
+def _threats_projection(features):
+    features = features[:20]
     threats = []
     for i, f in enumerate(features):
         props = f.get("properties", {})
@@ -113,7 +184,12 @@ def get_threats():
             "speedKmh": _SPEEDS[i % len(_SPEEDS)],
             "etaMin": int(ttc * 60),
         })
-    return jsonify(threats)
+    return threats
+
+
+@flask_app.get("/api/threats")
+def get_threats():
+    return _serve_projection("threats", _threats_projection)
 
 
 @flask_app.get("/api/fleet")
@@ -136,9 +212,8 @@ def get_fleet():
     ])
 
 
-@flask_app.get("/api/predictions")
-def get_predictions():
-    features = _raw_features()[:12]
+def _predictions_projection(features):
+    features = features[:12]
     predictions = []
     for i, f in enumerate(features):
         props = f.get("properties", {})
@@ -165,12 +240,16 @@ def get_predictions():
             "status": "dispatching" if level == "critical" else "active",
             "updatedMin": (i + 1) * 2,
         })
-    return jsonify(predictions)
+    return predictions
 
 
-@flask_app.get("/api/forecast")
-def get_forecast():
-    features = _raw_features()[:4]
+@flask_app.get("/api/predictions")
+def get_predictions():
+    return _serve_projection("predictions", _predictions_projection)
+
+
+def _forecast_projection(features):
+    features = features[:4]
     forecast = []
     for h in range(25):
         pt = {"h": h, "label": "NOW" if h == 0 else f"+{h}h"}
@@ -191,7 +270,12 @@ def get_forecast():
             jitter = ((h * 7 + i * 13) % 9) - 4
             pt[f"STRK-{i+1:03d}"] = max(0, min(100, int(val + jitter)))
         forecast.append(pt)
-    return jsonify(forecast)
+    return forecast
+
+
+@flask_app.get("/api/forecast")
+def get_forecast():
+    return _serve_projection("forecast", _forecast_projection)
 
 
 @flask_app.get("/api/model-stats")
@@ -206,9 +290,7 @@ def get_model_stats():
     })
 
 
-@flask_app.get("/api/map/land-risk")
-def get_land_risk():
-    features = _raw_features()
+def _land_risk_projection(features):
     geo_features = []
     for i, f in enumerate(features):
         props = f.get("properties", {})
@@ -227,7 +309,12 @@ def get_land_risk():
             "properties": {"id": f"LR-{i:03d}", "level": level},
             "geometry": f.get("geometry"),
         })
-    return jsonify({"type": "FeatureCollection", "features": geo_features})
+    return {"type": "FeatureCollection", "features": geo_features}
+
+
+@flask_app.get("/api/map/land-risk")
+def get_land_risk():
+    return _serve_projection("land-risk", _land_risk_projection)
 
 
 @flask_app.get("/api/map/collisions")
@@ -237,12 +324,12 @@ def get_collisions():
 
 
 # ── Drop Payload Endpoints ────────────────────────────────────────────────────
-# Firestore doc: drops/current
+# Firestore doc: drops/current, read and written through _get_drop_store()
 # Fields: status ("idle"|"drop"|"reset"), confirmed (bool), timestamp, confirmedAt
 
 @flask_app.post("/api/drop")
 def trigger_drop():
-    _get_drop_doc().set({
+    _get_drop_store().set({
         "status": "drop",
         "confirmed": False,
         "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -252,7 +339,7 @@ def trigger_drop():
 
 @flask_app.post("/api/reset-drop")
 def reset_drop():
-    _get_drop_doc().set({
+    _get_drop_store().set({
         "status": "reset",
         "confirmed": False,
         "timestamp": datetime.now(timezone.utc).isoformat(),
@@ -262,16 +349,22 @@ def reset_drop():
 
 @flask_app.get("/api/drop-status")
 def drop_status():
-    doc = _get_drop_doc().get()
-    if doc.exists:
-        data = doc.to_dict()
-        return data.get("status", "idle"), 200, {"Content-Type": "text/plain"}
-    return "idle", 200, {"Content-Type": "text/plain"}
+    return status_of(_get_drop_store().get()), 200, {"Content-Type": "text/plain"}
+
+
+@flask_app.get("/api/drop-status/stream")
+def drop_status_stream():
+    """Server-Sent Events: the current status, then each change, as plain-text data lines."""
+    return Response(
+        stream_with_context(status_events(_get_drop_store())),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @flask_app.post("/api/drop-confirm")
 def drop_confirm():
-    _get_drop_doc().update({
+    _get_drop_store().update({
         "status": "idle",
         "confirmed": True,
         "confirmedAt": datetime.now(timezone.utc).isoformat(),
@@ -0,0 +1,28 @@
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def main_module(monkeypatch):
+    """The Cloud Function module, with a no-op firebase_functions when it is not installed."""
+    try:
+        import firebase_functions  # noqa: F401
+    except ImportError:
+        https_fn = types.SimpleNamespace(
+            on_request=lambda **options: (lambda handler: handler),
+            Request=object,
+            Response=object,
+        )
+        stub = types.ModuleType("firebase_functions")
+        stub.https_fn = https_fn
+        monkeypatch.setitem(sys.modules, "firebase_functions", stub)
+    import main
+
+    return main
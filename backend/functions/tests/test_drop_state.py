@@ -0,0 +1,98 @@
+import functools
+import threading
+
+import pytest
+
+import drop_state
+from drop_state import MemoryDropStore, make_store, status_events
+
+
+def _data(frame: str) -> str:
+    assert frame.startswith("data: ") and frame.endswith("\n\n")
+    return frame[len("data: ") : -2]
+
+
+def test_memory_store_round_trip():
+    store = MemoryDropStore()
+    assert store.get() is None
+    with pytest.raises(LookupError):
+        store.update({"status": "idle"})
+
+    store.set({"status": "drop", "confirmed": False})
+    store.update({"status": "idle", "confirmed": True})
+    assert store.get() == {"status": "idle", "confirmed": True}
+
+
+def test_make_store_reads_backend_from_env(monkeypatch):
+    monkeypatch.setenv(drop_state.BACKEND_ENV_VAR, "memory")
+    assert isinstance(make_store(lambda: None), MemoryDropStore)
+    monkeypatch.setenv(drop_state.BACKEND_ENV_VAR, "redis")
+    with pytest.raises(ValueError):
+        make_store(lambda: None)
+
+
+def test_stream_pushes_status_changes_only():
+    store = MemoryDropStore()
+    store.set({"status": "idle"})
+    events = status_events(store, heartbeat_seconds=5.0, stream_seconds=30.0)
+
+    assert next(events).startswith("retry: ")
+    assert _data(next(events)) == "idle"
+
+    def writes():
+        store.set({"status": "idle", "confirmed": True})  # same status: nothing sent
+        store.set({"status": "drop", "confirmed": False})
+
+    writer = threading.Thread(target=writes)
+    writer.start()
+    assert _data(next(events)) == "drop"
+    writer.join()
+
+    threading.Timer(0.05, store.update, args=({"status": "idle", "confirmed": True},)).start()
+    assert _data(next(events)) == "idle"
+
+
+def test_stream_sends_transitions_written_between_waits():
+    store = MemoryDropStore()
+    store.set({"status": "idle"})
+    events = status_events(store, heartbeat_seconds=5.0, stream_seconds=30.0)
+    assert next(events).startswith("retry: ")
+    assert _data(next(events)) == "idle"
+
+    # All three writes land before the stream waits again.
+    store.set({"status": "drop", "confirmed": False})
+    store.update({"status": "idle", "confirmed": True})
+    store.set({"status": "drop", "confirmed": False})
+    assert [_data(next(events)) for _ in range(3)] == ["drop", "idle", "drop"]
+
+
+def test_stream_sends_heartbeats_and_ends():
+    now = [0.0]
+    store = MemoryDropStore()
+    events = status_events(store, heartbeat_seconds=0.01, stream_seconds=1.0, clock=lambda: now[0])
+
+    assert next(events).startswith("retry: ")
+    assert _data(next(events)) == "idle"
+    assert next(events) == ": keepalive\n\n"
+    now[0] = 2.0
+    assert list(events) == []
+
+
+def test_drop_endpoints_with_memory_backend(monkeypatch, main_module):
+    monkeypatch.setenv(drop_state.BACKEND_ENV_VAR, "memory")
+    main = main_module
+
+    monkeypatch.setattr(main, "_drop_store", None)
+    monkeypatch.setattr(main, "status_events", functools.partial(status_events, stream_seconds=0.0))
+    client = main.flask_app.test_client()
+
+    assert client.get("/api/drop-status").get_data(as_text=True) == "idle"
+    assert client.post("/api/drop").get_json()["status"] == "drop"
+    assert client.get("/api/drop-status").get_data(as_text=True) == "drop"
+
+    response = client.get("/api/drop-status/stream")
+    assert response.mimetype == "text/event-stream"
+    assert "data: drop\n\n" in response.get_data(as_text=True)
+
+    client.post("/api/drop-confirm")
+    assert client.get("/api/drop-status").get_data(as_text=True) == "idle"
@@ -0,0 +1,61 @@
+import pytest
+from flask import jsonify
+
+ENDPOINTS = {
+    "/api/threats": "_threats_projection",
+    "/api/predictions": "_predictions_projection",
+    "/api/forecast": "_forecast_projection",
+    "/api/map/land-risk": "_land_risk_projection",
+}
+
+
+@pytest.fixture
+def main(monkeypatch, main_module):
+    """main with an empty snapshot and _raw_features counting its calls."""
+    features = main_module._raw_features()
+    calls = []
+
+    def raw_features():
+        calls.append(1)
+        return features
+
+    monkeypatch.delenv(main_module._SNAPSHOT_TTL_ENV, raising=False)
+    monkeypatch.setattr(main_module, "_snapshot", None)
+    monkeypatch.setattr(main_module, "_raw_features", raw_features)
+    main_module.calls = calls
+    main_module.features = features
+    return main_module
+
+
+def test_endpoints_share_one_scenario_run(main):
+    client = main.flask_app.test_client()
+    for _ in range(2):
+        for path in ENDPOINTS:
+            assert client.get(path).status_code == 200
+    assert len(main.calls) == 1
+
+
+def test_snapshot_is_rebuilt_after_ttl(main, monkeypatch):
+    monkeypatch.setenv(main._SNAPSHOT_TTL_ENV, "60")
+    client = main.flask_app.test_client()
+    first = client.get("/api/threats").data
+    assert len(main.calls) == 1
+
+    main._snapshot.created -= 30
+    assert client.get("/api/threats").data == first
+    assert len(main.calls) == 1
+
+    main._snapshot.created -= 31
+    assert client.get("/api/threats").data == first
+    assert len(main.calls) == 2
+
+
+def test_bodies_match_jsonify(main):
+    client = main.flask_app.test_client()
+    for path, projection in ENDPOINTS.items():
+        with main.flask_app.app_context():
+            expected = jsonify(getattr(main, projection)(main.features))
+        for _ in range(2):
+            response = client.get(path)
+            assert response.mimetype == expected.mimetype
+            assert response.data == expected.data